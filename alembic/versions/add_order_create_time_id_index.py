@@ -0,0 +1,51 @@
+"""Add (create_time, id) index to order tables for keyset pagination
+
+Revision ID: add_order_create_time_id_index
+Revises: add_avic_order_number
+Create Date: 2025-10-20 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_order_create_time_id_index'
+down_revision = 'add_avic_order_number'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """为工单表添加 (create_time, id) 复合索引，支持游标分页"""
+    # 大表在线建索引，CONCURRENTLY不能在事务中执行
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_internal_order_create_time_id',
+            'internal_order',
+            ['create_time', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_external_order_create_time_id',
+            'external_order',
+            ['create_time', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """删除工单表 (create_time, id) 复合索引"""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_external_order_create_time_id',
+            table_name='external_order',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_internal_order_create_time_id',
+            table_name='internal_order',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
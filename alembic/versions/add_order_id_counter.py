@@ -0,0 +1,31 @@
+"""Add order id counter table
+
+Revision ID: add_order_id_counter
+Revises: add_order_search_vector
+Create Date: 2025-10-22 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_order_id_counter'
+down_revision = 'add_order_search_vector'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """创建工单号计数表（当天首次分配时根据已有工单初始化）"""
+    op.create_table(
+        'order_id_counter',
+        sa.Column('prefix', sa.String(length=8), nullable=False),
+        sa.Column('day', sa.String(length=8), nullable=False),
+        sa.Column('last_value', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('prefix', 'day'),
+    )
+
+
+def downgrade() -> None:
+    """删除工单号计数表"""
+    op.drop_table('order_id_counter')
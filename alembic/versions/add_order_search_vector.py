@@ -0,0 +1,68 @@
+"""Add full-text search vector to orders
+
+Revision ID: add_order_search_vector
+Revises: add_order_trigram_indexes
+Create Date: 2025-10-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_order_search_vector'
+down_revision = 'add_order_trigram_indexes'
+branch_labels = None
+depends_on = None
+
+ORDER_TABLES = ['internal_order', 'external_order']
+
+# 参与全文检索的列及权重，与模型中的生成列表达式保持一致
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(vin_number, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(license_plate, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(customer, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(vehicle_model, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(repair_shop, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(fault_description, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    """添加由数据库维护的全文检索向量生成列及GIN索引"""
+    for table in ORDER_TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                'search_vector',
+                postgresql.TSVECTOR(),
+                sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            ),
+        )
+
+    # 大表在线建索引，CONCURRENTLY不能在事务中执行
+    with op.get_context().autocommit_block():
+        for table in ORDER_TABLES:
+            op.create_index(
+                f'ix_{table}_search_vector',
+                table,
+                ['search_vector'],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """删除全文检索向量列及索引"""
+    with op.get_context().autocommit_block():
+        for table in ORDER_TABLES:
+            op.drop_index(
+                f'ix_{table}_search_vector',
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    for table in ORDER_TABLES:
+        op.drop_column(table, 'search_vector')
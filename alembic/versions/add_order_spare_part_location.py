@@ -0,0 +1,69 @@
+"""Denormalize spare_part_location onto orders
+
+Revision ID: add_order_spare_part_location
+Revises: add_order_version
+Create Date: 2025-10-23 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_order_spare_part_location'
+down_revision = 'add_order_version'
+branch_labels = None
+depends_on = None
+
+ORDER_TABLES = {
+    'internal_order': 'internal_order_detail',
+    'external_order': 'external_order_detail',
+}
+
+
+def upgrade() -> None:
+    """主工单添加备件所属库位冗余列，从首条详情回填并创建三元组索引"""
+    for table, detail_table in ORDER_TABLES.items():
+        op.add_column(
+            table, sa.Column('spare_part_location', sa.String(), nullable=True)
+        )
+        # 与列表展示一致，取每个工单id最小的详情记录
+        op.execute(
+            f"""
+            UPDATE {table} AS o
+            SET spare_part_location = d.spare_part_location
+            FROM (
+                SELECT DISTINCT ON (order_id) order_id, spare_part_location
+                FROM {detail_table}
+                ORDER BY order_id, id
+            ) AS d
+            WHERE d.order_id = o.id AND d.spare_part_location IS NOT NULL
+            """
+        )
+
+    # 大表在线建索引，CONCURRENTLY不能在事务中执行
+    with op.get_context().autocommit_block():
+        for table in ORDER_TABLES:
+            op.create_index(
+                f'ix_{table}_spare_part_location_trgm',
+                table,
+                ['spare_part_location'],
+                postgresql_using='gin',
+                postgresql_ops={'spare_part_location': 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """删除备件所属库位冗余列及索引"""
+    with op.get_context().autocommit_block():
+        for table in ORDER_TABLES:
+            op.drop_index(
+                f'ix_{table}_spare_part_location_trgm',
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    for table in ORDER_TABLES:
+        op.drop_column(table, 'spare_part_location')
@@ -0,0 +1,58 @@
+"""Add pg_trgm GIN indexes for order substring filters
+
+Revision ID: add_order_trigram_indexes
+Revises: add_order_create_time_id_index
+Create Date: 2025-10-20 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_order_trigram_indexes'
+down_revision = 'add_order_create_time_id_index'
+branch_labels = None
+depends_on = None
+
+# 列表筛选使用 LIKE '%x%' 的列
+TRGM_INDEXES = {
+    'internal_order': [
+        'id', 'customer', 'vehicle_model', 'repair_shop', 'reporter_name'
+    ],
+    'external_order': [
+        'id', 'customer', 'vehicle_model', 'repair_shop', 'reporter_name'
+    ],
+    'internal_order_detail': ['spare_part_location'],
+    'external_order_detail': ['spare_part_location'],
+}
+
+
+def upgrade() -> None:
+    """启用pg_trgm扩展并为工单筛选列创建GIN三元组索引"""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # 大表在线建索引，CONCURRENTLY不能在事务中执行
+    with op.get_context().autocommit_block():
+        for table, columns in TRGM_INDEXES.items():
+            for column in columns:
+                op.create_index(
+                    f'ix_{table}_{column}_trgm',
+                    table,
+                    [column],
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+
+
+def downgrade() -> None:
+    """删除工单筛选列的三元组索引（保留pg_trgm扩展）"""
+    with op.get_context().autocommit_block():
+        for table, columns in TRGM_INDEXES.items():
+            for column in columns:
+                op.drop_index(
+                    f'ix_{table}_{column}_trgm',
+                    table_name=table,
+                    postgresql_concurrently=True,
+                    if_exists=True,
+                )
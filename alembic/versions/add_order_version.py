@@ -0,0 +1,32 @@
+"""Add optimistic locking version to orders
+
+Revision ID: add_order_version
+Revises: add_order_id_counter
+Create Date: 2025-10-22 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_order_version'
+down_revision = 'add_order_id_counter'
+branch_labels = None
+depends_on = None
+
+ORDER_TABLES = ['internal_order', 'external_order']
+
+
+def upgrade() -> None:
+    """添加乐观锁版本号列，已有工单从1开始（常量默认值不会重写整表）"""
+    for table in ORDER_TABLES:
+        op.add_column(
+            table,
+            sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        )
+
+
+def downgrade() -> None:
+    """删除版本号列"""
+    for table in ORDER_TABLES:
+        op.drop_column(table, 'version')
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from typing import List
 
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.cache_metrics import cache_metrics
+from app.core.cache_warmup import cache_warmup_status
 from app.core.messages import Messages, success_response
 from app.core.redis_client import cache_manager, redis_client
 from app.schemas.base import ApiResponse
@@ -10,10 +14,15 @@ router = APIRouter()
 @router.get("/health", response_model=ApiResponse)
 def health_check():
     """系统健康检查"""
+    connected = redis_client.is_connected()
     health_data = {
         "status": "healthy",
-        "redis": "connected" if redis_client.is_connected() else "disconnected",
-        "cache_enabled": redis_client.is_connected(),
+        "redis": "connected" if connected else "disconnected",
+        "cache_enabled": connected,
+        "cache_backend": redis_client.backend_name,
+        "circuit_state": redis_client.breaker.state,
+        "ready": cache_warmup_status.ready,
+        "cache_warmup": cache_warmup_status.to_dict(),
     }
 
     return success_response(data=health_data)
@@ -21,46 +30,74 @@ def health_check():
 
 @router.get("/cache/stats", response_model=ApiResponse)
 def cache_stats():
-    """缓存统计信息"""
-    if not redis_client.is_connected():
-        raise HTTPException(status_code=503, detail="Redis未连接")
+    """缓存统计信息，包含按键前缀统计的命中率和读取耗时"""
+    stats = {
+        "backend": redis_client.backend_name,
+        "circuit_state": redis_client.breaker.state,
+        "local_size": len(cache_manager.local),
+        "prefixes": cache_metrics.snapshot(),
+    }
+
+    # Redis不可用时仍返回进程内统计
+    redis_client_instance = redis_client.client
+    if redis_client_instance is None:
+        return success_response(data=stats)
 
     try:
-        redis_client_instance = redis_client.client
         info = redis_client_instance.info()
 
-        stats = {
-            "connected_clients": info.get("connected_clients", 0),
-            "used_memory": info.get("used_memory_human", "0B"),
-            "total_commands_processed": info.get("total_commands_processed", 0),
-            "keyspace_hits": info.get("keyspace_hits", 0),
-            "keyspace_misses": info.get("keyspace_misses", 0),
-            "uptime_in_seconds": info.get("uptime_in_seconds", 0),
-        }
+        stats.update(
+            {
+                "connected_clients": info.get("connected_clients", 0),
+                "used_memory": info.get("used_memory_human", "0B"),
+                "total_commands_processed": info.get("total_commands_processed", 0),
+                "keyspace_hits": info.get("keyspace_hits", 0),
+                "keyspace_misses": info.get("keyspace_misses", 0),
+                "uptime_in_seconds": info.get("uptime_in_seconds", 0),
+            }
+        )
 
         return success_response(data=stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取缓存统计失败: {str(e)}")
 
 
+@router.post("/cache/stats/reset", response_model=ApiResponse)
+def reset_cache_stats():
+    """重置进程内缓存统计"""
+    cache_metrics.reset()
+
+    return success_response(message="缓存统计已重置")
+
+
 @router.post("/cache/clear", response_model=ApiResponse)
 def clear_cache():
-    """清除所有缓存"""
-    if not redis_client.is_connected():
-        raise HTTPException(status_code=503, detail="Redis未连接")
-
+    """清除所有缓存，包括各进程的本地缓存"""
     try:
-        redis_client_instance = redis_client.client
-        redis_client_instance.flushdb()
+        cache_manager.clear_all()
 
         return success_response(message=Messages.CACHE_CLEAR_SUCCESS)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"清除缓存失败: {str(e)}")
 
 
+@router.post("/cache/clear-tags", response_model=ApiResponse)
+def clear_cache_tags(tags: List[str] = Query(...)):
+    """按标签清除缓存"""
+    try:
+        deleted_count = cache_manager.invalidate_tags(*tags)
+
+        return success_response(
+            message=Messages.CACHE_CLEAR_SUCCESS,
+            data={"tags": tags, "deleted_count": deleted_count},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"清除缓存失败: {str(e)}")
+
+
 @router.post("/cache/clear-pattern", response_model=ApiResponse)
 def clear_cache_pattern(pattern: str):
-    """按模式清除缓存"""
+    """按模式清除缓存（SCAN增量删除）"""
     if not redis_client.is_connected():
         raise HTTPException(status_code=503, detail="Redis未连接")
 
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.core.database import get_db
 from app.core.deps import get_current_active_user, get_current_superuser
 from app.crud.department import department_crud
+from app.crud.user import user_crud
 from app.models.user import User
 from app.schemas.base import ApiResponse
 from app.schemas.department import DepartmentCreate, DepartmentResponse, DepartmentUpdate
@@ -278,7 +279,10 @@ def get_department_users(
 ):
     """获取部门下的用户"""
     try:
-        users = department_crud.get_users_by_dept(db, dept_id)
+        # 成员ID单独查询，用户数据通过批量缓存读取
+        user_ids = department_crud.get_user_ids_by_dept(db, dept_id)
+        responses = user_crud.get_responses(db, user_ids)
+        users = [responses[user_id] for user_id in user_ids if user_id in responses]
         return ApiResponse(code=200, message="操作成功", data=users)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取部门用户失败: {str(e)}")
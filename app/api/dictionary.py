@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.response_helpers import dump_fields, load_only_fields, parse_fields
 from app.crud.dictionary import dictionary_enum_crud, dictionary_type_crud
 from app.schemas.base import ApiResponse
 from app.schemas.dictionary import (
@@ -21,11 +22,19 @@ router = APIRouter()
 # 字典类型相关接口
 @router.get("/types", response_model=ApiResponse)
 def get_dictionary_types(
-    current: int = 1, size: int = 10, name: str = None, db: Session = Depends(get_db)
+    current: int = 1,
+    size: int = 10,
+    name: str = None,
+    fields: str = None,
+    db: Session = Depends(get_db),
 ):
-    """获取字典类型列表"""
+    """获取字典类型列表
+
+    fields指定返回的字段（如 id,name,code），只查询并序列化这些列。
+    """
     try:
         skip = (current - 1) * size
+        field_names = parse_fields(fields, DictionaryTypeResponse)
 
         # 构建查询
         query = db.query(dictionary_type_crud.model)
@@ -38,11 +47,24 @@ def get_dictionary_types(
         total = query.count()
 
         # 获取分页数据
-        types = query.offset(skip).limit(size).all()
-
-        type_responses = [
-            DictionaryTypeResponse.model_validate(type_obj) for type_obj in types
-        ]
+        if field_names is None:
+            types = query.offset(skip).limit(size).all()
+            type_responses = [
+                DictionaryTypeResponse.model_validate(type_obj) for type_obj in types
+            ]
+        else:
+            types = (
+                query.options(
+                    load_only_fields(dictionary_type_crud.model, field_names)
+                )
+                .offset(skip)
+                .limit(size)
+                .all()
+            )
+            type_responses = [
+                dump_fields(type_obj, DictionaryTypeResponse, field_names)
+                for type_obj in types
+            ]
 
         response_data = {
             "records": type_responses,
@@ -52,6 +74,8 @@ def get_dictionary_types(
         }
 
         return ApiResponse(data=response_data)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取字典类型列表失败: {str(e)}")
 
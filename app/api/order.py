@@ -1,10 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from typing import Dict, Tuple
 
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
 from app.core.deps import get_current_active_user
+from app.core.excel_import import iter_xlsx_records
+from app.core.exceptions import ValidationError
+from app.core.export import export_response, validate_export_format
 from app.core.permission_utils import get_order_permission_filter
-from app.crud.order import external_order_crud, internal_order_crud
+from app.core.query_count import (
+    COUNT_NONE,
+    count_cache_key,
+    count_query,
+    validate_count_mode,
+)
+from app.core.response_helpers import (
+    apply_keyset_pagination,
+    dump_fields,
+    next_cursor,
+    parse_fields,
+)
+from app.crud.order import (
+    build_search_tsquery,
+    external_order_crud,
+    internal_order_crud,
+    order_list_options,
+    search_orders,
+)
 from app.models.user import User
 from app.schemas.base import ApiResponse
 from app.schemas.order import (
@@ -14,11 +39,224 @@ from app.schemas.order import (
     InternalOrderCreate,
     InternalOrderResponse,
     InternalOrderUpdate,
+    OrderBatchRequest,
+    OrderBatchResult,
+    OrderSearchResult,
 )
 
 router = APIRouter()
 
 
+# 列表fields参数在响应模型之外支持的字段，以及不支持的字段
+ORDER_LIST_EXTRA_FIELDS = ("spare_part_location",)
+ORDER_LIST_EXCLUDED_FIELDS = ("details",)
+
+# 导出的列及表头
+ORDER_EXPORT_COMMON_HEAD = (
+    ("id", "工单号"),
+    ("customer", "客户"),
+    ("vehicle_model", "车型"),
+    ("repair_shop", "维修站"),
+    ("reporter_name", "报修人"),
+    ("contact_info", "联系方式"),
+    ("report_date", "报修日期"),
+)
+ORDER_EXPORT_COMMON_TAIL = (
+    ("license_plate", "车牌号"),
+    ("vin_number", "VIN码"),
+    ("mileage", "里程"),
+    ("vehicle_location", "车辆位置"),
+    ("vehicle_date", "车辆日期"),
+    ("pack_code", "PACK码"),
+    ("pack_date", "PACK日期"),
+    ("seal_code", "封签码"),
+    ("under_warranty", "是否在保"),
+    ("fault_description", "故障描述"),
+    ("order_progress", "工单进度"),
+    ("is_end", "是否完成"),
+    ("spare_part_location", "备件所属库位"),
+    ("create_time", "创建时间"),
+)
+INTERNAL_ORDER_EXPORT_COLUMNS = (
+    *ORDER_EXPORT_COMMON_HEAD,
+    ("project_type", "项目类型"),
+    ("project_stage", "项目阶段"),
+    *ORDER_EXPORT_COMMON_TAIL,
+    ("avic_order_number", "中航派工单号"),
+)
+EXTERNAL_ORDER_EXPORT_COLUMNS = (
+    *ORDER_EXPORT_COMMON_HEAD,
+    ("insurer", "保险公司"),
+    ("assessor", "定损员"),
+    *ORDER_EXPORT_COMMON_TAIL,
+)
+# 导入时在导出列之外支持的详情记录列
+ORDER_IMPORT_DETAIL_COLUMNS = (
+    ("repair_person", "维修人员"),
+    ("repair_date", "维修日期"),
+    ("avic_responsibility", "中航责任"),
+    ("fault_classification", "故障分类"),
+    ("fault_location", "故障位置"),
+    ("part_category", "零件类别"),
+    ("part_location", "零件位置"),
+    ("repair_description", "维修描述"),
+)
+
+
+def import_header_map(create_schema, columns) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """导入表头映射：返回 (表头到字段名, 字段名到表头)
+
+    支持导出文件的中文表头，以及创建模型的字段名和驼峰名。
+    """
+    header_map = {}
+    titles = {}
+    for name, title in (*columns, *ORDER_IMPORT_DETAIL_COLUMNS):
+        if name in create_schema.model_fields:
+            header_map[title] = name
+            titles[name] = title
+    for name, info in create_schema.model_fields.items():
+        header_map[name] = name
+        header_map[info.alias or name] = name
+    return header_map, titles
+
+
+def filter_order_query(query, model, permission_filter, filters: dict):
+    """按数据权限和列表筛选条件过滤工单查询，列表和导出共用"""
+    # 根据用户权限过滤数据
+    if permission_filter is not None:
+        query = query.filter(model.created_by.in_(permission_filter))
+
+    # 根据createdBy参数过滤（如果指定了createdBy，则进一步过滤）
+    if filters.get("createdBy") is not None:
+        query = query.filter(model.created_by == filters["createdBy"])
+
+    # 添加筛选条件
+    if filters.get("orderNo"):
+        query = query.filter(model.id.contains(filters["orderNo"]))
+
+    if filters.get("customer"):
+        query = query.filter(model.customer.contains(filters["customer"]))
+
+    if filters.get("vehicleModel"):
+        query = query.filter(model.vehicle_model.contains(filters["vehicleModel"]))
+
+    if filters.get("repairShop"):
+        query = query.filter(model.repair_shop.contains(filters["repairShop"]))
+
+    if filters.get("reporterName"):
+        query = query.filter(model.reporter_name.contains(filters["reporterName"]))
+
+    if filters.get("sparePartLocation"):
+        query = query.filter(
+            model.spare_part_location.contains(filters["sparePartLocation"])
+        )
+
+    date_range = filters.get("dateRange")
+    if date_range and len(date_range) == 2:
+        start_date, end_date = date_range
+        if start_date and end_date:
+            query = query.filter(
+                model.report_date >= start_date, model.report_date <= end_date
+            )
+
+    return query
+
+
+def iter_order_export_rows(model, columns, permission_filter, filters: dict):
+    """在独立会话中通过服务端游标逐批读取导出数据
+
+    响应发送时请求的数据库会话已关闭，因此使用单独的会话，读取结束或
+    客户端断开时关闭。
+    """
+    db = SessionLocal()
+    try:
+        expressions = [getattr(model, name) for name, _ in columns]
+        query = (
+            filter_order_query(db.query(model), model, permission_filter, filters)
+            .with_entities(*expressions)
+            .order_by(model.create_time.desc(), model.id.desc())
+            .execution_options(yield_per=settings.EXPORT_YIELD_PER)
+        )
+        for row in query:
+            yield row
+    finally:
+        db.close()
+
+
+def validate_batch_items(items: list) -> None:
+    """校验批量请求的数量"""
+    if not items:
+        raise ValidationError("批量数据不能为空")
+    if len(items) > settings.ORDER_BATCH_MAX_SIZE:
+        raise ValidationError(f"单次最多处理 {settings.ORDER_BATCH_MAX_SIZE} 条工单")
+
+
+def build_batch_result(results: list) -> OrderBatchResult:
+    """汇总批量创建/更新的结果"""
+    success_count = sum(1 for result in results if result["success"])
+    return OrderBatchResult(
+        success_count=success_count,
+        fail_count=len(results) - success_count,
+        results=results,
+    )
+
+
+def build_order_list_records(orders, response_model, field_names=None) -> list:
+    """列表记录：不含详情记录，附带首条详情的备件所属库位
+
+    指定field_names时只校验和序列化这些字段。
+    """
+    records = []
+    for order in orders:
+        if field_names is None:
+            order_dict = response_model.model_validate(order).model_dump(
+                exclude={"details"}
+            )
+            order_dict["sparePartLocation"] = order.spare_part_location
+        else:
+            order_dict = dump_fields(order, response_model, field_names)
+            if "spare_part_location" in field_names:
+                order_dict["sparePartLocation"] = order.spare_part_location
+        records.append(order_dict)
+    return records
+
+
+@router.get("/search", response_model=ApiResponse)
+def search_all_orders(
+    q: str,
+    current: int = 1,
+    size: int = 20,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """全文检索保内、保外工单
+
+    在VIN码、车牌号、客户、车型、维修站、故障描述中按关键字前缀匹配，
+    多个关键字以空格分隔且需同时命中，结果按相关度倒序。
+    """
+    try:
+        if build_search_tsquery(q) is None:
+            raise ValidationError("检索关键字不能为空")
+
+        permission_filter = get_order_permission_filter(current_user, db)
+        rows, total = search_orders(
+            db, q, permission_filter, skip=(current - 1) * size, limit=size
+        )
+        records = [OrderSearchResult.model_validate(row) for row in rows]
+
+        response_data = {
+            "records": records,
+            "total": total,
+            "current": current,
+            "size": size,
+        }
+        return ApiResponse(data=response_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"检索工单失败: {str(e)}")
+
+
 @router.get("/internal/", response_model=ApiResponse)
 def get_internal_orders(
     current: int = 1,
@@ -31,85 +269,89 @@ def get_internal_orders(
     sparePartLocation: str = None,
     dateRange: list = None,
     createdBy: int = None,
+    cursor: str = None,
+    countMode: str = None,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """获取保内工单列表"""
-    try:
-        skip = (current - 1) * size
+    """获取保内工单列表
 
-        # 构建基础查询
-        query = db.query(internal_order_crud.model)
-
-        # 根据用户权限过滤数据
-        permission_filter = get_order_permission_filter(current_user, db)
-        if permission_filter is not None:
-            query = query.filter(internal_order_crud.model.created_by.in_(permission_filter))
+    传入cursor时使用游标分页（空字符串表示第一页），按 (create_time, id)
+    定位下一页；否则按current/size分页。
 
-        # 根据createdBy参数过滤（如果指定了createdBy，则进一步过滤）
-        if createdBy is not None:
-            query = query.filter(internal_order_crud.model.created_by == createdBy)
+    countMode指定总数统计方式：exact精确统计，cached按权限范围和筛选条件
+    缓存总数，estimate超过阈值时使用执行计划估算值，none不统计只返回hasMore。
+    游标分页默认不统计。
 
-        # 添加筛选条件
-        if orderNo:
-            query = query.filter(internal_order_crud.model.id.contains(orderNo))
+    fields指定返回的字段（如 id,customer,reportDate），只查询并序列化这些列。
+    """
+    try:
+        skip = (current - 1) * size
+        field_names = parse_fields(
+            fields,
+            InternalOrderResponse,
+            extra=ORDER_LIST_EXTRA_FIELDS,
+            exclude=ORDER_LIST_EXCLUDED_FIELDS,
+        )
 
-        if customer:
-            query = query.filter(internal_order_crud.model.customer.contains(customer))
+        # 按权限和筛选条件构建查询
+        filters = {
+            "orderNo": orderNo,
+            "customer": customer,
+            "vehicleModel": vehicleModel,
+            "repairShop": repairShop,
+            "reporterName": reporterName,
+            "sparePartLocation": sparePartLocation,
+            "dateRange": dateRange,
+            "createdBy": createdBy,
+        }
+        permission_filter = get_order_permission_filter(current_user, db)
+        query = filter_order_query(
+            db.query(internal_order_crud.model),
+            internal_order_crud.model,
+            permission_filter,
+            filters,
+        )
 
-        if vehicleModel:
-            query = query.filter(
-                internal_order_crud.model.vehicle_model.contains(vehicleModel)
-            )
+        # 不加载详情记录，备件所属库位取主工单上的冗余列
+        page_query = query.options(
+            *order_list_options(internal_order_crud.model, field_names)
+        )
+        order_columns = (
+            internal_order_crud.model.create_time,
+            internal_order_crud.model.id,
+        )
 
-        if repairShop:
-            query = query.filter(
-                internal_order_crud.model.repair_shop.contains(repairShop)
-            )
+        # 获取总数
+        count_mode = validate_count_mode(
+            countMode, COUNT_NONE if cursor is not None else settings.COUNT_DEFAULT_MODE
+        )
+        scope = sorted(permission_filter) if permission_filter is not None else "all"
+        total, total_estimated = count_query(
+            db, query, count_mode, count_cache_key("internal_order", scope, filters)
+        )
 
-        if reporterName:
-            query = query.filter(
-                internal_order_crud.model.reporter_name.contains(reporterName)
+        if cursor is not None:
+            # 游标分页，由复合索引直接定位，无需跳过前面的记录
+            orders, next_page_cursor = apply_keyset_pagination(
+                page_query, order_columns, cursor, size
             )
-
-        if sparePartLocation:
-            # 通过关联的详情表筛选备件所属库位
-            from app.models.order import InternalOrderDetail
-            query = query.join(InternalOrderDetail).filter(
-                InternalOrderDetail.spare_part_location.contains(sparePartLocation)
+        else:
+            # 按创建时间倒序排序并获取分页数据，多取一条用于判断是否有下一页
+            rows = (
+                page_query.order_by(*(column.desc() for column in order_columns))
+                .offset(skip)
+                .limit(size + 1)
+                .all()
             )
+            orders = rows[:size]
+            next_page_cursor = next_cursor(rows, order_columns, size)
 
-        if dateRange and len(dateRange) == 2:
-            start_date, end_date = dateRange
-            if start_date and end_date:
-                query = query.filter(
-                    internal_order_crud.model.report_date >= start_date,
-                    internal_order_crud.model.report_date <= end_date,
-                )
-
-        # 获取总数
-        total = query.count()
-
-        # 按创建时间倒序排序并获取分页数据，同时关联详情表获取备件所属库位
-        from app.models.order import InternalOrderDetail
-        orders = (
-            query.options(joinedload(internal_order_crud.model.details))
-            .order_by(internal_order_crud.model.create_time.desc())
-            .offset(skip)
-            .limit(size)
-            .all()
-        )
-        
         # 构建响应数据，包含备件所属库位信息
-        order_responses = []
-        for order in orders:
-            order_dict = InternalOrderResponse.model_validate(order).model_dump()
-            # 从详情记录中获取备件所属库位
-            if order.details and len(order.details) > 0:
-                order_dict['sparePartLocation'] = order.details[0].spare_part_location
-            else:
-                order_dict['sparePartLocation'] = None
-            order_responses.append(order_dict)
+        order_responses = build_order_list_records(
+            orders, InternalOrderResponse, field_names
+        )
 
         # 返回包含分页信息的响应
         response_data = {
@@ -117,13 +359,134 @@ def get_internal_orders(
             "total": total,
             "current": current,
             "size": size,
+            "nextCursor": next_page_cursor,
+            "hasMore": next_page_cursor is not None,
+            "totalEstimated": total_estimated,
         }
 
         return ApiResponse(data=response_data)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取保内工单列表失败: {str(e)}")
 
 
+@router.get("/internal/export")
+def export_internal_orders(
+    orderNo: str = None,
+    customer: str = None,
+    vehicleModel: str = None,
+    repairShop: str = None,
+    reporterName: str = None,
+    sparePartLocation: str = None,
+    dateRange: list = None,
+    createdBy: int = None,
+    format: str = "xlsx",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """导出保内工单（筛选条件与列表一致），format可选xlsx或csv
+
+    数据通过服务端游标分批读取并逐行写入，以分块传输返回，内存占用与行数无关。
+    """
+    try:
+        export_format = validate_export_format(format)
+        filters = {
+            "orderNo": orderNo,
+            "customer": customer,
+            "vehicleModel": vehicleModel,
+            "repairShop": repairShop,
+            "reporterName": reporterName,
+            "sparePartLocation": sparePartLocation,
+            "dateRange": dateRange,
+            "createdBy": createdBy,
+        }
+        permission_filter = get_order_permission_filter(current_user, db)
+        rows = iter_order_export_rows(
+            internal_order_crud.model,
+            INTERNAL_ORDER_EXPORT_COLUMNS,
+            permission_filter,
+            filters,
+        )
+        return export_response(
+            export_format,
+            f"保内工单_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+            [title for _, title in INTERNAL_ORDER_EXPORT_COLUMNS],
+            rows,
+            sheet_title="保内工单",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"导出保内工单失败: {str(e)}")
+
+
+@router.post("/internal/import", response_model=ApiResponse)
+def import_internal_orders(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """从Excel批量导入保内工单，表头与导出文件一致
+
+    按行校验，校验失败的行在结果中返回行号和原因，其余行批量写入。
+    """
+    try:
+        header_map, titles = import_header_map(
+            InternalOrderCreate, INTERNAL_ORDER_EXPORT_COLUMNS
+        )
+        records = iter_xlsx_records(file.file, header_map)
+        result = internal_order_crud.batch_import(db, records, current_user.id, titles)
+        return ApiResponse(data=result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"导入保内工单失败: {str(e)}")
+
+
+@router.post("/internal/batch", response_model=ApiResponse)
+def batch_create_internal_orders(
+    request_data: OrderBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """批量创建保内工单（含详情），在一个事务中写入并返回每一项的结果"""
+    try:
+        validate_batch_items(request_data.items)
+        results = internal_order_crud.batch_create(
+            db, request_data.items, current_user.id
+        )
+        return ApiResponse(data=build_batch_result(results))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"批量创建保内工单失败，已全部回滚: {str(e)}"
+        )
+
+
+@router.put("/internal/batch", response_model=ApiResponse)
+def batch_update_internal_orders(
+    request_data: OrderBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """批量更新保内工单（含详情），每项需包含id，只能修改有数据权限的工单"""
+    try:
+        validate_batch_items(request_data.items)
+        permission_filter = get_order_permission_filter(current_user, db)
+        results = internal_order_crud.batch_update(
+            db, request_data.items, permission_filter
+        )
+        return ApiResponse(data=build_batch_result(results))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"批量更新保内工单失败，已全部回滚: {str(e)}"
+        )
+
+
 @router.post("/internal/", response_model=ApiResponse)
 def create_internal_order(
     order: InternalOrderCreate,
@@ -187,11 +550,8 @@ def update_internal_order(
 ):
     """更新保内工单"""
     try:
-        order = internal_order_crud.get_by_id(db, order_id)
-        if not order:
-            raise HTTPException(status_code=404, detail="保内工单未找到")
-
         update_data = order_update.model_dump(exclude_unset=True, by_alias=False)
+        version = update_data.pop("version", None)
 
         # 分离主工单数据和详情数据
         detail_fields = [
@@ -218,10 +578,14 @@ def update_internal_order(
 
         # 更新工单和详情记录
         updated_order = internal_order_crud.update_with_details(
-            db, order_id, update_data, detail_data
+            db, order_id, update_data, detail_data, version
         )
+        if not updated_order:
+            raise HTTPException(status_code=404, detail="保内工单未找到")
         order_response = InternalOrderResponse.model_validate(updated_order)
         return ApiResponse(message="保内工单更新成功", data=order_response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"更新保内工单失败: {str(e)}")
 
@@ -251,75 +615,89 @@ def get_external_orders(
     sparePartLocation: str = None,
     dateRange: list = None,
     createdBy: int = None,
+    cursor: str = None,
+    countMode: str = None,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """获取保外工单列表"""
-    try:
-        skip = (current - 1) * size
-
-        # 构建基础查询
-        query = db.query(external_order_crud.model)
+    """获取保外工单列表
 
-        # 根据用户权限过滤数据
-        permission_filter = get_order_permission_filter(current_user, db)
-        if permission_filter is not None:
-            query = query.filter(external_order_crud.model.created_by.in_(permission_filter))
+    传入cursor时使用游标分页（空字符串表示第一页），按 (create_time, id)
+    定位下一页；否则按current/size分页。
 
-        # 根据createdBy参数过滤（如果指定了createdBy，则进一步过滤）
-        if createdBy is not None:
-            query = query.filter(external_order_crud.model.created_by == createdBy)
+    countMode指定总数统计方式：exact精确统计，cached按权限范围和筛选条件
+    缓存总数，estimate超过阈值时使用执行计划估算值，none不统计只返回hasMore。
+    游标分页默认不统计。
 
-        # 添加筛选条件
-        if orderNo:
-            query = query.filter(external_order_crud.model.id.contains(orderNo))
+    fields指定返回的字段（如 id,customer,reportDate），只查询并序列化这些列。
+    """
+    try:
+        skip = (current - 1) * size
+        field_names = parse_fields(
+            fields,
+            ExternalOrderResponse,
+            extra=ORDER_LIST_EXTRA_FIELDS,
+            exclude=ORDER_LIST_EXCLUDED_FIELDS,
+        )
 
-        if customer:
-            query = query.filter(external_order_crud.model.customer.contains(customer))
+        # 按权限和筛选条件构建查询
+        filters = {
+            "orderNo": orderNo,
+            "customer": customer,
+            "vehicleModel": vehicleModel,
+            "repairShop": repairShop,
+            "reporterName": reporterName,
+            "sparePartLocation": sparePartLocation,
+            "dateRange": dateRange,
+            "createdBy": createdBy,
+        }
+        permission_filter = get_order_permission_filter(current_user, db)
+        query = filter_order_query(
+            db.query(external_order_crud.model),
+            external_order_crud.model,
+            permission_filter,
+            filters,
+        )
 
-        if vehicleModel:
-            query = query.filter(
-                external_order_crud.model.vehicle_model.contains(vehicleModel)
-            )
+        # 不加载详情记录，备件所属库位取主工单上的冗余列
+        page_query = query.options(
+            *order_list_options(external_order_crud.model, field_names)
+        )
+        order_columns = (
+            external_order_crud.model.create_time,
+            external_order_crud.model.id,
+        )
 
-        if repairShop:
-            query = query.filter(
-                external_order_crud.model.repair_shop.contains(repairShop)
-            )
+        # 获取总数
+        count_mode = validate_count_mode(
+            countMode, COUNT_NONE if cursor is not None else settings.COUNT_DEFAULT_MODE
+        )
+        scope = sorted(permission_filter) if permission_filter is not None else "all"
+        total, total_estimated = count_query(
+            db, query, count_mode, count_cache_key("external_order", scope, filters)
+        )
 
-        if reporterName:
-            query = query.filter(
-                external_order_crud.model.reporter_name.contains(reporterName)
+        if cursor is not None:
+            # 游标分页，由复合索引直接定位，无需跳过前面的记录
+            orders, next_page_cursor = apply_keyset_pagination(
+                page_query, order_columns, cursor, size
             )
-
-        if sparePartLocation:
-            # 通过关联的详情表筛选备件所属库位
-            from app.models.order import ExternalOrderDetail
-            query = query.join(ExternalOrderDetail).filter(
-                ExternalOrderDetail.spare_part_location.contains(sparePartLocation)
+        else:
+            # 按创建时间倒序排序并获取分页数据，多取一条用于判断是否有下一页
+            rows = (
+                page_query.order_by(*(column.desc() for column in order_columns))
+                .offset(skip)
+                .limit(size + 1)
+                .all()
             )
+            orders = rows[:size]
+            next_page_cursor = next_cursor(rows, order_columns, size)
 
-        if dateRange and len(dateRange) == 2:
-            start_date, end_date = dateRange
-            if start_date and end_date:
-                query = query.filter(
-                    external_order_crud.model.report_date >= start_date,
-                    external_order_crud.model.report_date <= end_date,
-                )
-
-        # 获取总数
-        total = query.count()
-
-        # 按创建时间倒序排序并获取分页数据
-        orders = (
-            query.order_by(external_order_crud.model.create_time.desc())
-            .offset(skip)
-            .limit(size)
-            .all()
+        # 构建响应数据，包含备件所属库位信息
+        order_responses = build_order_list_records(
+            orders, ExternalOrderResponse, field_names
         )
-        order_responses = [
-            ExternalOrderResponse.model_validate(order) for order in orders
-        ]
 
         # 返回包含分页信息的响应
         response_data = {
@@ -327,13 +705,134 @@ def get_external_orders(
             "total": total,
             "current": current,
             "size": size,
+            "nextCursor": next_page_cursor,
+            "hasMore": next_page_cursor is not None,
+            "totalEstimated": total_estimated,
         }
 
         return ApiResponse(data=response_data)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取保外工单列表失败: {str(e)}")
 
 
+@router.get("/external/export")
+def export_external_orders(
+    orderNo: str = None,
+    customer: str = None,
+    vehicleModel: str = None,
+    repairShop: str = None,
+    reporterName: str = None,
+    sparePartLocation: str = None,
+    dateRange: list = None,
+    createdBy: int = None,
+    format: str = "xlsx",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """导出保外工单（筛选条件与列表一致），format可选xlsx或csv
+
+    数据通过服务端游标分批读取并逐行写入，以分块传输返回，内存占用与行数无关。
+    """
+    try:
+        export_format = validate_export_format(format)
+        filters = {
+            "orderNo": orderNo,
+            "customer": customer,
+            "vehicleModel": vehicleModel,
+            "repairShop": repairShop,
+            "reporterName": reporterName,
+            "sparePartLocation": sparePartLocation,
+            "dateRange": dateRange,
+            "createdBy": createdBy,
+        }
+        permission_filter = get_order_permission_filter(current_user, db)
+        rows = iter_order_export_rows(
+            external_order_crud.model,
+            EXTERNAL_ORDER_EXPORT_COLUMNS,
+            permission_filter,
+            filters,
+        )
+        return export_response(
+            export_format,
+            f"保外工单_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+            [title for _, title in EXTERNAL_ORDER_EXPORT_COLUMNS],
+            rows,
+            sheet_title="保外工单",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"导出保外工单失败: {str(e)}")
+
+
+@router.post("/external/import", response_model=ApiResponse)
+def import_external_orders(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """从Excel批量导入保外工单，表头与导出文件一致
+
+    按行校验，校验失败的行在结果中返回行号和原因，其余行批量写入。
+    """
+    try:
+        header_map, titles = import_header_map(
+            ExternalOrderCreate, EXTERNAL_ORDER_EXPORT_COLUMNS
+        )
+        records = iter_xlsx_records(file.file, header_map)
+        result = external_order_crud.batch_import(db, records, current_user.id, titles)
+        return ApiResponse(data=result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"导入保外工单失败: {str(e)}")
+
+
+@router.post("/external/batch", response_model=ApiResponse)
+def batch_create_external_orders(
+    request_data: OrderBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """批量创建保外工单（含详情），在一个事务中写入并返回每一项的结果"""
+    try:
+        validate_batch_items(request_data.items)
+        results = external_order_crud.batch_create(
+            db, request_data.items, current_user.id
+        )
+        return ApiResponse(data=build_batch_result(results))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"批量创建保外工单失败，已全部回滚: {str(e)}"
+        )
+
+
+@router.put("/external/batch", response_model=ApiResponse)
+def batch_update_external_orders(
+    request_data: OrderBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """批量更新保外工单（含详情），每项需包含id，只能修改有数据权限的工单"""
+    try:
+        validate_batch_items(request_data.items)
+        permission_filter = get_order_permission_filter(current_user, db)
+        results = external_order_crud.batch_update(
+            db, request_data.items, permission_filter
+        )
+        return ApiResponse(data=build_batch_result(results))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"批量更新保外工单失败，已全部回滚: {str(e)}"
+        )
+
+
 @router.post("/external/", response_model=ApiResponse)
 def create_external_order(
     order: ExternalOrderCreate,
@@ -397,11 +896,8 @@ def update_external_order(
 ):
     """更新保外工单"""
     try:
-        order = external_order_crud.get_by_id(db, order_id)
-        if not order:
-            raise HTTPException(status_code=404, detail="保外工单未找到")
-
         update_data = order_update.model_dump(exclude_unset=True, by_alias=False)
+        version = update_data.pop("version", None)
 
         # 分离主工单数据和详情数据
         detail_fields = [
@@ -428,10 +924,14 @@ def update_external_order(
 
         # 更新工单和详情记录
         updated_order = external_order_crud.update_with_details(
-            db, order_id, update_data, detail_data
+            db, order_id, update_data, detail_data, version
         )
+        if not updated_order:
+            raise HTTPException(status_code=404, detail="保外工单未找到")
         order_response = ExternalOrderResponse.model_validate(updated_order)
         return ApiResponse(message="保外工单更新成功", data=order_response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"更新保外工单失败: {str(e)}")
 
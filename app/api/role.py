@@ -235,6 +235,7 @@ def update_role_menus(
         if not menu_ids:
             role.menus.clear()
             db.commit()
+            role_crud.invalidate_cache()
             return ApiResponse(message="角色菜单权限已清空")
 
         # 获取所有菜单和权限按钮，只获取启用的菜单
@@ -251,6 +252,7 @@ def update_role_menus(
         role.menus.extend(menus)
 
         db.commit()
+        role_crud.invalidate_cache()
         return ApiResponse(message="角色菜单权限更新成功")
     except HTTPException:
         raise
@@ -290,6 +292,7 @@ def cleanup_orphaned_permissions(
                 role.menus = valid_menus
 
         db.commit()
+        role_crud.invalidate_cache()
 
         return ApiResponse(
             message=f"权限清理完成，共清理了 {cleaned_count} 个无效权限",
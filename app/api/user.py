@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
 from app.core.auth import verify_password
 from app.core.database import get_db
@@ -9,6 +9,7 @@ from app.core.exceptions import (
     UserAlreadyExistsError,
     UserNotFoundError,
 )
+from app.core.response_helpers import dump_response_fields, parse_fields
 from app.crud.user import user_crud
 from app.models.user import User
 from app.schemas.base import ApiResponse, CamelCaseModel
@@ -94,11 +95,16 @@ def get_users(
     email: str = None,
     roleCode: str = None,
     status: bool = None,
+    fields: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_superuser),
 ):
-    """获取用户列表（需要超级管理员权限）"""
+    """获取用户列表（需要超级管理员权限）
+
+    fields指定返回的字段（如 id,userName,nickName），未指定时返回全部字段。
+    """
     skip = (current - 1) * size
+    field_names = parse_fields(fields, UserResponse)
 
     # 构建基础查询
     query = db.query(User)
@@ -134,21 +140,19 @@ def get_users(
         # 直接使用布尔值进行筛选
         query = query.filter(User.status == status)
 
-    # 预加载角色、部门成员和部门负责人信息
-    query = query.options(
-        joinedload(User.roles), 
-        joinedload(User.departments),
-        joinedload(User.leading_departments)
-    )
-
     # 获取总数
     total = query.count()
 
-    # 获取分页数据
-    users = query.offset(skip).limit(size).all()
-
-    # 将SQLAlchemy模型转换为Pydantic模型
-    user_responses = [UserResponse.model_validate(user) for user in users]
+    # 分页只查询用户ID，响应数据按ID批量读取缓存，未命中的再统一查询
+    user_ids = [
+        user_id for (user_id,) in query.with_entities(User.id).offset(skip).limit(size)
+    ]
+    responses = user_crud.get_responses(db, user_ids)
+    user_responses = [
+        dump_response_fields(responses[user_id], field_names)
+        for user_id in user_ids
+        if user_id in responses
+    ]
 
     # 返回包含分页信息的响应
     response_data = {
@@ -200,7 +204,7 @@ def create_user(
     current_user: User = Depends(get_current_superuser),
 ):
     """创建用户（需要超级管理员权限）"""
-    from app.core.crud_helpers import create_with_audit, handle_user_role_association
+    from app.core.crud_helpers import create_with_audit
     from app.core.messages import success_response
     from app.core.response_helpers import normalize_empty_strings
 
@@ -222,9 +226,7 @@ def create_user(
 
     # 如果提供了角色编码，建立用户角色关联
     if role_codes:
-        user_instance = db.query(User).filter(User.id == created_user.id).first()
-        if user_instance:
-            handle_user_role_association(db, user_instance, role_codes, "assign")
+        user_crud.set_roles(db, created_user, role_codes)
 
     return success_response("用户创建成功", UserResponse.model_validate(created_user))
 
@@ -285,16 +287,7 @@ def update_user(
 
     # 如果提供了角色编码，更新用户角色关联
     if role_codes is not None:
-        from app.models.role import Role
-
-        # 清空当前角色
-        user.roles.clear()
-        # 添加新角色
-        if role_codes:
-            roles = db.query(Role).filter(Role.role_code.in_(role_codes)).all()
-            if roles:
-                user.roles.extend(roles)
-        db.commit()
+        user_crud.set_roles(db, updated_user, role_codes)
 
     return ApiResponse(
         message="用户更新成功", data=UserResponse.model_validate(updated_user)
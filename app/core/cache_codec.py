@@ -0,0 +1,269 @@
+"""缓存编解码层，支持ORM模型、Pydantic模型和日期类型"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Set, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import inspect as sa_inspect
+
+from app.core.database import Base
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson为可选依赖，缺失时退回标准库
+    orjson = None
+
+# 自定义类型的标记字段
+TYPE_FIELD = "__t__"
+VALUE_FIELD = "__v__"
+_TYPE_MARKER = TYPE_FIELD.encode("utf-8")
+# 业务字典自身含有标记字段时整体包装为该类型，解码时原样还原
+ESCAPED_TYPE = "escaped"
+
+
+class CacheDecodeError(Exception):
+    """缓存数据含有不允许还原的类型，按未命中处理"""
+
+
+class CachedSnapshot:
+    """从缓存还原的ORM对象快照，只读，与会话无关"""
+
+    __slots__ = ("_model", "_data")
+
+    def __init__(self, model: str, data: Dict[str, Any]):
+        object.__setattr__(self, "_model", model)
+        object.__setattr__(self, "_data", data)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(f"{self._model}快照没有属性 {name}") from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self._model}快照为只读对象")
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CachedSnapshot):
+            return self._model == other._model and self._data == other._data
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self._model, self._data.get("id")))
+
+    def __repr__(self) -> str:
+        return f"<{self._model}快照 id={self._data.get('id')}>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """快照字段字典"""
+        return dict(self._data)
+
+
+def _has_marker_key(value: Any) -> bool:
+    """普通字典或列表中是否有键名与类型标记字段冲突的字典"""
+    if isinstance(value, dict):
+        return TYPE_FIELD in value or any(
+            _has_marker_key(item) for item in value.values()
+        )
+    if isinstance(value, (list, tuple)):
+        return any(_has_marker_key(item) for item in value)
+    return False
+
+
+def _wrap_marker_keys(value: Any) -> Any:
+    if isinstance(value, dict):
+        wrapped = {key: _wrap_marker_keys(item) for key, item in value.items()}
+        if TYPE_FIELD in value:
+            return {TYPE_FIELD: ESCAPED_TYPE, VALUE_FIELD: wrapped}
+        return wrapped
+    if isinstance(value, (list, tuple)):
+        return [_wrap_marker_keys(item) for item in value]
+    return value
+
+
+def _escape(value: Any) -> Any:
+    """包装与类型标记字段冲突的业务字典，避免解码时被误当作自定义类型"""
+    return _wrap_marker_keys(value) if _has_marker_key(value) else value
+
+
+def _encode_model(obj: Any, ancestors: Tuple[int, ...] = ()) -> Dict[str, Any]:
+    """将ORM实例转换为带标记的字典
+
+    列属性除模型__cache_exclude__中列出的敏感列外全部写入；关系属性只写入
+    已加载的部分，避免触发懒加载；沿父链出现的对象（反向引用）会被跳过以防循环。
+    """
+    state = sa_inspect(obj)
+    mapper = state.mapper
+    ancestors = ancestors + (id(obj),)
+    excluded = getattr(mapper.class_, "__cache_exclude__", ())
+    data: Dict[str, Any] = {}
+
+    for attr in mapper.column_attrs:
+        if attr.key not in excluded:
+            data[attr.key] = _escape(getattr(obj, attr.key))
+
+    for rel in mapper.relationships:
+        if rel.key not in state.dict:
+            continue
+        value = state.dict[rel.key]
+        if value is None:
+            data[rel.key] = None
+        elif isinstance(value, (list, set, tuple)):
+            data[rel.key] = [
+                _encode_model(item, ancestors)
+                for item in value
+                if id(item) not in ancestors
+            ]
+        elif id(value) not in ancestors:
+            data[rel.key] = _encode_model(value, ancestors)
+
+    # 业务代码临时挂在实例上的非映射属性（如hasChildren）
+    for key, value in obj.__dict__.items():
+        if not key.startswith("_") and key not in mapper.attrs and key not in excluded:
+            data[key] = _escape(value)
+
+    return {TYPE_FIELD: "model", "m": mapper.class_.__name__, VALUE_FIELD: data}
+
+
+# 允许写入缓存的Pydantic模型，解码时只还原登记过的类
+_pydantic_classes: Dict[str, Type[BaseModel]] = {}
+
+PydanticModel = TypeVar("PydanticModel", bound=Type[BaseModel])
+
+
+def _pydantic_path(cls: Type[BaseModel]) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def register_pydantic(cls: PydanticModel) -> PydanticModel:
+    """登记允许缓存的Pydantic模型，可用作类装饰器"""
+    _pydantic_classes[_pydantic_path(cls)] = cls
+    return cls
+
+
+def _encode_pydantic(model: BaseModel) -> Dict[str, Any]:
+    path = _pydantic_path(type(model))
+    if _pydantic_classes.get(path) is not type(model):
+        raise TypeError(f"Pydantic模型 {path} 未登记，不能写入缓存")
+    return {
+        TYPE_FIELD: "pydantic",
+        "m": path,
+        VALUE_FIELD: _escape(model.model_dump(mode="python", by_alias=False)),
+    }
+
+
+def _decode_pydantic(value: Dict[str, Any]) -> Any:
+    path = value["m"]
+    cls = _pydantic_classes.get(path)
+    if cls is None:
+        raise CacheDecodeError(f"Pydantic模型 {path} 未登记，拒绝从缓存还原")
+    # 直接使用核心校验器，绕过部分模型重写的model_validate
+    return cls.__pydantic_validator__.validate_python(value[VALUE_FIELD])
+
+
+class CacheCodec:
+    """可注册类型转换器的缓存编解码器，默认使用orjson"""
+
+    def __init__(self):
+        self._encoders: List[Tuple[type, Callable[[Any], Any]]] = []
+        self._decoders: Dict[str, Callable[[Any], Any]] = {}
+        self._raw_names: Set[str] = set()
+
+    def register(
+        self,
+        type_: type,
+        name: str,
+        encode: Callable[[Any], Any],
+        decode: Callable[[Any], Any],
+    ) -> None:
+        """注册类型转换器，encode返回可序列化的值，decode负责还原"""
+        self._encoders.append(
+            (type_, lambda obj: {TYPE_FIELD: name, VALUE_FIELD: encode(obj)})
+        )
+        self._decoders[name] = decode
+
+    def register_raw(
+        self,
+        type_: type,
+        name: str,
+        encode: Callable[[Any], Dict[str, Any]],
+        decode: Callable[[Dict[str, Any]], Any],
+    ) -> None:
+        """注册自行输出完整标记字典的转换器"""
+        self._encoders.append((type_, encode))
+        self._decoders[name] = decode
+        self._raw_names.add(name)
+
+    def _default(self, obj: Any) -> Any:
+        for type_, encode in self._encoders:
+            if isinstance(obj, type_):
+                return encode(obj)
+        raise TypeError(f"无法序列化的缓存类型: {type(obj).__name__}")
+
+    def dumps(self, value: Any) -> bytes:
+        """序列化为字节串"""
+        value = _escape(value)
+        if orjson is not None:
+            return orjson.dumps(
+                value,
+                default=self._default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        return json.dumps(value, default=self._default, ensure_ascii=False).encode(
+            "utf-8"
+        )
+
+    def _restore(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self._restore(item) for item in value]
+        if isinstance(value, dict):
+            name = value.get(TYPE_FIELD)
+            if name == ESCAPED_TYPE:
+                return {
+                    key: self._restore(item) for key, item in value[VALUE_FIELD].items()
+                }
+            decode = self._decoders.get(name) if isinstance(name, str) else None
+            if decode is not None:
+                inner = self._restore(value[VALUE_FIELD])
+                if name in self._raw_names:
+                    return decode({**value, VALUE_FIELD: inner})
+                return decode(inner)
+            return {key: self._restore(item) for key, item in value.items()}
+        return value
+
+    def loads(self, data: Any) -> Any:
+        """从字节串反序列化"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        value = orjson.loads(data) if orjson is not None else json.loads(data)
+        # 不含类型标记时无需遍历
+        if _TYPE_MARKER not in data:
+            return value
+        return self._restore(value)
+
+
+def _decode_model(value: Dict[str, Any]) -> CachedSnapshot:
+    return CachedSnapshot(value["m"], value[VALUE_FIELD])
+
+
+cache_codec = CacheCodec()
+# datetime是date的子类，需先注册
+cache_codec.register(datetime, "datetime", datetime.isoformat, datetime.fromisoformat)
+cache_codec.register(date, "date", date.isoformat, date.fromisoformat)
+cache_codec.register(Decimal, "decimal", str, Decimal)
+cache_codec.register(set, "set", list, set)
+cache_codec.register(frozenset, "set", list, set)
+cache_codec.register_raw(Base, "model", _encode_model, _decode_model)
+cache_codec.register_raw(BaseModel, "pydantic", _encode_pydantic, _decode_pydantic)
+cache_codec.register_raw(
+    CachedSnapshot,
+    "model",
+    lambda snapshot: {
+        TYPE_FIELD: "model",
+        "m": snapshot._model,
+        VALUE_FIELD: _escape(snapshot._data),
+    },
+    _decode_model,
+)
@@ -2,21 +2,192 @@
 
 import functools
 import logging
-from typing import Callable, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Union
 
+from sqlalchemy.orm import Session
+
+from app.core.cache_metrics import cache_metrics
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.redis_client import cache_manager
 
 logger = logging.getLogger(__name__)
 
+# 等待其他请求回源时的轮询间隔（秒）
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+
+# 过期数据的后台刷新线程池
+refresh_executor = ThreadPoolExecutor(
+    max_workers=settings.CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh"
+)
+
+# stale_ttl模式下缓存值的包装字段，记录软过期时间戳
+SWR_FRESH_UNTIL = "__swr_fresh_until__"
+SWR_VALUE = "__swr_value__"
+
+# 负缓存占位值，表示数据库中不存在对应记录
+NEGATIVE_MARKER = "__cache_negative__"
+NEGATIVE_VALUE = {NEGATIVE_MARKER: True}
+
+# 标签可以是固定列表，也可以是接收 (result, *args, **kwargs) 的函数
+TagsType = Optional[Union[Iterable[str], Callable[..., Iterable[str]]]]
+
+
+def _resolve_tags(tags: TagsType, result: Any, *args, **kwargs) -> List[str]:
+    """计算本次调用对应的缓存标签"""
+    if tags is None:
+        return []
+    if callable(tags):
+        tags = tags(result, *args, **kwargs)
+    return [tag for tag in tags or () if tag]
+
+
+def _wrap_stale(value: Any, soft_ttl: int) -> dict:
+    """包装缓存值，附带软过期时间"""
+    return {SWR_FRESH_UNTIL: time.time() + soft_ttl, SWR_VALUE: value}
+
+
+def _unwrap_stale(cached_value: Any) -> Tuple[Any, bool]:
+    """拆出缓存值，返回 (值, 是否仍在软TTL内)"""
+    if isinstance(cached_value, dict) and SWR_FRESH_UNTIL in cached_value:
+        return cached_value.get(SWR_VALUE), cached_value[SWR_FRESH_UNTIL] > time.time()
+    return cached_value, True
+
+
+def _is_negative(cached_value: Any) -> bool:
+    """是否为负缓存占位值"""
+    return isinstance(cached_value, dict) and cached_value.get(NEGATIVE_MARKER) is True
+
+
+def _bind_fresh_sessions(args: tuple, kwargs: dict) -> Tuple[tuple, dict, list]:
+    """将参数中的数据库会话替换为新会话，供后台线程使用"""
+    sessions = []
+
+    def replace(value):
+        if isinstance(value, Session):
+            session = SessionLocal()
+            sessions.append(session)
+            return session
+        return value
+
+    new_args = tuple(replace(arg) for arg in args)
+    new_kwargs = {key: replace(value) for key, value in kwargs.items()}
+    return new_args, new_kwargs, sessions
+
 
 def cached(
     key_func: Optional[Callable] = None,
     ttl: Optional[int] = None,
     prefix: str = "cache",
+    tags: TagsType = None,
+    single_flight: bool = False,
+    lock_timeout: Optional[int] = None,
+    wait_timeout: Optional[float] = None,
+    stale_ttl: Optional[int] = None,
+    negative_ttl: Optional[int] = None,
 ):
-    """缓存装饰器，支持自定义键生成和TTL"""
+    """缓存装饰器，支持自定义键生成、TTL和失效标签
+
+    single_flight为True时，缓存未命中只由一个请求回源，其余请求等待
+    最多wait_timeout秒读取新值，超时后自行回源。
+
+    stale_ttl不为空时，超过ttl（软TTL）后的stale_ttl秒内直接返回旧值，
+    同时提交后台线程刷新，请求不再等待数据库。
+
+    negative_ttl不为空时，结果为None也会以占位值缓存negative_ttl秒，
+    新建对应记录时需删除同一个缓存键。
+    """
 
     def decorator(func: Callable) -> Callable:
+        def load(cache_key: str, args, kwargs):
+            # 执行原函数
+            cache_metrics.incr(cache_key, "loads")
+            result = func(*args, **kwargs)
+
+            # 存储到缓存
+            if result is not None:
+                cache_tags = _resolve_tags(tags, result, *args, **kwargs)
+                if stale_ttl:
+                    soft_ttl = ttl or settings.CACHE_DEFAULT_TTL
+                    cache_manager.set(
+                        cache_key,
+                        _wrap_stale(result, soft_ttl),
+                        soft_ttl + stale_ttl,
+                        cache_tags,
+                    )
+                else:
+                    cache_manager.set(cache_key, result, ttl, cache_tags)
+                logger.debug(f"缓存存储: {cache_key}")
+            elif negative_ttl:
+                cache_manager.set(cache_key, NEGATIVE_VALUE, negative_ttl)
+                logger.debug(f"负缓存存储: {cache_key}")
+
+            return result
+
+        def read(cache_key: str) -> Tuple[Optional[Any], bool]:
+            cached_result = cache_manager.get(cache_key)
+            if cached_result is None:
+                return None, False
+            if stale_ttl:
+                return _unwrap_stale(cached_result)
+            return cached_result, True
+
+        def refresh(cache_key: str, lock: Any, args, kwargs):
+            try:
+                fresh_args, fresh_kwargs, sessions = _bind_fresh_sessions(args, kwargs)
+                try:
+                    load(cache_key, fresh_args, fresh_kwargs)
+                    logger.debug(f"缓存后台刷新: {cache_key}")
+                finally:
+                    for session in sessions:
+                        session.close()
+            except Exception as e:
+                logger.error(f"缓存后台刷新失败 {cache_key}: {e}")
+            finally:
+                cache_manager.release_lock(lock)
+
+        def schedule_refresh(cache_key: str, args, kwargs):
+            # 复用单飞锁，同一个键同时只有一个刷新任务
+            lock = cache_manager.acquire_lock(cache_key, lock_timeout)
+            if lock is None:
+                return
+            try:
+                refresh_executor.submit(refresh, cache_key, lock, args, kwargs)
+            except RuntimeError as e:
+                cache_manager.release_lock(lock)
+                logger.warning(f"提交缓存刷新任务失败 {cache_key}: {e}")
+
+        def load_single_flight(cache_key: str, args, kwargs):
+            lock = cache_manager.acquire_lock(cache_key, lock_timeout)
+            if lock is not None:
+                try:
+                    # 获取锁期间可能已有其他请求写入缓存
+                    cached_result, _ = read(cache_key)
+                    if cached_result is not None:
+                        return None if _is_negative(cached_result) else cached_result
+                    return load(cache_key, args, kwargs)
+                finally:
+                    cache_manager.release_lock(lock)
+
+            timeout = wait_timeout
+            if timeout is None:
+                timeout = settings.CACHE_LOCK_WAIT_TIMEOUT
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+                cached_result, _ = read(cache_key)
+                if cached_result is not None:
+                    logger.debug(f"缓存等待命中: {cache_key}")
+                    return None if _is_negative(cached_result) else cached_result
+                if not cache_manager.is_locked(cache_key):
+                    # 持有者已结束但未写入缓存（结果为空或失败）
+                    break
+
+            logger.debug(f"缓存等待超时，自行回源: {cache_key}")
+            return load(cache_key, args, kwargs)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             # 生成缓存键
@@ -30,28 +201,83 @@ def cached(
                 cache_key = ":".join(key_parts)
 
             # 尝试从缓存获取
-            cached_result = cache_manager.get(cache_key)
+            cached_result, is_fresh = read(cache_key)
             if cached_result is not None:
                 logger.debug(f"缓存命中: {cache_key}")
+                if _is_negative(cached_result):
+                    cache_metrics.incr(cache_key, "negative_hits")
+                    return None
+                if not is_fresh:
+                    cache_metrics.incr(cache_key, "stale_hits")
+                    schedule_refresh(cache_key, args, kwargs)
                 return cached_result
 
-            # 执行原函数
-            result = func(*args, **kwargs)
+            if single_flight:
+                return load_single_flight(cache_key, args, kwargs)
+            return load(cache_key, args, kwargs)
 
-            # 存储到缓存
-            if result is not None:
-                cache_manager.set(cache_key, result, ttl)
-                logger.debug(f"缓存存储: {cache_key}")
+        return wrapper
 
-            return result
+    return decorator
+
+
+def cached_many(
+    key_func: Callable[[Any], str],
+    ttl: Optional[int] = None,
+    tags: TagsType = None,
+):
+    """批量缓存装饰器，用于接收ID列表并返回 {ID: 结果} 的函数
+
+    被装饰函数的最后一个位置参数为ID列表，key_func根据单个ID生成缓存键。
+    命中的ID通过一次MGET读取，只有未命中的ID会传给原函数，结果通过一个
+    管道写回缓存。tags为函数时按单条结果计算：tags(value, id)。
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            *leading_args, ids = args
+            ids = list(dict.fromkeys(ids))
+            keys = {item_id: key_func(item_id) for item_id in ids}
+
+            cached_values = cache_manager.get_many(keys.values())
+            results = {
+                item_id: cached_values[key]
+                for item_id, key in keys.items()
+                if key in cached_values
+            }
+
+            missing_ids = [item_id for item_id in ids if item_id not in results]
+            if missing_ids:
+                cache_metrics.incr_many(
+                    (keys[item_id] for item_id in missing_ids), "loads"
+                )
+                loaded = func(*leading_args, missing_ids, **kwargs) or {}
+                mapping = {}
+                key_tags = {}
+                for item_id, value in loaded.items():
+                    if value is None:
+                        continue
+                    key = key_func(item_id)
+                    mapping[key] = value
+                    key_tags[key] = _resolve_tags(tags, value, item_id)
+                    results[item_id] = value
+                if mapping:
+                    cache_manager.set_many(mapping, ttl, key_tags=key_tags)
+                logger.debug(
+                    f"批量缓存: 命中 {len(cached_values)}，回源 {len(missing_ids)}"
+                )
+
+            # 按传入顺序返回，查询不到的ID不出现在结果中
+            return {item_id: results[item_id] for item_id in ids if item_id in results}
 
         return wrapper
 
     return decorator
 
 
-def cache_invalidate(key_pattern: str):
-    """缓存失效装饰器，按模式清除缓存"""
+def cache_invalidate(tags: TagsType):
+    """缓存失效装饰器，按标签清除缓存"""
 
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -59,9 +285,10 @@ def cache_invalidate(key_pattern: str):
             result = func(*args, **kwargs)
 
             # 清除缓存
-            deleted_count = cache_manager.delete_pattern(key_pattern)
+            cache_tags = _resolve_tags(tags, result, *args, **kwargs)
+            deleted_count = cache_manager.invalidate_tags(*cache_tags)
             if deleted_count > 0:
-                logger.debug(f"缓存失效: {key_pattern}, 删除 {deleted_count} 个键")
+                logger.debug(f"缓存失效: {cache_tags}, 删除 {deleted_count} 个键")
 
             return result
 
@@ -70,7 +297,7 @@ def cache_invalidate(key_pattern: str):
     return decorator
 
 
-def cache_refresh(key_func: Callable, ttl: Optional[int] = None):
+def cache_refresh(key_func: Callable, ttl: Optional[int] = None, tags: TagsType = None):
     """缓存刷新装饰器，先清除再重新缓存"""
 
     def decorator(func: Callable) -> Callable:
@@ -87,7 +314,8 @@ def cache_refresh(key_func: Callable, ttl: Optional[int] = None):
 
             # 重新缓存
             if result is not None:
-                cache_manager.set(cache_key, result, ttl)
+                cache_tags = _resolve_tags(tags, result, *args, **kwargs)
+                cache_manager.set(cache_key, result, ttl, cache_tags)
                 logger.debug(f"缓存刷新: {cache_key}")
 
             return result
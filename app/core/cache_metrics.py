@@ -0,0 +1,136 @@
+"""缓存指标统计，按键前缀记录命中、未命中、写入、淘汰、错误次数和读取耗时"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List
+
+from app.core.config import settings
+
+# 计数项
+COUNTER_FIELDS = (
+    "hits",
+    "local_hits",
+    "misses",
+    "sets",
+    "deletes",
+    "evictions",
+    "errors",
+    "loads",
+    "stale_hits",
+    "negative_hits",
+)
+
+
+# 两段式的键族，与redis_client中的cache_key_*对应；其余键按第一段统计
+KEY_FAMILIES = frozenset(
+    {
+        "user:username",
+        "user:email",
+        "user:response",
+        "menu:tree",
+        "department:tree",
+        "dictionary:tree",
+        "role:code",
+        "count:internal_order",
+        "count:external_order",
+    }
+)
+
+
+def key_prefix(key: str) -> str:
+    """缓存键的统计前缀：命中已知的两段式键族时取前两段，否则取第一段
+
+    如 menu:tree:root 统计为 menu:tree，menu:12 统计为 menu。
+    """
+    first, _, rest = key.partition(":")
+    if rest:
+        family = f"{first}:{rest.split(':', 1)[0]}"
+        if family in KEY_FAMILIES:
+            return family
+    return first
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    """计算百分位数（最近邻法），samples需已排序"""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, round(percent / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+class PrefixStats:
+    """单个前缀的统计数据"""
+
+    __slots__ = ("counters", "latencies")
+
+    def __init__(self, sample_size: int):
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTER_FIELDS, 0)
+        # 只保留最近的读取耗时样本，用于计算百分位
+        self.latencies: Deque[float] = deque(maxlen=sample_size)
+
+    def snapshot(self) -> Dict[str, float]:
+        data: Dict[str, float] = dict(self.counters)
+        lookups = data["hits"] + data["misses"]
+        data["hit_rate"] = round(data["hits"] / lookups, 4) if lookups else 0.0
+        samples = sorted(self.latencies)
+        data["get_p50_ms"] = round(_percentile(samples, 50) * 1000, 3)
+        data["get_p99_ms"] = round(_percentile(samples, 99) * 1000, 3)
+        return data
+
+
+class CacheMetrics:
+    """进程内缓存指标，线程安全，不依赖Redis"""
+
+    def __init__(self, enabled: bool, sample_size: int):
+        self.enabled = enabled
+        self.sample_size = sample_size
+        self._stats: Dict[str, PrefixStats] = {}
+        self._lock = threading.Lock()
+
+    def _get_stats(self, prefix: str) -> PrefixStats:
+        """获取前缀统计对象（调用方持有锁）"""
+        stats = self._stats.get(prefix)
+        if stats is None:
+            stats = self._stats[prefix] = PrefixStats(self.sample_size)
+        return stats
+
+    def incr(self, key: str, field: str, amount: int = 1) -> None:
+        """按缓存键累加计数"""
+        if not self.enabled or amount <= 0:
+            return
+        with self._lock:
+            self._get_stats(key_prefix(key)).counters[field] += amount
+
+    def incr_many(self, keys: Iterable[str], field: str) -> None:
+        """按多个缓存键累加计数"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for key in keys:
+                self._get_stats(key_prefix(key)).counters[field] += 1
+
+    def observe_get(self, keys: Iterable[str], seconds: float) -> None:
+        """记录一次读取耗时，批量读取时计入涉及的每个前缀"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for prefix in {key_prefix(key) for key in keys}:
+                self._get_stats(prefix).latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """各前缀的统计快照"""
+        with self._lock:
+            return {
+                prefix: stats.snapshot()
+                for prefix, stats in sorted(self._stats.items())
+            }
+
+    def reset(self) -> None:
+        """清空统计数据"""
+        with self._lock:
+            self._stats.clear()
+
+
+cache_metrics = CacheMetrics(
+    settings.CACHE_METRICS_ENABLED, settings.CACHE_METRICS_SAMPLE_SIZE
+)
@@ -0,0 +1,138 @@
+"""启动时的缓存预热"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+WarmupTask = Tuple[str, Callable[[Session], Any]]
+
+
+def _warm_menu_tree(db: Session) -> None:
+    from app.crud.menu import menu_crud
+
+    menu_crud.get_all_menus(db)
+
+
+def _warm_dictionary_trees(db: Session) -> None:
+    from app.crud.dictionary import dictionary_enum_crud, dictionary_type_crud
+
+    model = dictionary_type_crud.model
+    for (type_id,) in db.query(model.id).filter(model.status):
+        dictionary_enum_crud.build_cascade_tree(db, type_id)
+
+
+def default_warmup_tasks() -> List[WarmupTask]:
+    """默认预热任务：菜单树、字典级联树（只预热接口实际读取的缓存）"""
+    return [
+        ("menu_tree", _warm_menu_tree),
+        ("dictionary_trees", _warm_dictionary_trees),
+    ]
+
+
+class CacheWarmupStatus:
+    """缓存预热状态，供健康检查查询"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    TIMEOUT = "timeout"
+    DISABLED = "disabled"
+
+    def __init__(self):
+        self.state = self.PENDING
+        self.tasks: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """预热是否结束（包括未启用、超时后任务已全部完成的情况）"""
+        return self.state in (self.DONE, self.DISABLED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            duration = None
+            if self.started_at is not None:
+                end = self.finished_at or time.monotonic()
+                duration = round((end - self.started_at) * 1000, 1)
+            return {
+                "state": self.state,
+                "ready": self.ready,
+                "tasks": dict(self.tasks),
+                "duration_ms": duration,
+            }
+
+
+cache_warmup_status = CacheWarmupStatus()
+
+
+def _run_task(name: str, task: Callable[[Session], Any]) -> None:
+    """在独立会话中执行单个预热任务"""
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        task(db)
+        result = "ok"
+        logger.info(f"缓存预热完成 {name}: {time.perf_counter() - started:.3f}s")
+    except Exception as e:
+        result = "failed"
+        logger.warning(f"缓存预热失败 {name}: {e}")
+    finally:
+        db.close()
+
+    status = cache_warmup_status
+    with status._lock:
+        status.tasks[name] = result
+        if all(value != "running" for value in status.tasks.values()):
+            # 超时后剩余任务在后台完成时同样标记为就绪
+            status.state = status.DONE
+            status.finished_at = time.monotonic()
+
+
+def warm_up_caches(
+    tasks: Optional[List[WarmupTask]] = None, timeout: Optional[float] = None
+) -> bool:
+    """并发执行预热任务，超时后不再等待，返回是否在超时前全部完成"""
+    status = cache_warmup_status
+    if not settings.CACHE_WARMUP_ENABLED:
+        status.state = status.DISABLED
+        return True
+
+    tasks = default_warmup_tasks() if tasks is None else tasks
+    if timeout is None:
+        timeout = settings.CACHE_WARMUP_TIMEOUT
+
+    with status._lock:
+        status.state = status.RUNNING if tasks else status.DONE
+        status.tasks = {name: "running" for name, _ in tasks}
+        status.started_at = time.monotonic()
+        status.finished_at = None if tasks else status.started_at
+    if not tasks:
+        return True
+
+    executor = ThreadPoolExecutor(
+        max_workers=settings.CACHE_WARMUP_WORKERS, thread_name_prefix="cache-warmup"
+    )
+    futures = [executor.submit(_run_task, name, task) for name, task in tasks]
+    _, not_done = wait(futures, timeout=timeout)
+    # 不阻塞等待未完成的任务，线程结束后自行退出
+    executor.shutdown(wait=False)
+
+    if not_done:
+        with status._lock:
+            if status.state == status.RUNNING:
+                status.state = status.TIMEOUT
+        pending = [name for name, value in status.tasks.items() if value == "running"]
+        logger.warning(f"缓存预热超时（{timeout}s），未完成: {pending}")
+        return False
+    return True
@@ -29,18 +29,66 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 12
 
     # Redis配置
+    CACHE_BACKEND: str = "redis"  # redis / memory（进程内，用于测试） / none
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: str = ""
     REDIS_DB: int = 0
     REDIS_MAX_CONNECTIONS: int = 20
     REDIS_SOCKET_TIMEOUT: int = 5
     REDIS_SOCKET_CONNECT_TIMEOUT: int = 5
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 3  # 连续失败3次后熔断
+    REDIS_CIRCUIT_RESET_TIMEOUT: int = 30  # 熔断冷却30秒
+    REDIS_CIRCUIT_PROBE_TIMEOUT: int = 10  # 半开探测10秒未返回结果时重新探测
 
     # 缓存配置
     CACHE_DEFAULT_TTL: int = 3600  # 默认缓存1小时
     CACHE_USER_TTL: int = 1800  # 用户信息缓存30分钟
     CACHE_MENU_TTL: int = 7200  # 菜单缓存2小时
     CACHE_DICTIONARY_TTL: int = 3600  # 字典缓存1小时
+    CACHE_NEGATIVE_TTL: int = 60  # 查询不到记录的结果缓存1分钟
+
+    # 列表总数统计配置
+    COUNT_DEFAULT_MODE: str = "exact"  # exact / cached / estimate / none
+    COUNT_CACHE_TTL: int = 30  # cached方式下总数缓存30秒
+    COUNT_ESTIMATE_THRESHOLD: int = 10000  # 估算行数超过该值时不再精确统计
+
+    # 导出配置
+    EXPORT_YIELD_PER: int = 1000  # 导出时每批从服务端游标读取的行数
+    EXPORT_CHUNK_SIZE: int = 65536  # 导出响应每个分块的字节数
+
+    # 导入配置
+    IMPORT_BATCH_SIZE: int = 500  # 导入时每批校验并插入的行数
+    IMPORT_MAX_ROWS: int = 10000  # 单次导入的最大行数
+    ORDER_BATCH_MAX_SIZE: int = 200  # 批量创建/更新接口单次最多处理的工单数
+    ORDER_BATCH_FLUSH_SIZE: int = 50  # 批量写入时每批flush的工单数
+
+    # 工单号生成配置
+    # counter_table / redis_counter / database_lock / sequence / uuid
+    ORDER_ID_STRATEGY: str = "counter_table"
+    ORDER_ID_BLOCK_SIZE: int = 20  # 计数表策略每次预留的序号数量
+    ORDER_ID_REDIS_KEY_TTL: int = 172800  # Redis计数器键保留2天
+
+    # 进程内缓存配置（位于Redis之前的本地LRU层）
+    CACHE_LOCAL_ENABLED: bool = True
+    CACHE_LOCAL_MAX_SIZE: int = 1024  # 每个进程最多保留的键数量
+    CACHE_LOCAL_TTL: int = 60  # 本地副本最长保留60秒
+    CACHE_LOCAL_PREFIXES: List[str] = [
+        "menu:tree",
+        "department:tree",
+        "user",
+        "dictionary",
+    ]
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    CACHE_TAG_TTL: int = 86400  # 标签集合至少保留1天
+    CACHE_LOCK_TIMEOUT: int = 10  # 单飞锁自动释放时间（秒）
+    CACHE_LOCK_WAIT_TIMEOUT: float = 3.0  # 等待其他请求回源的最长时间（秒）
+    CACHE_STALE_TTL: int = 600  # 树形数据软过期后仍可返回旧值的时间（秒）
+    CACHE_REFRESH_WORKERS: int = 4  # 后台刷新线程数
+    CACHE_METRICS_ENABLED: bool = True  # 按前缀统计缓存命中率和耗时
+    CACHE_METRICS_SAMPLE_SIZE: int = 1000  # 每个前缀保留的耗时样本数
+    CACHE_WARMUP_ENABLED: bool = True  # 启动时预热菜单树、字典级联树
+    CACHE_WARMUP_TIMEOUT: float = 30.0  # 启动时最多等待预热的时间（秒）
+    CACHE_WARMUP_WORKERS: int = 4  # 预热线程数
 
     model_config = {"case_sensitive": True, "env_file": ".env"}
 
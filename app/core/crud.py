@@ -1,6 +1,7 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
 
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.database import Base
 from app.core.exceptions import CRMException
@@ -82,3 +83,14 @@ class CRUDBase(Generic[ModelType]):
                 else:
                     query = query.filter(column == value)
         return query
+
+    def _build_tree(
+        self, nodes: List[ModelType], parent_id: Optional[int] = None
+    ) -> List[ModelType]:
+        """将已排序的平铺记录组装为树，children以已加载状态写入，不产生脏数据"""
+        grouped: Dict[Optional[int], List[ModelType]] = {}
+        for node in nodes:
+            grouped.setdefault(node.parent_id, []).append(node)
+        for node in nodes:
+            set_committed_value(node, "children", grouped.get(node.id, []))
+        return grouped.get(parent_id, [])
@@ -21,6 +21,20 @@ def handle_user_role_association(
     db.commit()
 
 
+def commit_without_expire(db: Session) -> None:
+    """提交事务，但不使会话中已加载的属性过期
+
+    写入后直接用内存中的对象构建响应，避免提交后访问属性触发refresh查询。
+    需要取回的服务端默认值由模型的eager_defaults在flush时通过RETURNING获取。
+    """
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
 def create_with_audit(
     db: Session,
     crud,
@@ -0,0 +1,54 @@
+"""启动时的数据库检查"""
+
+import logging
+from typing import List
+
+from sqlalchemy import text
+
+from app.core.database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+# 需要检查的索引后缀：pg_trgm三元组索引
+TRGM_INDEX_SUFFIX = "_trgm"
+
+
+def expected_trgm_indexes() -> List[str]:
+    """模型中声明的三元组索引名称"""
+    import app.models.order  # noqa: F401  确保工单模型已注册
+
+    return sorted(
+        index.name
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if index.name and index.name.endswith(TRGM_INDEX_SUFFIX)
+    )
+
+
+def check_trgm_indexes() -> List[str]:
+    """检查三元组索引是否已创建，返回缺失的索引名称并记录警告"""
+    if engine.dialect.name != "postgresql":
+        return []
+
+    expected = expected_trgm_indexes()
+    try:
+        with engine.connect() as conn:
+            existing = set(
+                conn.execute(
+                    text(
+                        "SELECT indexname FROM pg_indexes WHERE indexname = ANY(:names)"
+                    ),
+                    {"names": expected},
+                ).scalars()
+            )
+    except Exception as e:
+        logger.warning(f"检查三元组索引失败: {e}")
+        return []
+
+    missing = [name for name in expected if name not in existing]
+    if missing:
+        logger.warning(
+            f"缺少工单筛选的三元组索引，模糊查询将退化为全表扫描: {missing}，"
+            "请执行 alembic upgrade head"
+        )
+    return missing
@@ -0,0 +1,53 @@
+"""Excel导入：只读模式逐行读取工作表"""
+
+from typing import Any, BinaryIO, Dict, Iterator, Tuple
+
+import openpyxl
+
+from app.core.exceptions import ValidationError
+
+
+def _cell_value(value: Any) -> Any:
+    """单元格的值：去掉字符串首尾空白，是/否转为布尔值"""
+    if isinstance(value, str):
+        value = value.strip()
+        if value in ("是", "否"):
+            return value == "是"
+    return value
+
+
+def iter_xlsx_records(
+    file: BinaryIO, header_map: Dict[str, str]
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """以只读模式逐行读取第一个工作表，返回 (Excel行号, 字段字典)
+
+    第一行为表头，按header_map把表头映射为字段名，未识别的列和空单元格忽略，
+    空行跳过。只读模式按需解析行数据，不会把整个工作表加载到内存。
+    """
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except Exception:
+        raise ValidationError("无法读取Excel文件，请上传xlsx格式的文件")
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [
+            header_map.get(str(title).strip()) if title is not None else None
+            for title in header
+        ]
+        if not any(columns):
+            raise ValidationError("未识别到有效的表头，请使用导出文件的表头")
+
+        for row_number, row in enumerate(rows, start=2):
+            record = {}
+            for name, value in zip(columns, row):
+                value = _cell_value(value)
+                if name and value is not None and value != "":
+                    record[name] = value
+            if record:
+                yield row_number, record
+    finally:
+        workbook.close()
@@ -1,16 +1,31 @@
 # 并发安全的ID生成服务，提供多种ID生成策略，确保在高并发环境下的安全性
 
+import logging
 import random
+import threading
 import time
 import uuid
 from datetime import datetime
 from enum import Enum
+from typing import Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import text
+import redis
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.exceptions import CRMException
-from app.models.order import ExternalOrder, InternalOrder
+from app.core.redis_client import cache_key_order_id, redis_client
+from app.models.order import ExternalOrder, InternalOrder, OrderIdCounter
+
+logger = logging.getLogger(__name__)
+
+ORDER_ID_PREFIXES = ("BN", "BW")
+
+# 工单号格式：前缀(BN/BW) + yyyymmdd + 4位序号
+ORDER_ID_SEQUENCE_DIGITS = 4
+ORDER_ID_MAX_SEQUENCE = 10**ORDER_ID_SEQUENCE_DIGITS - 1
 
 
 class IDGenerationStrategy(Enum):
@@ -20,6 +35,115 @@ class IDGenerationStrategy(Enum):
     SEQUENCE = "sequence"  # 数据库序列策略
     UUID = "uuid"  # UUID策略
     REDIS_COUNTER = "redis_counter"  # Redis计数器策略
+    COUNTER_TABLE = "counter_table"  # 计数表号段策略
+
+
+def latest_order_sequence(conn, prefix: str, day: str, for_update: bool = False) -> int:
+    """已有工单中当天的最大序号，只统计标准格式（4位数字序号）的工单号
+
+    for_update为True时锁定该工单，锁在调用方事务结束时释放。
+    """
+    model = InternalOrder if prefix == "BN" else ExternalOrder
+    full_prefix = f"{prefix}{day}"
+    statement = (
+        select(model.id)
+        .where(
+            model.id.like(f"{full_prefix}%"),
+            model.id.regexp_match(
+                f"^{full_prefix}[0-9]{{{ORDER_ID_SEQUENCE_DIGITS}}}$"
+            ),
+        )
+        .order_by(model.id.desc())
+        .limit(1)
+    )
+    if for_update:
+        statement = statement.with_for_update()
+    latest_id = conn.execute(statement).scalar()
+    return int(latest_id[-ORDER_ID_SEQUENCE_DIGITS:]) if latest_id else 0
+
+
+def format_order_ids(prefix: str, day: str, start: int, end: int) -> List[str]:
+    """把序号区间 [start, end] 格式化为工单号，超出4位序号时报错"""
+    if end > ORDER_ID_MAX_SEQUENCE:
+        raise CRMException(status_code=500, detail=f"{prefix}{day} 当天工单号已用完")
+    return [
+        f"{prefix}{day}{number:0{ORDER_ID_SEQUENCE_DIGITS}d}"
+        for number in range(start, end + 1)
+    ]
+
+
+class OrderIdBlockAllocator:
+    """工单号段分配器
+
+    每次在独立事务中通过 UPDATE ... RETURNING 从计数表预留一段序号，
+    进程内加锁逐个发放，号段用完再预留下一段。进程重启时未发放的序号
+    会被跳过，工单号可能不连续，但不会重复。
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        # (前缀, 日期) -> [下一个序号, 号段最后一个序号]
+        self._blocks: Dict[Tuple[str, str], List[int]] = {}
+        self._lock = threading.Lock()
+
+    def next_ids(self, db: Session, prefix: str, count: int = 1) -> List[str]:
+        """发放count个当天的工单号"""
+        day = datetime.now().strftime("%Y%m%d")
+        order_ids = []
+        with self._lock:
+            # 只保留当天的号段
+            self._blocks = {
+                key: block for key, block in self._blocks.items() if key[1] == day
+            }
+            while len(order_ids) < count:
+                block = self._blocks.get((prefix, day))
+                if block is None or block[0] > block[1]:
+                    size = max(self.block_size, count - len(order_ids))
+                    end = self._reserve(db, prefix, day, size)
+                    block = [end - size + 1, end]
+                    self._blocks[(prefix, day)] = block
+
+                take = min(count - len(order_ids), block[1] - block[0] + 1)
+                order_ids.extend(
+                    format_order_ids(prefix, day, block[0], block[0] + take - 1)
+                )
+                block[0] += take
+        return order_ids
+
+    def reset(self) -> None:
+        """丢弃进程内未发放的号段"""
+        with self._lock:
+            self._blocks.clear()
+
+    def _reserve(self, db: Session, prefix: str, day: str, size: int) -> int:
+        """在独立事务中预留size个序号，返回号段的最后一个序号
+
+        不使用调用方的事务，计数行的锁在预留后立即释放。
+        """
+        counter = OrderIdCounter.__table__
+        reserve = (
+            update(counter)
+            .where(counter.c.prefix == prefix, counter.c.day == day)
+            .values(last_value=counter.c.last_value + size)
+            .returning(counter.c.last_value)
+        )
+        with db.get_bind().engine.begin() as conn:
+            end = conn.execute(reserve).scalar()
+            if end is None:
+                # 当天第一次分配，从已有工单的最大序号开始
+                start = latest_order_sequence(conn, prefix, day)
+                try:
+                    with conn.begin_nested():
+                        conn.execute(
+                            insert(counter).values(
+                                prefix=prefix, day=day, last_value=start
+                            )
+                        )
+                except IntegrityError:
+                    # 其他进程已初始化
+                    pass
+                end = conn.execute(reserve).scalar()
+        return end
 
 
 class OrderIDGenerator:
@@ -29,6 +153,10 @@ class OrderIDGenerator:
         self, strategy: IDGenerationStrategy = IDGenerationStrategy.DATABASE_LOCK
     ):
         self.strategy = strategy
+        self.block_allocator = OrderIdBlockAllocator(settings.ORDER_ID_BLOCK_SIZE)
+        # 本进程已与数据库对齐的Redis计数键
+        self._synced_counter_keys: Set[str] = set()
+        self._counter_lock = threading.Lock()
 
     def generate_internal_order_id(self, db: Session, max_retries: int = 5) -> str:
         """生成保内工单ID"""
@@ -40,7 +168,14 @@ class OrderIDGenerator:
 
     def _generate_order_id(self, db: Session, prefix: str, max_retries: int) -> str:
         """根据策略生成工单ID"""
-        if self.strategy == IDGenerationStrategy.DATABASE_LOCK:
+        if self.strategy == IDGenerationStrategy.COUNTER_TABLE:
+            return self.block_allocator.next_ids(db, prefix)[0]
+        elif self.strategy == IDGenerationStrategy.REDIS_COUNTER:
+            order_ids = self._generate_with_redis_counter(db, prefix, 1)
+            if order_ids is None:
+                return self._generate_with_database_lock(db, prefix, max_retries)
+            return order_ids[0]
+        elif self.strategy == IDGenerationStrategy.DATABASE_LOCK:
             return self._generate_with_database_lock(db, prefix, max_retries)
         elif self.strategy == IDGenerationStrategy.SEQUENCE:
             return self._generate_with_sequence(db, prefix)
@@ -54,34 +189,15 @@ class OrderIDGenerator:
     ) -> str:
         """使用数据库锁策略生成ID"""
         today = datetime.now().strftime("%Y%m%d")
-        full_prefix = f"{prefix}{today}"
 
         for attempt in range(max_retries):
             try:
                 # 使用数据库锁确保并发安全
                 with db.begin_nested():
-                    # 查询并锁定相关记录
+                    # 查询并锁定当天最新的标准格式工单
                     table_name = "internal_order" if prefix == "BN" else "external_order"
-                    latest_order = db.execute(
-                        text(
-                            f"""
-                                SELECT id FROM {table_name}
-                                WHERE id LIKE :prefix
-                                ORDER BY id DESC
-                                LIMIT 1
-                                FOR UPDATE
-                            """
-                        ),
-                        {"prefix": f"{full_prefix}%"},
-                    ).fetchone()
-
-                    if latest_order:
-                        latest_num = int(latest_order[0][-4:])
-                        new_num = latest_num + 1
-                    else:
-                        new_num = 1
-
-                    order_id = f"{full_prefix}{new_num:04d}"
+                    number = latest_order_sequence(db, prefix, today, True) + 1
+                    order_id = format_order_ids(prefix, today, number, number)[0]
 
                     # 验证ID唯一性
                     existing_order = db.execute(
@@ -109,6 +225,116 @@ class OrderIDGenerator:
 
         raise CRMException(status_code=500, detail="生成工单ID失败，请稍后重试")
 
+    def generate_order_ids(self, db: Session, prefix: str, count: int) -> List[str]:
+        """一次分配连续的一段工单ID，用于批量导入
+
+        计数表策略直接从号段分配；Redis计数器策略一次INCRBY整段分配，
+        Redis不可用时与数据库锁策略相同；数据库锁策略下锁定当天最新工单后
+        整段分配，锁在调用方事务提交时释放；其他策略逐个生成。
+        """
+        if count <= 0:
+            return []
+        if self.strategy == IDGenerationStrategy.COUNTER_TABLE:
+            return self.block_allocator.next_ids(db, prefix, count)
+        if self.strategy == IDGenerationStrategy.REDIS_COUNTER:
+            order_ids = self._generate_with_redis_counter(db, prefix, count)
+            if order_ids is not None:
+                return order_ids
+        elif self.strategy != IDGenerationStrategy.DATABASE_LOCK:
+            return [self._generate_order_id(db, prefix, 5) for _ in range(count)]
+
+        today = datetime.now().strftime("%Y%m%d")
+        start = latest_order_sequence(db, prefix, today, for_update=True) + 1
+        return format_order_ids(prefix, today, start, start + count - 1)
+
+    def _generate_with_redis_counter(
+        self, db: Session, prefix: str, count: int
+    ) -> Optional[List[str]]:
+        """使用Redis计数器策略分配count个连续工单号
+
+        每个前缀每天一个计数键，INCRBY原子递增，各进程、各节点无需加锁。
+        Redis熔断或调用失败时返回None，由调用方退回数据库锁策略；
+        退回期间由数据库分配的序号在Redis恢复后重新对齐。
+        INCRBY结果等于count说明计数键刚被创建（Redis重启、淘汰或主从切换后
+        键已丢失），此时重新以数据库最大序号补齐，避免从1开始分配重复工单号。
+        """
+        client = redis_client.client
+        if client is None:
+            self._synced_counter_keys.clear()
+            return None
+
+        day = datetime.now().strftime("%Y%m%d")
+        key = cache_key_order_id(prefix, day)
+        try:
+            if key not in self._synced_counter_keys:
+                self._sync_redis_counter(client, db, prefix, day)
+            end = client.incrby(key, count)
+            if end == count:
+                end = self._reseed_redis_counter(client, db, prefix, day, count)
+        except redis.RedisError as e:
+            logger.warning(f"Redis分配工单号失败，使用数据库锁策略: {e}")
+            self._synced_counter_keys.clear()
+            return None
+        return format_order_ids(prefix, day, end - count + 1, end)
+
+    def _sync_redis_counter(self, client, db, prefix: str, day: str) -> None:
+        """把Redis计数器对齐到数据库中当天的最大序号
+
+        计数键不存在时以数据库最大序号初始化并设置过期时间；已存在但落后于
+        数据库时（如熔断期间由数据库分配过工单号）用INCRBY补齐差值。
+        多个进程同时对齐只会让计数器多跳过几个序号，不会产生重复。
+        """
+        key = cache_key_order_id(prefix, day)
+        with self._counter_lock:
+            if key in self._synced_counter_keys:
+                return
+            latest = latest_order_sequence(db, prefix, day)
+            if not client.set(key, latest, ex=settings.ORDER_ID_REDIS_KEY_TTL, nx=True):
+                current = int(client.get(key) or 0)
+                if current < latest:
+                    client.incrby(key, latest - current)
+            # 只保留当天的对齐记录
+            self._synced_counter_keys = {
+                synced for synced in self._synced_counter_keys if synced.endswith(day)
+            }
+            self._synced_counter_keys.add(key)
+
+    def _reseed_redis_counter(
+        self, client, db, prefix: str, day: str, count: int
+    ) -> int:
+        """计数键丢失后重新创建时，把本次分配的区间整体移到数据库最大序号之后
+
+        返回补齐后的区间末尾序号。补齐前其他进程已拿到的小序号会在插入时主键
+        冲突，由CRUD换号重试，届时计数器已越过数据库最大序号。
+        """
+        key = cache_key_order_id(prefix, day)
+        with self._counter_lock:
+            latest = latest_order_sequence(db, prefix, day)
+            end = client.incrby(key, latest) if latest else count
+            client.expire(key, settings.ORDER_ID_REDIS_KEY_TTL)
+            self._synced_counter_keys.add(key)
+        if latest:
+            logger.warning(
+                f"工单号计数器 {key} 已丢失，按数据库最大序号 {latest} 重新对齐"
+            )
+        return end
+
+    def reconcile_redis_counters(self, db: Session) -> None:
+        """启动时把当天各前缀的Redis计数器对齐到数据库最大序号"""
+        if self.strategy != IDGenerationStrategy.REDIS_COUNTER:
+            return
+        client = redis_client.client
+        if client is None:
+            logger.warning("Redis不可用，跳过工单号计数器对齐")
+            return
+
+        day = datetime.now().strftime("%Y%m%d")
+        try:
+            for prefix in ORDER_ID_PREFIXES:
+                self._sync_redis_counter(client, db, prefix, day)
+        except redis.RedisError as e:
+            logger.warning(f"工单号计数器对齐失败: {e}")
+
     def _generate_with_sequence(self, db: Session, prefix: str) -> str:
         """使用数据库序列策略生成ID"""
         today = datetime.now().strftime("%Y%m%d")
@@ -145,7 +371,7 @@ class OrderIDGenerator:
 
 
 # 全局ID生成器实例
-order_id_generator = OrderIDGenerator(IDGenerationStrategy.DATABASE_LOCK)
+order_id_generator = OrderIDGenerator(IDGenerationStrategy(settings.ORDER_ID_STRATEGY))
 
 
 class ConcurrentSafeOrderCRUD:
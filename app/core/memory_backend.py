@@ -0,0 +1,370 @@
+"""进程内缓存后端，提供与redis.Redis一致的常用命令接口"""
+
+import fnmatch
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def _encode(value: Any) -> bytes:
+    """按redis-py的规则编码写入值"""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    if isinstance(value, (int, float)):
+        return repr(value).encode("utf-8")
+    raise TypeError(f"不支持写入的数据类型: {type(value).__name__}")
+
+
+def _key(name: Any) -> str:
+    """统一键类型"""
+    if isinstance(name, bytes):
+        return name.decode("utf-8")
+    return str(name)
+
+
+class InMemoryPubSub:
+    """进程内发布订阅对象"""
+
+    def __init__(self, backend: "InMemoryBackend", ignore_subscribe_messages=False):
+        self._backend = backend
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._channels: List[str] = []
+        self.ignore_subscribe_messages = ignore_subscribe_messages
+
+    def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            channel = _key(channel)
+            self._channels.append(channel)
+            self._backend._subscribe(channel, self._queue)
+            if not self.ignore_subscribe_messages:
+                self._queue.put({"type": "subscribe", "channel": channel, "data": 1})
+
+    def listen(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            yield message
+
+    def close(self) -> None:
+        for channel in self._channels:
+            self._backend._unsubscribe(channel, self._queue)
+        self._channels = []
+        self._queue.put(None)
+
+
+class InMemoryPipeline:
+    """进程内管道，缓存命令后在execute时一次执行"""
+
+    def __init__(self, backend: "InMemoryBackend"):
+        self._backend = backend
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if not callable(getattr(self._backend, name, None)):
+            raise AttributeError(name)
+
+        def queue_command(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue_command
+
+    def execute(self) -> List[Any]:
+        with self._backend._lock:
+            results = [
+                getattr(self._backend, name)(*args, **kwargs)
+                for name, args, kwargs in self._commands
+            ]
+        self._commands = []
+        return results
+
+    def reset(self) -> None:
+        self._commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.reset()
+
+
+class InMemoryLock:
+    """进程内锁，接口与redis.lock.Lock一致，超时后自动释放"""
+
+    def __init__(
+        self,
+        backend: "InMemoryBackend",
+        name: str,
+        timeout: Optional[float] = None,
+        sleep: float = 0.1,
+        blocking: bool = True,
+        blocking_timeout: Optional[float] = None,
+    ):
+        self._backend = backend
+        self.name = name
+        self.timeout = timeout
+        self.sleep = sleep
+        self.blocking = blocking
+        self.blocking_timeout = blocking_timeout
+        self._token: Optional[bytes] = None
+
+    def acquire(
+        self,
+        sleep: Optional[float] = None,
+        blocking: Optional[bool] = None,
+        blocking_timeout: Optional[float] = None,
+        token: Optional[str] = None,
+    ) -> bool:
+        sleep = self.sleep if sleep is None else sleep
+        blocking = self.blocking if blocking is None else blocking
+        if blocking_timeout is None:
+            blocking_timeout = self.blocking_timeout
+        token = _encode(token or uuid.uuid4().hex)
+
+        deadline = None
+        if blocking_timeout is not None:
+            deadline = time.monotonic() + blocking_timeout
+        while True:
+            if self._backend.set(self.name, token, ex=self.timeout, nx=True):
+                self._token = token
+                return True
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            time.sleep(sleep)
+
+    def locked(self) -> bool:
+        return bool(self._backend.exists(self.name))
+
+    def owned(self) -> bool:
+        return self._token is not None and self._backend.get(self.name) == self._token
+
+    def release(self) -> None:
+        with self._backend._lock:
+            if self.owned():
+                self._backend.delete(self.name)
+        self._token = None
+
+
+class InMemoryBackend:
+    """进程内缓存后端，用于无Redis环境和测试"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._subscribers: Dict[str, List["queue.Queue"]] = {}
+        self._lock = threading.RLock()
+        self._started_at = time.time()
+        self._commands_processed = 0
+        self._hits = 0
+        self._misses = 0
+
+    def _get_item(self, name: Any) -> Optional[Any]:
+        """获取未过期的值"""
+        key = _key(name)
+        self._commands_processed += 1
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expire_at = item
+        if expire_at is not None and expire_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def _expire_at(self, ex: Optional[float], px: Optional[float]) -> Optional[float]:
+        if ex is not None:
+            return time.monotonic() + float(ex)
+        if px is not None:
+            return time.monotonic() + float(px) / 1000
+        return None
+
+    # 连接相关
+    def ping(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+    # 字符串命令
+    def get(self, name: Any) -> Optional[bytes]:
+        with self._lock:
+            value = self._get_item(name)
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return value
+
+    def set(
+        self,
+        name: Any,
+        value: Any,
+        ex: Optional[float] = None,
+        px: Optional[float] = None,
+        nx: bool = False,
+        xx: bool = False,
+    ) -> Optional[bool]:
+        with self._lock:
+            exists = self._get_item(name) is not None
+            if (nx and exists) or (xx and not exists):
+                return None
+            self._data[_key(name)] = (_encode(value), self._expire_at(ex, px))
+            return True
+
+    def setex(self, name: Any, time_seconds: int, value: Any) -> bool:
+        return bool(self.set(name, value, ex=time_seconds))
+
+    def mget(self, keys: Any, *args: Any) -> List[Optional[bytes]]:
+        names = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        names.extend(args)
+        return [self.get(name) for name in names]
+
+    def incrby(self, name: Any, amount: int = 1) -> int:
+        with self._lock:
+            key = _key(name)
+            current = self._get_item(key)
+            expire_at = self._data[key][1] if current is not None else None
+            value = int(current or 0) + amount
+            self._data[key] = (_encode(value), expire_at)
+            return value
+
+    def incr(self, name: Any, amount: int = 1) -> int:
+        return self.incrby(name, amount)
+
+    # 集合命令
+    def sadd(self, name: Any, *values: Any) -> int:
+        with self._lock:
+            key = _key(name)
+            members = self._get_item(key)
+            expire_at = self._data[key][1] if members is not None else None
+            members = set(members or ())
+            before = len(members)
+            members.update(_encode(value) for value in values)
+            self._data[key] = (members, expire_at)
+            return len(members) - before
+
+    def srem(self, name: Any, *values: Any) -> int:
+        with self._lock:
+            key = _key(name)
+            members = self._get_item(key)
+            if members is None:
+                return 0
+            before = len(members)
+            members.difference_update(_encode(value) for value in values)
+            if not members:
+                del self._data[key]
+            return before - len(members)
+
+    def smembers(self, name: Any) -> set:
+        with self._lock:
+            return set(self._get_item(name) or ())
+
+    # 通用键命令
+    def delete(self, *names: Any) -> int:
+        with self._lock:
+            deleted = 0
+            for name in names:
+                if self._get_item(name) is not None:
+                    del self._data[_key(name)]
+                    deleted += 1
+            return deleted
+
+    def unlink(self, *names: Any) -> int:
+        return self.delete(*names)
+
+    def exists(self, *names: Any) -> int:
+        with self._lock:
+            return sum(1 for name in names if self._get_item(name) is not None)
+
+    def expire(self, name: Any, time_seconds: int) -> bool:
+        with self._lock:
+            value = self._get_item(name)
+            if value is None:
+                return False
+            self._data[_key(name)] = (value, self._expire_at(time_seconds, None))
+            return True
+
+    def ttl(self, name: Any) -> int:
+        with self._lock:
+            if self._get_item(name) is None:
+                return -2
+            expire_at = self._data[_key(name)][1]
+            if expire_at is None:
+                return -1
+            return max(int(round(expire_at - time.monotonic())), 0)
+
+    def keys(self, pattern: str = "*") -> List[bytes]:
+        with self._lock:
+            return [
+                key.encode("utf-8")
+                for key in list(self._data)
+                if fnmatch.fnmatchcase(key, _key(pattern))
+                and self._get_item(key) is not None
+            ]
+
+    def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None):
+        yield from self.keys(match or "*")
+
+    def flushdb(self, asynchronous: bool = False) -> bool:
+        with self._lock:
+            self._data.clear()
+            return True
+
+    def dbsize(self) -> int:
+        with self._lock:
+            return len(self.keys())
+
+    # 发布订阅
+    def _subscribe(self, channel: str, subscriber: "queue.Queue") -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(subscriber)
+
+    def _unsubscribe(self, channel: str, subscriber: "queue.Queue") -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(channel, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+
+    def publish(self, channel: Any, message: Any) -> int:
+        channel = _key(channel)
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, []))
+        for subscriber in subscribers:
+            subscriber.put({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> InMemoryPubSub:
+        return InMemoryPubSub(self, ignore_subscribe_messages)
+
+    # 分布式锁
+    def lock(
+        self,
+        name: str,
+        timeout: Optional[float] = None,
+        sleep: float = 0.1,
+        blocking: bool = True,
+        blocking_timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> InMemoryLock:
+        return InMemoryLock(self, name, timeout, sleep, blocking, blocking_timeout)
+
+    # 管道
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
+
+    # 服务器信息
+    def info(self, section: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "redis_mode": "in-memory",
+                "connected_clients": 1,
+                "used_memory_human": f"{len(self._data)} keys",
+                "total_commands_processed": self._commands_processed,
+                "keyspace_hits": self._hits,
+                "keyspace_misses": self._misses,
+                "uptime_in_seconds": int(time.time() - self._started_at),
+            }
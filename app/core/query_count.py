@@ -0,0 +1,102 @@
+"""列表总数统计策略"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.core.redis_client import cache_manager
+
+logger = logging.getLogger(__name__)
+
+# 精确统计
+COUNT_EXACT = "exact"
+# 精确统计并按 (权限范围, 筛选条件) 缓存一段时间
+COUNT_CACHED = "cached"
+# 超过阈值时使用执行计划的估算行数
+COUNT_ESTIMATE = "estimate"
+# 不统计，只返回是否有下一页
+COUNT_NONE = "none"
+
+COUNT_MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATE, COUNT_NONE)
+
+
+def validate_count_mode(mode: Optional[str], default: str) -> str:
+    """校验统计方式，为空时使用默认值"""
+    mode = mode or default
+    if mode not in COUNT_MODES:
+        raise ValidationError(f"不支持的统计方式: {mode}，可选 {'/'.join(COUNT_MODES)}")
+    return mode
+
+
+def count_cache_key(namespace: str, scope: Any, filters: Dict[str, Any]) -> str:
+    """总数缓存键，由权限范围和筛选条件决定"""
+    payload = json.dumps(
+        {"scope": scope, "filters": filters}, sort_keys=True, default=str
+    )
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    return f"count:{namespace}:{digest}"
+
+
+def explain_statement(query, dialect) -> Tuple[str, Dict[str, Any]]:
+    """生成估算行数使用的EXPLAIN语句和参数
+
+    IN等需要展开的参数在编译时渲染，否则语句中会残留POSTCOMPILE占位符。
+    """
+    compiled = query.statement.compile(
+        dialect=dialect, compile_kwargs={"render_postcompile": True}
+    )
+    return f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+
+
+def estimate_count(db: Session, query) -> Optional[int]:
+    """读取PostgreSQL执行计划的估算行数，其他数据库返回None
+
+    EXPLAIN在保存点中执行，失败时只回滚到保存点，不影响后续的精确统计。
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    try:
+        sql, params = explain_statement(query, bind.dialect)
+        with db.begin_nested():
+            plan = db.connection().exec_driver_sql(sql, params).scalar()
+    except Exception as e:
+        logger.warning(f"获取估算行数失败: {e}")
+        return None
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_query(
+    db: Session, query, mode: str, cache_key: Optional[str] = None
+) -> Tuple[Optional[int], bool]:
+    """按统计方式计算总数，返回 (总数, 是否为估算值)
+
+    none方式返回 (None, False)；estimate方式在估算值低于阈值时退回精确统计。
+    """
+    if mode == COUNT_NONE:
+        return None, False
+
+    if mode == COUNT_ESTIMATE:
+        estimated = estimate_count(db, query)
+        if estimated is not None and estimated >= settings.COUNT_ESTIMATE_THRESHOLD:
+            return estimated, True
+        return query.count(), False
+
+    if mode == COUNT_CACHED and cache_key:
+        cached_total = cache_manager.get(cache_key)
+        if isinstance(cached_total, int):
+            return cached_total, False
+        total = query.count()
+        cache_manager.set(cache_key, total, settings.COUNT_CACHE_TTL)
+        return total, False
+
+    return query.count(), False
@@ -1,21 +1,168 @@
 """Redis客户端和缓存工具"""
 
+import fnmatch
 import json
 import logging
-from typing import Any, Optional
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import redis
+from redis._parsers import _HiredisParser
+from redis.utils import HIREDIS_AVAILABLE
 
+from app.core.cache_codec import CacheDecodeError, cache_codec
+from app.core.cache_metrics import cache_metrics
 from app.core.config import settings
+from app.core.memory_backend import InMemoryBackend
 
 logger = logging.getLogger(__name__)
 
+# SCAN/UNLINK每批处理的键数量
+SCAN_BATCH_SIZE = 500
+
+
+class CircuitBreaker:
+    """Redis熔断器，连续失败达到阈值后在冷却期内不再访问Redis"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self, failure_threshold: int, reset_timeout: float, probe_timeout: float = 10
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # 探测请求超过该时间仍未报告结果时，允许发起新的探测
+        self.probe_timeout = probe_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """当前熔断状态"""
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """是否允许访问Redis，冷却期结束后放行一次探测请求"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == self.OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_started_at = now
+                return True
+            # 半开状态下探测请求尚未返回，其余请求继续跳过；
+            # 探测方一直未报告结果（如调用方未经过熔断器）时，超时后重新放行一次
+            if now - self._probe_started_at >= self.probe_timeout:
+                self._probe_started_at = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """记录成功调用，关闭熔断"""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """记录失败调用，达到阈值或探测失败时打开熔断"""
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                if self._state != self.OPEN:
+                    logger.warning(
+                        f"Redis连续失败{self._failures}次，"
+                        f"熔断{self.reset_timeout}秒"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        """重置熔断状态"""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+
+class GuardedRedis:
+    """受熔断器保护的Redis客户端代理，连接类异常会计入熔断器"""
+
+    # 只创建本地对象、不产生网络请求的方法
+    _LOCAL_METHODS = {"register_script"}
+    # 返回本地对象的方法，以及该对象上访问Redis、需要计入熔断器的方法
+    _WRAPPED_METHODS = {
+        "pipeline": {"execute"},
+        "pubsub": {"subscribe", "psubscribe", "get_message"},
+        "lock": {"acquire", "release", "extend", "reacquire", "locked", "owned"},
+    }
+
+    def __init__(
+        self,
+        client: Any,
+        breaker: CircuitBreaker,
+        guarded_methods: Optional[Set[str]] = None,
+    ):
+        self._client = client
+        self._breaker = breaker
+        # 为None时保护所有方法，否则只保护指定方法（如管道的execute）
+        self._guarded_methods = guarded_methods
+
+    @property
+    def raw(self) -> Any:
+        """底层客户端"""
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name in self._WRAPPED_METHODS and self._guarded_methods is None:
+            methods = self._WRAPPED_METHODS[name]
+            return lambda *args, **kwargs: GuardedRedis(
+                attr(*args, **kwargs), self._breaker, methods
+            )
+        if not callable(attr) or name in self._LOCAL_METHODS:
+            return attr
+        if self._guarded_methods is not None and name not in self._guarded_methods:
+            return attr
+
+        breaker = self._breaker
+
+        def call(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except (redis.ConnectionError, redis.TimeoutError):
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return result
+
+        return call
+
 
 class RedisClient:
     """Redis客户端单例类"""
 
     _instance = None
     _redis_client = None
+    _initialized = False
 
     def __new__(cls):
         if cls._instance is None:
@@ -23,25 +170,82 @@ class RedisClient:
         return cls._instance
 
     def __init__(self):
-        if self._redis_client is None:
+        if not self._initialized:
+            self.breaker = CircuitBreaker(
+                settings.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+                settings.REDIS_CIRCUIT_RESET_TIMEOUT,
+                settings.REDIS_CIRCUIT_PROBE_TIMEOUT,
+            )
             self._init_redis_client()
+            RedisClient._initialized = True
 
     def _init_redis_client(self):
-        """初始化Redis客户端"""
-        # 直接禁用Redis连接
-        self._redis_client = None
+        """根据CACHE_BACKEND初始化缓存后端"""
+        backend = settings.CACHE_BACKEND.lower()
+
+        if backend == "memory":
+            self.use_backend(InMemoryBackend(), "memory")
+        elif backend == "redis":
+            try:
+                self.use_backend(redis.Redis(connection_pool=self._build_pool()))
+            except Exception as e:
+                logger.error(f"初始化Redis连接池失败: {e}")
+                self.use_backend(None, "none")
+        else:
+            self.use_backend(None, "none")
+
+    @staticmethod
+    def _build_pool() -> redis.ConnectionPool:
+        """创建Redis连接池，优先使用hiredis解析器"""
+        pool_kwargs: Dict[str, Any] = {
+            "db": settings.REDIS_DB,
+            "max_connections": settings.REDIS_MAX_CONNECTIONS,
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            "health_check_interval": 30,
+        }
+        if settings.REDIS_PASSWORD:
+            pool_kwargs["password"] = settings.REDIS_PASSWORD
+        if HIREDIS_AVAILABLE:
+            pool_kwargs["parser_class"] = _HiredisParser
+
+        return redis.ConnectionPool.from_url(settings.REDIS_URL, **pool_kwargs)
+
+    def use_backend(self, client: Any, backend_name: str = "redis") -> None:
+        """切换缓存后端（redis.Redis或InMemoryBackend），并重置熔断器"""
+        old_client = self._redis_client
+        self._redis_client = client
+        self._guarded_client = (
+            GuardedRedis(client, self.breaker) if client is not None else None
+        )
+        self.backend_name = backend_name
+        self.breaker.reset()
+
+        if old_client is not None and old_client is not client:
+            try:
+                old_client.close()
+            except Exception:
+                pass
 
     @property
-    def client(self) -> Optional[redis.Redis]:
-        """获取Redis客户端"""
-        return self._redis_client
+    def enabled(self) -> bool:
+        """是否配置了缓存后端"""
+        return self._redis_client is not None
+
+    @property
+    def client(self) -> Optional[GuardedRedis]:
+        """获取Redis客户端，熔断期间返回None"""
+        if self._guarded_client is None or not self.breaker.allow_request():
+            return None
+        return self._guarded_client
 
     def is_connected(self) -> bool:
         """检查Redis是否连接"""
-        if self._redis_client is None:
+        client = self.client
+        if client is None:
             return False
         try:
-            self._redis_client.ping()
+            client.ping()
             return True
         except Exception:
             return False
@@ -51,119 +255,655 @@ class RedisClient:
 redis_client = RedisClient()
 
 
+class LocalCache:
+    """进程内LRU缓存，支持键级TTL和标签，线程安全"""
+
+    def __init__(self, max_size: int, default_ttl: int):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = (
+            OrderedDict()
+        )
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _pop(self, key: str) -> bool:
+        """移除键并同步清理标签索引（调用方持有锁）"""
+        item = self._data.pop(key, None)
+        if item is None:
+            return False
+        for tag in item[2]:
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
+        return True
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取本地缓存，过期则移除"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expire_at, value, _ = item
+            if expire_at <= time.monotonic():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        """设置本地缓存，超出容量时淘汰最久未使用的键"""
+        if ttl is None or ttl > self.default_ttl:
+            ttl = self.default_ttl
+        if ttl <= 0:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.max_size:
+                evicted = next(iter(self._data))
+                self._pop(evicted)
+                cache_metrics.incr(evicted, "evictions")
+
+    def delete(self, *keys: str) -> int:
+        """删除本地缓存"""
+        with self._lock:
+            return sum(1 for key in keys if self._pop(key))
+
+    def delete_pattern(self, pattern: str) -> int:
+        """按通配符模式删除本地缓存"""
+        with self._lock:
+            keys = [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                self._pop(key)
+        return len(keys)
+
+    def delete_tags(self, *tags: str) -> int:
+        """删除标签下的所有本地缓存"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            return sum(1 for key in keys if self._pop(key))
+
+    def clear(self) -> None:
+        """清空本地缓存"""
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 class CacheManager:
-    """缓存管理器"""
+    """缓存管理器，本地LRU层在前，Redis在后"""
 
     def __init__(self):
-        self.redis = redis_client.client
+        self.local = LocalCache(settings.CACHE_LOCAL_MAX_SIZE, settings.CACHE_LOCAL_TTL)
+        self.local_enabled = settings.CACHE_LOCAL_ENABLED
+        self.local_prefixes = tuple(settings.CACHE_LOCAL_PREFIXES)
+        self.channel = settings.CACHE_INVALIDATION_CHANNEL
+        # 用于识别本进程发出的失效消息
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[threading.Thread] = None
+        # Redis不可用时使用的进程内锁
+        self._process_locks = InMemoryBackend()
 
-    def _serialize(self, value: Any) -> str:
-        """序列化数据"""
-        if isinstance(value, str):
-            return value
-        return json.dumps(value, ensure_ascii=False)
+    @property
+    def redis(self) -> Optional[GuardedRedis]:
+        """当前可用的Redis客户端，未配置或熔断时为None"""
+        return redis_client.client
+
+    def _is_local_key(self, key: str) -> bool:
+        """判断键是否进入本地缓存层"""
+        if not self.local_enabled:
+            return False
+        return any(
+            key == prefix or key.startswith(f"{prefix}:")
+            for prefix in self.local_prefixes
+        )
 
-    def _deserialize(self, value: str) -> Any:
-        """反序列化数据"""
+    def _serialize(self, value: Any) -> bytes:
+        """序列化数据，ORM对象和Pydantic模型由编解码器转换"""
+        return cache_codec.dumps(value)
+
+    def _deserialize(self, value: Any) -> Any:
+        """反序列化数据，ORM对象还原为只读快照，拒绝还原的数据返回None"""
         try:
-            return json.loads(value)
-        except (json.JSONDecodeError, TypeError):
+            return cache_codec.loads(value)
+        except CacheDecodeError as e:
+            logger.warning(f"缓存数据无法还原: {e}")
+            return None
+        except (ValueError, TypeError, UnicodeDecodeError):
+            # 兼容旧版本写入的纯字符串
+            if isinstance(value, bytes):
+                return value.decode("utf-8", errors="replace")
             return value
 
+    def _observe_get(self, key: str, started: float, hit: bool) -> None:
+        """记录读取结果和耗时"""
+        cache_metrics.incr(key, "hits" if hit else "misses")
+        cache_metrics.observe_get((key,), time.perf_counter() - started)
+
     def get(self, key: str) -> Optional[Any]:
-        """获取缓存"""
-        if not self.redis:
+        """获取缓存，优先读取本地缓存"""
+        started = time.perf_counter()
+        is_local = self._is_local_key(key)
+        if is_local:
+            # 本地层保存序列化后的数据，每次返回独立副本
+            value = self.local.get(key)
+            if value is not None:
+                cache_metrics.incr(key, "local_hits")
+                self._observe_get(key, started, True)
+                return self._deserialize(value)
+
+        client = self.redis
+        if not client:
+            self._observe_get(key, started, False)
             return None
 
         try:
-            value = self.redis.get(key)
+            value = client.get(key)
+            self._observe_get(key, started, value is not None)
             if value is not None:
+                if is_local:
+                    self.local.set(key, value)
                 return self._deserialize(value)
             return None
         except Exception as e:
+            cache_metrics.incr(key, "errors")
+            self._observe_get(key, started, False)
             logger.error(f"获取缓存失败 {key}: {e}")
             return None
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """设置缓存"""
-        if not self.redis:
-            return False
-
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """设置缓存，可同时登记到一个或多个标签下"""
+        tags = tuple(tags or ())
         try:
             serialized_value = self._serialize(value)
-            if ttl is None:
-                ttl = settings.CACHE_DEFAULT_TTL
+        except Exception as e:
+            cache_metrics.incr(key, "errors")
+            logger.error(f"序列化缓存失败 {key}: {e}")
+            return False
+        cache_metrics.incr(key, "sets")
+
+        if ttl is None:
+            ttl = settings.CACHE_DEFAULT_TTL
+
+        if self._is_local_key(key):
+            self.local.set(key, serialized_value, ttl, tags)
+
+        client = self.redis
+        if not client:
+            return self._is_local_key(key)
 
-            self.redis.setex(key, ttl, serialized_value)
+        try:
+            if not tags:
+                client.setex(key, ttl, serialized_value)
+                return True
+
+            pipe = client.pipeline(transaction=False)
+            pipe.setex(key, ttl, serialized_value)
+            for tag in tags:
+                tag_key = cache_tag_key(tag)
+                pipe.sadd(tag_key, key)
+                # 标签集合的存活时间不短于其成员
+                pipe.expire(tag_key, max(ttl, settings.CACHE_TAG_TTL))
+            pipe.execute()
             return True
         except Exception as e:
+            cache_metrics.incr(key, "errors")
             logger.error(f"设置缓存失败 {key}: {e}")
             return False
 
     def delete(self, key: str) -> bool:
-        """删除缓存"""
-        if not self.redis:
+        """删除缓存，并通知其他进程清除本地副本"""
+        cache_metrics.incr(key, "deletes")
+        self.local.delete(key)
+
+        client = self.redis
+        if not client:
             return False
 
         try:
-            self.redis.delete(key)
+            client.delete(key)
+            self._publish_invalidation(keys=[key])
             return True
         except Exception as e:
+            cache_metrics.incr(key, "errors")
             logger.error(f"删除缓存失败 {key}: {e}")
             return False
 
-    def delete_pattern(self, pattern: str) -> int:
-        """按模式删除缓存"""
-        if not self.redis:
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量获取缓存，本地层未命中的键通过一次MGET读取，只返回命中的键"""
+        started = time.perf_counter()
+        keys = list(dict.fromkeys(keys))
+        result: Dict[str, Any] = {}
+        remote_keys: List[str] = []
+        for key in keys:
+            value = self.local.get(key) if self._is_local_key(key) else None
+            if value is not None:
+                value = self._deserialize(value)
+            if value is not None:
+                cache_metrics.incr(key, "local_hits")
+                result[key] = value
+            else:
+                remote_keys.append(key)
+
+        client = self.redis if remote_keys else None
+        values: List[Any] = []
+        if client:
+            try:
+                values = client.mget(remote_keys)
+            except Exception as e:
+                cache_metrics.incr_many(remote_keys, "errors")
+                logger.error(f"批量获取缓存失败 {len(remote_keys)} 个键: {e}")
+
+        for key, value in zip(remote_keys, values):
+            if value is None:
+                continue
+            decoded = self._deserialize(value)
+            if decoded is None:
+                continue
+            if self._is_local_key(key):
+                self.local.set(key, value)
+            result[key] = decoded
+
+        cache_metrics.incr_many(result, "hits")
+        cache_metrics.incr_many((key for key in keys if key not in result), "misses")
+        cache_metrics.observe_get(keys, time.perf_counter() - started)
+        return result
+
+    def set_many(
+        self,
+        mapping: Dict[str, Any],
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
+        key_tags: Optional[Dict[str, Iterable[str]]] = None,
+    ) -> int:
+        """批量设置缓存，通过一个管道写入
+
+        tags为所有键共用的标签，key_tags为单个键额外登记的标签。
+        """
+        tags = tuple(tags or ())
+        key_tags = key_tags or {}
+        if ttl is None:
+            ttl = settings.CACHE_DEFAULT_TTL
+
+        serialized: Dict[str, bytes] = {}
+        for key, value in mapping.items():
+            try:
+                serialized[key] = self._serialize(value)
+            except Exception as e:
+                cache_metrics.incr(key, "errors")
+                logger.error(f"序列化缓存失败 {key}: {e}")
+        if not serialized:
             return 0
+        cache_metrics.incr_many(serialized, "sets")
+
+        # 按标签归并键，每个标签只需一次SADD
+        tag_members: Dict[str, List[str]] = {}
+        for key, value in serialized.items():
+            all_tags = tags + tuple(tag for tag in key_tags.get(key, ()) if tag)
+            for tag in all_tags:
+                tag_members.setdefault(tag, []).append(key)
+            if self._is_local_key(key):
+                self.local.set(key, value, ttl, all_tags)
+
+        client = self.redis
+        if not client:
+            return sum(1 for key in serialized if self._is_local_key(key))
 
         try:
-            keys = self.redis.keys(pattern)
-            if keys:
-                return self.redis.delete(*keys)
+            pipe = client.pipeline(transaction=False)
+            for key, value in serialized.items():
+                pipe.setex(key, ttl, value)
+            for tag, members in tag_members.items():
+                tag_key = cache_tag_key(tag)
+                pipe.sadd(tag_key, *members)
+                pipe.expire(tag_key, max(ttl, settings.CACHE_TAG_TTL))
+            pipe.execute()
+            return len(serialized)
+        except Exception as e:
+            cache_metrics.incr_many(serialized, "errors")
+            logger.error(f"批量设置缓存失败 {len(serialized)} 个键: {e}")
+            return 0
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """批量删除缓存，并通知其他进程清除本地副本"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
             return 0
+        cache_metrics.incr_many(keys, "deletes")
+        local_deleted = self.local.delete(*keys)
+
+        client = self.redis
+        if not client:
+            return local_deleted
+
+        try:
+            deleted = 0
+            for start in range(0, len(keys), SCAN_BATCH_SIZE):
+                deleted += client.unlink(*keys[start : start + SCAN_BATCH_SIZE])
+            self._publish_invalidation(keys=keys)
+            return deleted
+        except Exception as e:
+            cache_metrics.incr_many(keys, "errors")
+            logger.error(f"批量删除缓存失败 {len(keys)} 个键: {e}")
+            return 0
+
+    def delete_pattern(self, pattern: str) -> int:
+        """按模式删除缓存（SCAN增量遍历，仅用于运维清理，业务失效请使用标签）"""
+        local_deleted = self.local.delete_pattern(pattern)
+
+        client = self.redis
+        if not client:
+            return local_deleted
+
+        try:
+            deleted = 0
+            batch: List[Any] = []
+            for key in client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    deleted += client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += client.unlink(*batch)
+            # Redis中的键删除后再通知，避免其他进程从旧值回填本地缓存
+            self._publish_invalidation(pattern=pattern)
+            return deleted
         except Exception as e:
             logger.error(f"按模式删除缓存失败 {pattern}: {e}")
             return 0
 
+    def invalidate_tags(self, *tags: str) -> int:
+        """删除标签下登记的所有缓存，并广播给其他进程"""
+        tags = tuple(tag for tag in tags if tag)
+        if not tags:
+            return 0
+
+        local_deleted = self.local.delete_tags(*tags)
+
+        client = self.redis
+        if not client:
+            return local_deleted
+
+        try:
+            tag_keys = [cache_tag_key(tag) for tag in tags]
+            pipe = client.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = set()
+            for tag_members in pipe.execute():
+                members.update(tag_members or ())
+
+            keys = [
+                member.decode("utf-8") if isinstance(member, bytes) else member
+                for member in members
+            ]
+            cache_metrics.incr_many(keys, "deletes")
+            # 从Redis回填的本地副本没有标签信息，按成员键再清理一次
+            local_deleted += self.local.delete(*keys)
+
+            pipe = client.pipeline(transaction=False)
+            for start in range(0, len(keys), SCAN_BATCH_SIZE):
+                pipe.unlink(*keys[start : start + SCAN_BATCH_SIZE])
+            pipe.unlink(*tag_keys)
+            results = pipe.execute()
+            # Redis中的键删除后再通知，避免其他进程从旧值回填本地缓存
+            self._publish_invalidation(keys=keys, tags=tags)
+            return sum(results[:-1])
+        except Exception as e:
+            logger.error(f"按标签删除缓存失败 {tags}: {e}")
+            return 0
+
     def exists(self, key: str) -> bool:
         """检查缓存是否存在"""
-        if not self.redis:
+        if self._is_local_key(key) and self.local.get(key) is not None:
+            return True
+
+        client = self.redis
+        if not client:
             return False
 
         try:
-            return bool(self.redis.exists(key))
+            return bool(client.exists(key))
         except Exception as e:
             logger.error(f"检查缓存存在失败 {key}: {e}")
             return False
 
     def expire(self, key: str, ttl: int) -> bool:
         """设置缓存过期时间"""
-        if not self.redis:
+        client = self.redis
+        if not client:
             return False
 
         try:
-            return bool(self.redis.expire(key, ttl))
+            return bool(client.expire(key, ttl))
         except Exception as e:
             logger.error(f"设置缓存过期时间失败 {key}: {e}")
             return False
 
     def get_ttl(self, key: str) -> int:
         """获取缓存剩余时间"""
-        if not self.redis:
+        client = self.redis
+        if not client:
             return -1
 
         try:
-            return self.redis.ttl(key)
+            return client.ttl(key)
         except Exception as e:
             logger.error(f"获取缓存TTL失败 {key}: {e}")
             return -1
 
+    def acquire_lock(self, key: str, timeout: Optional[int] = None) -> Optional[Any]:
+        """非阻塞获取键级互斥锁，成功返回锁对象，已被占用返回None
+
+        Redis可用时使用SET NX锁，跨进程互斥；否则退化为进程内锁。
+        """
+        if timeout is None:
+            timeout = settings.CACHE_LOCK_TIMEOUT
+        lock_key = cache_lock_key(key)
+
+        client = self.redis
+        if client:
+            try:
+                # 锁可能在后台刷新线程中释放，令牌不能绑定线程
+                lock = client.lock(
+                    lock_key, timeout=timeout, blocking=False, thread_local=False
+                )
+                return lock if lock.acquire(blocking=False) else None
+            except Exception as e:
+                logger.error(f"获取缓存锁失败 {key}: {e}")
+
+        lock = self._process_locks.lock(lock_key, timeout=timeout, blocking=False)
+        return lock if lock.acquire(blocking=False) else None
+
+    def release_lock(self, lock: Any) -> None:
+        """释放互斥锁，锁已超时失效时忽略"""
+        try:
+            lock.release()
+        except Exception as e:
+            logger.warning(f"释放缓存锁失败 {lock.name}: {e}")
+
+    def is_locked(self, key: str) -> bool:
+        """检查键级互斥锁是否被持有"""
+        lock_key = cache_lock_key(key)
+        if self._process_locks.exists(lock_key):
+            return True
+
+        client = self.redis
+        if not client:
+            return False
+
+        try:
+            return bool(client.exists(lock_key))
+        except Exception as e:
+            logger.error(f"检查缓存锁失败 {key}: {e}")
+            return False
+
+    def clear_local(self) -> None:
+        """清空本进程的本地缓存"""
+        self.local.clear()
+
+    def clear_all(self) -> None:
+        """清空Redis和本进程的本地缓存，并通知其他进程清空本地缓存"""
+        self.clear_local()
+
+        client = self.redis
+        if not client:
+            return
+
+        client.flushdb()
+        self._publish_invalidation(clear=True)
+
+    def _publish_invalidation(
+        self,
+        keys: Optional[Iterable[str]] = None,
+        pattern: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+        clear: bool = False,
+    ) -> None:
+        """通过Redis发布订阅广播失效消息，clear为True时通知清空全部本地缓存"""
+        client = self.redis
+        if not client or not self.local_enabled:
+            return
+
+        message: Dict[str, Any] = {"origin": self.instance_id}
+        if keys:
+            message["keys"] = list(keys)
+        if pattern:
+            message["pattern"] = pattern
+        if tags:
+            message["tags"] = list(tags)
+        if clear:
+            message["clear"] = True
+
+        try:
+            client.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            logger.error(f"发布缓存失效消息失败: {e}")
+
+    def _handle_invalidation(self, data: Any) -> None:
+        """处理其他进程广播的失效消息"""
+        try:
+            message = json.loads(data)
+        except (json.JSONDecodeError, TypeError):
+            return
+
+        if message.get("origin") == self.instance_id:
+            return
+
+        if message.get("clear"):
+            self.local.clear()
+            return
+        keys = message.get("keys")
+        if keys:
+            self.local.delete(*keys)
+        pattern = message.get("pattern")
+        if pattern:
+            self.local.delete_pattern(pattern)
+        tags = message.get("tags")
+        if tags:
+            self.local.delete_tags(*tags)
+
+    def _listen_invalidation(self) -> None:
+        """订阅失效频道，断线后自动重连"""
+        while True:
+            client = self.redis
+            if not client:
+                # Redis熔断期间无法收到广播，本地副本依赖短TTL过期
+                time.sleep(1)
+                continue
+
+            pubsub = None
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._handle_invalidation(message.get("data"))
+            except Exception as e:
+                logger.warning(f"缓存失效订阅中断，稍后重连: {e}")
+                # 断线期间可能错过消息，清空本地缓存避免读到旧数据
+                self.local.clear()
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def start_invalidation_listener(self) -> bool:
+        """启动本地缓存失效监听线程（每个进程一个）"""
+        if not redis_client.enabled or not self.local_enabled:
+            return False
+        if self._listener is not None and self._listener.is_alive():
+            return True
+
+        self._listener = threading.Thread(
+            target=self._listen_invalidation,
+            name="cache-invalidation-listener",
+            daemon=True,
+        )
+        self._listener.start()
+        return True
+
 
 # 全局缓存管理器实例
 cache_manager = CacheManager()
 
 
+def cache_tag_key(tag: str) -> str:
+    """标签集合的Redis键"""
+    return f"tag:{tag}"
+
+
+def cache_lock_key(key: str) -> str:
+    """缓存键对应的单飞锁键"""
+    return f"lock:{key}"
+
+
+def cache_tag_menu() -> str:
+    """菜单缓存标签"""
+    return "menu"
+
+
+def cache_tag_department() -> str:
+    """部门缓存标签"""
+    return "department"
+
+
+def cache_tag_dictionary() -> str:
+    """字典缓存标签"""
+    return "dictionary"
+
+
+def cache_tag_user(user_id: int) -> str:
+    """单个用户缓存标签"""
+    return get_cache_key("user", user_id)
+
+
 def get_cache_key(prefix: str, *args) -> str:
     """生成缓存键"""
     return f"{prefix}:{':'.join(str(arg) for arg in args)}"
@@ -184,6 +924,16 @@ def cache_key_user_by_email(email: str) -> str:
     return get_cache_key("user:email", email)
 
 
+def cache_key_user_response(user_id: int) -> str:
+    """用户响应数据缓存键"""
+    return get_cache_key("user:response", user_id)
+
+
+def cache_key_order_id(prefix: str, day: str) -> str:
+    """工单号计数器键，每个前缀每天一个"""
+    return get_cache_key("order_id", prefix, day)
+
+
 def cache_key_menu_tree() -> str:
     """菜单树缓存键"""
     return "menu:tree"
@@ -194,6 +944,11 @@ def cache_key_menu_by_id(menu_id: int) -> str:
     return get_cache_key("menu", menu_id)
 
 
+def cache_key_dictionary_tree(type_id: int) -> str:
+    """字典级联树缓存键"""
+    return get_cache_key("dictionary:tree", type_id)
+
+
 def cache_key_dictionary_by_code(code: str) -> str:
     """字典缓存键"""
     return get_cache_key("dictionary", code)
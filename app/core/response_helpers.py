@@ -1,10 +1,20 @@
 """公共响应处理函数"""
 
-from typing import Any, Dict, List
+import base64
+import binascii
+import json
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from sqlalchemy import inspect, tuple_
+from sqlalchemy.orm import load_only
 
+from app.core.exceptions import ValidationError
 from app.models.user import User
+from app.schemas.base import to_camel_case
 
 
 def handle_api_exception(func):
@@ -51,3 +61,130 @@ def apply_pagination_filter(query, current: int, size: int):
     skip = (current - 1) * size
     total = query.count()
     return query.offset(skip).limit(size), total
+
+
+def encode_cursor(*values: Any) -> str:
+    """将排序键编码为不透明的分页游标"""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> List[Any]:
+    """解析分页游标，格式错误时抛出400异常"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != length:
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise ValidationError("无效的分页游标")
+
+
+def apply_keyset_pagination(
+    query, columns: Sequence[Any], cursor: Optional[str], size: int
+) -> Tuple[List[Any], Optional[str]]:
+    """按columns倒序的游标分页，返回 (当前页记录, 下一页游标)
+
+    cursor为空字符串时返回第一页；多取一条用于判断是否还有下一页，
+    不需要统计总数。columns最后一列应唯一（如主键），保证排序稳定。
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        query = query.filter(tuple_(*columns) < tuple_(*values))
+    rows = query.order_by(*(column.desc() for column in columns)).limit(size + 1).all()
+    return rows[:size], next_cursor(rows, columns, size)
+
+
+def next_cursor(rows: List[Any], columns: Sequence[Any], size: int) -> Optional[str]:
+    """根据多取一条的查询结果生成下一页游标，没有下一页时为None"""
+    if len(rows) <= size:
+        return None
+    last = rows[size - 1]
+    return encode_cursor(*(getattr(last, column.key) for column in columns))
+
+
+def parse_fields(
+    fields: Optional[str],
+    response_model: type,
+    extra: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    required: Sequence[str] = ("id",),
+) -> Optional[List[str]]:
+    """解析fields参数（逗号分隔，驼峰或下划线命名），返回字段名列表
+
+    未传入时返回None表示返回全部字段；required中的字段始终包含，
+    extra为响应模型之外额外支持的字段，不支持的字段抛出400异常。
+    """
+    if not fields:
+        return None
+
+    available = {}
+    for name, info in response_model.model_fields.items():
+        if name not in exclude:
+            available[name] = name
+            available[info.alias or name] = name
+    for name in extra:
+        available[name] = name
+        available[to_camel_case(name)] = name
+
+    selected = list(required)
+    unknown = []
+    for raw in fields.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        name = available.get(raw)
+        if name is None:
+            unknown.append(raw)
+        elif name not in selected:
+            selected.append(name)
+    if unknown:
+        raise ValidationError(f"不支持的字段: {', '.join(unknown)}")
+    return selected
+
+
+def load_only_fields(model, field_names: Sequence[str]):
+    """按字段名生成load_only选项，只查询表中存在的列"""
+    column_keys = set(inspect(model).local_table.columns.keys())
+    return load_only(
+        *(getattr(model, name) for name in field_names if name in column_keys)
+    )
+
+
+@lru_cache(maxsize=None)
+def partial_model(response_model: type) -> type:
+    """字段全部可选的响应模型，沿用原模型的序列化规则"""
+    fields = {
+        name: (Optional[info.annotation], None)
+        for name, info in response_model.model_fields.items()
+    }
+    return create_model(
+        f"Partial{response_model.__name__}", __base__=response_model, **fields
+    )
+
+
+def dump_fields(
+    obj: Any, response_model: type, field_names: Sequence[str]
+) -> Dict[str, Any]:
+    """只读取、校验并序列化指定字段，未加载的列不会被访问"""
+    names = [name for name in field_names if name in response_model.model_fields]
+    data = {name: getattr(obj, name) for name in names}
+    partial = partial_model(response_model).model_validate(data)
+    return partial.model_dump(include=set(names))
+
+
+def dump_response_fields(
+    response: BaseModel, field_names: Optional[Sequence[str]]
+) -> Dict[str, Any]:
+    """按字段名裁剪已构建的响应模型，未指定字段时返回全部"""
+    if field_names is None:
+        return response.model_dump()
+    return response.model_dump(include=set(field_names))
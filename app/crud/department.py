@@ -1,10 +1,13 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 
 from sqlalchemy.orm import Session
 
 from app.core.cache_decorators import cached
+from app.core.config import settings
 from app.core.crud import CRUDBase
-from app.models.department import Department
+from app.core.redis_client import cache_tag_department
+from app.crud.user import user_crud
+from app.models.department import Department, DepartmentLeader, UserDepartment
 
 
 class CRUDDepartment(CRUDBase[Department]):
@@ -26,20 +29,19 @@ class CRUDDepartment(CRUDBase[Department]):
 
 
     @cached(
-        lambda db, parent_id=None: f"department:tree:{parent_id or 'root'}",
+        lambda self, db, parent_id=None: f"department:tree:{parent_id or 'root'}",
         ttl=7200,
+        tags=[cache_tag_department()],
+        single_flight=True,
+        stale_ttl=settings.CACHE_STALE_TTL,
     )
     def get_tree(self, db: Session, parent_id: Optional[int] = None) -> List[Department]:
         """获取部门树形结构（带缓存）"""
-        query = db.query(self.model).filter(self.model.parent_id == parent_id)
-        departments = query.order_by(self.model.sort_order).all()
-
-        for dept in departments:
-            children = self.get_tree(db, dept.id)
-            if children:
-                dept.children = children
-
-        return departments
+        # 一次查询全部部门后组装，缓存快照中即包含完整的子树
+        departments = (
+            db.query(self.model).order_by(self.model.sort_order, self.model.id).all()
+        )
+        return self._build_tree(departments, parent_id)
 
     def get_all_departments(self, db: Session) -> List[Department]:
         """获取所有部门（树形结构）"""
@@ -53,6 +55,15 @@ class CRUDDepartment(CRUDBase[Department]):
             Department.id == dept_id
         ).all()
 
+    def get_user_ids_by_dept(self, db: Session, dept_id: int) -> List[int]:
+        """获取部门下的用户ID"""
+        return [
+            user_id
+            for (user_id,) in db.query(UserDepartment.user_id).filter(
+                UserDepartment.dept_id == dept_id
+            )
+        ]
+
     def update_parent_status(self, db: Session, dept_id: int):
         """根据子部门的status状态更新父部门的status状态"""
         # 获取当前部门
@@ -104,7 +115,7 @@ class CRUDDepartment(CRUDBase[Department]):
         db.commit()
         db.refresh(dept)
         
-        self._invalidate_department_cache()
+        self._invalidate_department_cache(leader_ids + member_ids)
         return dept
 
     def update(self, db: Session, db_obj: Department, obj_in: dict) -> Department:
@@ -112,6 +123,8 @@ class CRUDDepartment(CRUDBase[Department]):
         # 提取负责人ID列表和成员ID列表
         leader_ids = obj_in.pop('leader_ids', None)
         member_ids = obj_in.pop('member_ids', None)
+        # 部门名称和成员变化前后涉及的用户都需要清除缓存
+        user_ids = self._related_user_ids(db, db_obj.id)
         
         # 更新部门基本信息（不提交事务）
         for field, value in obj_in.items():
@@ -130,7 +143,8 @@ class CRUDDepartment(CRUDBase[Department]):
         db.commit()
         db.refresh(db_obj)
         
-        self._invalidate_department_cache()
+        user_ids |= set(leader_ids or ()) | set(member_ids or ())
+        self._invalidate_department_cache(user_ids)
         return db_obj
 
     def delete(self, db: Session, db_obj: Department) -> None:
@@ -184,12 +198,24 @@ class CRUDDepartment(CRUDBase[Department]):
         if member_ids:
             self._add_members(db, dept_id, member_ids)
 
-    def _invalidate_department_cache(self):
-        """清除部门相关缓存"""
+    def _related_user_ids(self, db: Session, dept_id: int) -> Set[int]:
+        """部门成员和负责人的用户ID"""
+        members = db.query(UserDepartment.user_id).filter(
+            UserDepartment.dept_id == dept_id
+        )
+        leaders = db.query(DepartmentLeader.user_id).filter(
+            DepartmentLeader.dept_id == dept_id
+        )
+        return {user_id for (user_id,) in members.union(leaders)}
+
+    def _invalidate_department_cache(self, user_ids: Iterable[int] = ()):
+        """清除部门相关缓存，user_ids为部门名称或成员变化涉及的用户"""
         from app.core.redis_client import cache_manager
 
         # 清除部门树缓存
-        cache_manager.delete_pattern("department:tree:*")
+        cache_manager.invalidate_tags(cache_tag_department())
+        # 用户缓存中包含部门名称，只失效相关用户
+        user_crud.invalidate_users(user_ids)
 
 
 department_crud = CRUDDepartment(Department)
@@ -1,9 +1,20 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache_decorators import cached
+from app.core.config import settings
 from app.core.crud import CRUDBase
+from app.core.redis_client import cache_key_dictionary_tree, cache_tag_dictionary
 from app.models.dictionary import DictionaryEnum, DictionaryType
 
 
+def _invalidate_dictionary_cache():
+    """清除字典相关缓存"""
+    from app.core.redis_client import cache_manager
+
+    cache_manager.invalidate_tags(cache_tag_dictionary())
+
+
 class CRUDDictionaryType(CRUDBase[DictionaryType]):
     """字典类型 CRUD 操作"""
 
@@ -15,6 +26,11 @@ class CRUDDictionaryType(CRUDBase[DictionaryType]):
         """根据名称获取字典类型"""
         return db.query(self.model).filter(self.model.name == name).first()
 
+    def delete(self, db: Session, db_obj: DictionaryType) -> None:
+        """删除字典类型"""
+        super().delete(db, db_obj)
+        _invalidate_dictionary_cache()
+
 
 class CRUDDictionaryEnum(CRUDBase[DictionaryEnum]):
     """字典枚举 CRUD 操作"""
@@ -79,23 +95,29 @@ class CRUDDictionaryEnum(CRUDBase[DictionaryEnum]):
             .all()
         )
 
+    @cached(
+        lambda self, db, type_id: cache_key_dictionary_tree(type_id),
+        ttl=settings.CACHE_DICTIONARY_TTL,
+        tags=[cache_tag_dictionary()],
+        single_flight=True,
+        stale_ttl=settings.CACHE_STALE_TTL,
+    )
     def build_cascade_tree(self, db: Session, type_id: int):
         """构建级联树结构"""
         all_enums = self.get_cascade_by_type_id(db, type_id)
-        enum_map = {enum.id: enum for enum in all_enums}
+        children_map = {enum.id: [] for enum in all_enums}
 
         tree = []
         for enum in all_enums:
-            enum.children = []
-            enum.hasChildren = False
-
             if enum.parent_id is None:
                 tree.append(enum)
-            else:
-                parent = enum_map.get(enum.parent_id)
-                if parent:
-                    parent.children.append(enum)
-                    parent.hasChildren = True
+            elif enum.parent_id in children_map:
+                children_map[enum.parent_id].append(enum)
+
+        for enum in all_enums:
+            # 以已加载状态写入children，避免整棵树被会话标记为已修改
+            set_committed_value(enum, "children", children_map[enum.id])
+            enum.hasChildren = bool(children_map[enum.id])
 
         # 对树结构进行排序
         def sort_tree(nodes):
@@ -109,10 +131,28 @@ class CRUDDictionaryEnum(CRUDBase[DictionaryEnum]):
         sort_tree(tree)
         return tree
 
+    def create(self, db: Session, obj_in: dict) -> DictionaryEnum:
+        """创建字典枚举"""
+        enum_obj = super().create(db, obj_in)
+        _invalidate_dictionary_cache()
+        return enum_obj
+
+    def update(self, db: Session, db_obj: DictionaryEnum, obj_in: dict):
+        """更新字典枚举"""
+        enum_obj = super().update(db, db_obj, obj_in)
+        _invalidate_dictionary_cache()
+        return enum_obj
+
+    def delete(self, db: Session, db_obj: DictionaryEnum) -> None:
+        """删除字典枚举"""
+        super().delete(db, db_obj)
+        _invalidate_dictionary_cache()
+
     def delete_by_type_id(self, db: Session, type_id: int):
         """根据类型ID删除所有字典枚举"""
         db.query(self.model).filter(self.model.type_id == type_id).delete()
         db.commit()
+        _invalidate_dictionary_cache()
 
     def delete_cascade(self, db: Session, enum_id: int):
         """级联删除字典枚举及其所有子级"""
@@ -125,6 +165,7 @@ class CRUDDictionaryEnum(CRUDBase[DictionaryEnum]):
         # 删除当前枚举
         db.delete(enum_obj)
         db.commit()
+        _invalidate_dictionary_cache()
 
     def _delete_children_recursive(self, db: Session, parent_id: int):
         """递归删除所有子级枚举"""
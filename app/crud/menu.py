@@ -1,10 +1,11 @@
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.core.cache_decorators import cached
+from app.core.config import settings
 from app.core.crud import CRUDBase
-from app.core.redis_client import cache_key_menu_tree
+from app.core.redis_client import cache_key_menu_tree, cache_tag_menu
 from app.models.menu import Menu
 
 
@@ -42,20 +43,24 @@ class CRUDMenu(CRUDBase[Menu]):
         return db.query(self.model).filter(self.model.path == path).first()
 
     @cached(
-        lambda db, parent_id=None: f"{cache_key_menu_tree()}:{parent_id or 'root'}",
+        lambda self, db, parent_id=None: (
+            f"{cache_key_menu_tree()}:{parent_id or 'root'}"
+        ),
         ttl=7200,
+        tags=[cache_tag_menu()],
+        single_flight=True,
+        stale_ttl=settings.CACHE_STALE_TTL,
     )
     def get_tree(self, db: Session, parent_id: Optional[int] = None) -> List[Menu]:
         """获取菜单树形结构（带缓存）"""
-        query = db.query(self.model).filter(self.model.parent_id == parent_id)
-        menus = query.order_by(self.model.sort).all()
-
-        for menu in menus:
-            children = self.get_tree(db, menu.id)
-            if children:
-                menu.children = children
-
-        return menus
+        # 一次查询全部菜单并预加载角色，缓存快照中即包含完整的子树和角色
+        menus = (
+            db.query(self.model)
+            .options(selectinload(self.model.roles))
+            .order_by(self.model.sort, self.model.id)
+            .all()
+        )
+        return self._build_tree(menus, parent_id)
 
     def get_all_menus(self, db: Session) -> List[Menu]:
         """获取所有菜单（树形结构）"""
@@ -125,7 +130,7 @@ class CRUDMenu(CRUDBase[Menu]):
         from app.core.redis_client import cache_manager
 
         # 清除菜单树缓存
-        cache_manager.delete_pattern("menu:tree:*")
+        cache_manager.invalidate_tags(cache_tag_menu())
 
 
 menu_crud = CRUDMenu(Menu)
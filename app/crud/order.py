@@ -1,25 +1,323 @@
 import random
+import re
 import time
 from datetime import datetime
-from typing import Optional
-
-from sqlalchemy import desc
-from sqlalchemy.orm import Session, joinedload
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError as SchemaValidationError
+from sqlalchemy import desc, func, insert, literal, select, union_all
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import (
+    Session,
+    joinedload,
+    noload,
+    selectinload,
+)
+from sqlalchemy.orm.exc import StaleDataError
 
+from app.core.config import settings
 from app.core.crud import CRUDBase
-from app.core.exceptions import CRMException
+from app.core.crud_helpers import commit_without_expire
+from app.core.exceptions import CRMException, ValidationError
 from app.core.id_generator import order_id_generator
+from app.core.response_helpers import load_only_fields
 from app.models.order import (
+    ORDER_SEARCH_CONFIG,
     ExternalOrder,
     ExternalOrderDetail,
     InternalOrder,
     InternalOrderDetail,
 )
+from app.schemas.dictionary import BatchImportResult
+from app.schemas.order import (
+    ExternalOrderCreate,
+    ExternalOrderUpdate,
+    InternalOrderCreate,
+    InternalOrderUpdate,
+)
+
+
+class OrderBatchMixin:
+    """工单批量写入：导入、批量创建和批量更新，均在一个事务中提交
+
+    新建的工单每批整段分配ID后批量插入。
+    """
+
+    create_schema = None
+    update_schema = None
+    detail_model = None
+    id_prefix = None
+
+    def _normalize_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Excel中的数字单元格写入文本字段时转为字符串（如纯数字的联系方式）"""
+        fields = self.create_schema.model_fields
+        for name, value in record.items():
+            field = fields.get(name)
+            if (
+                field is not None
+                and field.annotation in (str, Optional[str])
+                and isinstance(value, (int, float))
+                and not isinstance(value, bool)
+            ):
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                record[name] = str(value)
+        return record
+
+    def _split_record(
+        self, data: Dict[str, Any], created_by: Optional[int] = None
+    ) -> Tuple[dict, dict]:
+        """拆分为主工单数据和详情数据
+
+        两边都有的列（主工单上冗余的备件所属库位）同时写入主工单和详情。
+        """
+        order_columns = self.model.__table__.columns.keys()
+        detail_columns = self.detail_model.__table__.columns.keys()
+        order_data = {} if created_by is None else {"created_by": created_by}
+        detail_data = {}
+        for name, value in data.items():
+            if name in order_columns:
+                order_data[name] = value
+            if name in detail_columns:
+                detail_data[name] = value
+        return order_data, detail_data
+
+    @staticmethod
+    def _format_errors(
+        error: SchemaValidationError, schema, titles: Optional[Dict[str, str]] = None
+    ) -> str:
+        """校验错误信息，指定titles时字段名转换为表头名称"""
+        names = {info.alias or name: name for name, info in schema.model_fields.items()}
+        messages = []
+        for item in error.errors():
+            field = str(item["loc"][0]) if item["loc"] else ""
+            if titles:
+                field = titles.get(names.get(field, field), field)
+            messages.append(f"{field}: {item['msg']}")
+        return "; ".join(messages)
+
+    def bulk_create_with_details(
+        self, db: Session, records: List[Tuple[dict, dict]]
+    ) -> List[str]:
+        """整段分配工单ID，批量插入工单和详情记录（不提交事务）"""
+        if not records:
+            return []
+        order_ids = order_id_generator.generate_order_ids(
+            db, self.id_prefix, len(records)
+        )
+        order_rows = []
+        detail_rows = []
+        for order_id, (order_data, detail_data) in zip(order_ids, records):
+            order_rows.append({**order_data, "id": order_id})
+            detail_rows.append({**detail_data, "order_id": order_id})
+        db.execute(insert(self.model), order_rows)
+        db.execute(insert(self.detail_model), detail_rows)
+        return order_ids
+
+    def batch_import(
+        self,
+        db: Session,
+        records: Iterable[Tuple[int, Dict[str, Any]]],
+        created_by: int,
+        titles: Optional[Dict[str, str]] = None,
+    ) -> BatchImportResult:
+        """批量导入工单，records为 (行号, 字段字典)
+
+        校验失败的行记录到错误列表并跳过，其余行全部导入；写入数据库失败时
+        整体回滚。
+        """
+        titles = titles or {}
+        errors = []
+        batch = []
+        success_count = 0
+        total = 0
+        try:
+            for row_number, record in records:
+                total += 1
+                if total > settings.IMPORT_MAX_ROWS:
+                    raise ValidationError(
+                        f"单次最多导入 {settings.IMPORT_MAX_ROWS} 条工单，请拆分文件"
+                    )
+                try:
+                    item = self.create_schema.model_validate(
+                        self._normalize_record(record)
+                    )
+                except SchemaValidationError as e:
+                    message = self._format_errors(e, self.create_schema, titles)
+                    errors.append({"row": row_number, "message": message})
+                    continue
+
+                batch.append(
+                    self._split_record(item.model_dump(by_alias=False), created_by)
+                )
+                if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                    success_count += len(self.bulk_create_with_details(db, batch))
+                    batch = []
+
+            success_count += len(self.bulk_create_with_details(db, batch))
+            db.commit()
+        except HTTPException:
+            db.rollback()
+            raise
+        except Exception as e:
+            db.rollback()
+            return BatchImportResult(
+                success=False,
+                message=f"导入失败，已全部回滚: {str(e)}",
+                success_count=0,
+                fail_count=total,
+                errors=errors,
+            )
+
+        fail_count = len(errors)
+        if total == 0:
+            message = "文件中没有可导入的数据"
+        elif fail_count == 0:
+            message = f"导入成功，共导入 {success_count} 条数据"
+        else:
+            message = f"导入完成，成功 {success_count} 条，失败 {fail_count} 条"
+        return BatchImportResult(
+            success=fail_count == 0,
+            message=message,
+            success_count=success_count,
+            fail_count=fail_count,
+            errors=errors,
+        )
+
+    def batch_create(
+        self, db: Session, items: List[Dict[str, Any]], created_by: int
+    ) -> List[Dict[str, Any]]:
+        """批量创建工单（含详情），返回每一项的结果
+
+        校验失败的项不创建；其余项整段分配ID后批量插入，一次提交，
+        写入失败时整体回滚并抛出异常。
+        """
+        results = []
+        records = []
+        indexes = []
+        for index, item in enumerate(items):
+            try:
+                order_in = self.create_schema.model_validate(item)
+            except SchemaValidationError as e:
+                message = self._format_errors(e, self.create_schema)
+                results.append({"index": index, "success": False, "message": message})
+                continue
+            records.append(
+                self._split_record(order_in.model_dump(by_alias=False), created_by)
+            )
+            indexes.append(index)
+
+        try:
+            order_ids = []
+            for start in range(0, len(records), settings.ORDER_BATCH_FLUSH_SIZE):
+                batch = records[start : start + settings.ORDER_BATCH_FLUSH_SIZE]
+                order_ids.extend(self.bulk_create_with_details(db, batch))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
 
+        results.extend(
+            {"index": index, "success": True, "id": order_id}
+            for index, order_id in zip(indexes, order_ids)
+        )
+        return sorted(results, key=lambda result: result["index"])
+
+    @staticmethod
+    def _batch_item_id(item: Any) -> Optional[str]:
+        """批量更新项的工单号，缺失或不是非空字符串时返回None"""
+        order_id = item.get("id") if isinstance(item, dict) else None
+        if isinstance(order_id, str) and order_id:
+            return order_id
+        return None
+
+    def batch_update(
+        self,
+        db: Session,
+        items: List[Dict[str, Any]],
+        permission_filter: Optional[List[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """批量更新工单（含详情），每项需包含id，返回每一项的结果
+
+        目标工单及其详情一次查询加载，按批flush，一次提交；
+        带version的项版本号不一致时跳过；写入失败时整体回滚并抛出异常。
+        """
+        item_ids = [self._batch_item_id(item) for item in items]
+        order_ids = {order_id for order_id in item_ids if order_id is not None}
+        orders = {
+            order.id: order
+            for order in db.query(self.model)
+            .options(selectinload(self.model.details))
+            .filter(self.model.id.in_(order_ids))
+        }
+
+        results = []
+        pending = 0
+        try:
+            for index, (item, order_id) in enumerate(zip(items, item_ids)):
+                result = {"index": index, "id": order_id, "success": False}
+                results.append(result)
+                if order_id is None:
+                    result["message"] = "工单号必须为非空字符串"
+                    continue
+                order = orders.get(order_id)
+                if order is None:
+                    result["message"] = "工单未找到"
+                    continue
+                if (
+                    permission_filter is not None
+                    and order.created_by not in permission_filter
+                ):
+                    result["message"] = "无权限修改该工单"
+                    continue
+                try:
+                    order_in = self.update_schema.model_validate(item)
+                except SchemaValidationError as e:
+                    result["message"] = self._format_errors(e, self.update_schema)
+                    continue
+
+                data = order_in.model_dump(exclude_unset=True, by_alias=False)
+                version = data.pop("version", None)
+                if version is not None and version != order.version:
+                    result["message"] = STALE_ORDER_MESSAGE
+                    continue
+
+                order_data, detail_data = self._split_record(data)
+                for field, value in order_data.items():
+                    setattr(order, field, value)
+                if detail_data:
+                    if order.details:
+                        detail = min(order.details, key=lambda item: item.id)
+                        for field, value in detail_data.items():
+                            setattr(detail, field, value)
+                    else:
+                        order.details.append(self.detail_model(**detail_data))
+                    touch_order(order)
+                result["success"] = True
+
+                pending += 1
+                if pending >= settings.ORDER_BATCH_FLUSH_SIZE:
+                    db.flush()
+                    pending = 0
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            raise CRMException(status_code=409, detail=STALE_ORDER_MESSAGE)
+        except Exception:
+            db.rollback()
+            raise
+        return results
 
-class InternalOrderCRUD(CRUDBase[InternalOrder]):
+
+class InternalOrderCRUD(OrderBatchMixin, CRUDBase[InternalOrder]):
     """保内工单CRUD操作"""
 
+    create_schema = InternalOrderCreate
+    update_schema = InternalOrderUpdate
+    detail_model = InternalOrderDetail
+    id_prefix = "BN"
+
     def generate_order_id_safe(self, db: Session, max_retries: int = 5) -> str:
         """并发安全的保内工单ID生成：BN + 年月日 + 4位自增"""
         today = datetime.now().strftime("%Y%m%d")
@@ -65,24 +363,7 @@ class InternalOrderCRUD(CRUDBase[InternalOrder]):
 
     def create(self, db: Session, obj_in: dict) -> InternalOrder:
         """创建保内工单（使用并发安全的ID生成）"""
-        try:
-            order_id = order_id_generator.generate_internal_order_id(db)
-            obj_in["id"] = order_id
-            return super().create(db, obj_in)
-        except Exception as e:
-            db.rollback()
-            if (
-                "unique constraint" in str(e).lower()
-                or "duplicate key" in str(e).lower()
-            ):
-                # ID冲突，使用备用策略重试
-                order_id = order_id_generator.generate_with_timestamp("BN")
-                obj_in["id"] = order_id
-                return super().create(db, obj_in)
-            else:
-                raise CRMException(
-                    status_code=500, detail=f"创建保内工单失败: {str(e)}"
-                )
+        return self.create_with_details(db, obj_in)
 
     def get_by_id(self, db: Session, order_id: str) -> Optional[InternalOrder]:
         """根据工单ID获取保内工单"""
@@ -91,49 +372,55 @@ class InternalOrderCRUD(CRUDBase[InternalOrder]):
     def create_with_details(
         self, db: Session, order_data: dict, detail_data: dict = None
     ) -> InternalOrder:
-        """创建工单并关联详情记录"""
-        # 创建主工单
-        order = self.create(db, order_data)
-
-        # 如果有详情数据，创建详情记录
+        """创建工单并关联详情记录，一次flush、一次提交
+
+        创建时间等服务端默认值通过RETURNING取回，提交后不refresh，
+        返回的工单及详情均为内存中的状态。
+        """
+        # 新工单没有更新时间，显式置空，flush后不必再查询该列
+        order = InternalOrder(**order_data, update_time=None)
+        order.details = []
         if detail_data:
-            detail_data["order_id"] = order.id
-            detail = InternalOrderDetail(**detail_data)
-            db.add(detail)
-            db.commit()
-            db.refresh(detail)
-
-        return order
+            order.details.append(InternalOrderDetail(**detail_data, update_time=None))
+            order.spare_part_location = detail_data.get("spare_part_location")
+        return insert_order(
+            db, order, order_id_generator.generate_internal_order_id, "保内"
+        )
 
     def update_with_details(
-        self, db: Session, order_id: str, order_data: dict, detail_data: dict = None
+        self,
+        db: Session,
+        order_id: str,
+        order_data: dict,
+        detail_data: dict = None,
+        version: Optional[int] = None,
     ) -> Optional[InternalOrder]:
-        """更新工单并关联详情记录"""
-        # 更新主工单
-        order = self.get_by_id(db, order_id)
+        """更新工单并关联详情记录，一次flush、一次提交
+
+        工单和详情在一次查询中加载，更新时间通过RETURNING取回，提交后不refresh。
+        传入version时校验版本号，工单已被他人修改时返回409。
+        """
+        order = self.get_with_details(db, order_id)
         if not order:
             return None
+        check_order_version(order, version)
 
         for field, value in order_data.items():
             setattr(order, field, value)
 
-        # 更新或创建详情记录
+        # 更新首条详情记录，没有时创建
         if detail_data:
-            detail = (
-                db.query(InternalOrderDetail)
-                .filter(InternalOrderDetail.order_id == order_id)
-                .first()
-            )
-            if detail:
+            if order.details:
+                detail = min(order.details, key=lambda item: item.id)
                 for field, value in detail_data.items():
                     setattr(detail, field, value)
             else:
-                detail_data["order_id"] = order_id
-                detail = InternalOrderDetail(**detail_data)
-                db.add(detail)
+                order.details.append(InternalOrderDetail(**detail_data))
+            if "spare_part_location" in detail_data:
+                order.spare_part_location = detail_data["spare_part_location"]
+            touch_order(order)
 
-        db.commit()
-        db.refresh(order)
+        commit_order_update(db)
         return order
 
     def get_with_details(self, db: Session, order_id: str) -> Optional[InternalOrder]:
@@ -146,9 +433,14 @@ class InternalOrderCRUD(CRUDBase[InternalOrder]):
         )
 
 
-class ExternalOrderCRUD(CRUDBase[ExternalOrder]):
+class ExternalOrderCRUD(OrderBatchMixin, CRUDBase[ExternalOrder]):
     """保外工单CRUD操作"""
 
+    create_schema = ExternalOrderCreate
+    update_schema = ExternalOrderUpdate
+    detail_model = ExternalOrderDetail
+    id_prefix = "BW"
+
     def generate_order_id_safe(self, db: Session, max_retries: int = 5) -> str:
         """并发安全的保外工单ID生成：BW + 年月日 + 4位自增"""
         today = datetime.now().strftime("%Y%m%d")
@@ -200,24 +492,7 @@ class ExternalOrderCRUD(CRUDBase[ExternalOrder]):
 
     def create(self, db: Session, obj_in: dict) -> ExternalOrder:
         """创建保外工单（使用并发安全的ID生成）"""
-        try:
-            order_id = order_id_generator.generate_external_order_id(db)
-            obj_in["id"] = order_id
-            return super().create(db, obj_in)
-        except Exception as e:
-            db.rollback()
-            if (
-                "unique constraint" in str(e).lower()
-                or "duplicate key" in str(e).lower()
-            ):
-                # ID冲突，使用备用策略重试
-                order_id = order_id_generator.generate_with_timestamp("BW")
-                obj_in["id"] = order_id
-                return super().create(db, obj_in)
-            else:
-                raise CRMException(
-                    status_code=500, detail=f"创建保外工单失败: {str(e)}"
-                )
+        return self.create_with_details(db, obj_in)
 
     def get_by_id(self, db: Session, order_id: str) -> Optional[ExternalOrder]:
         """根据工单ID获取保外工单"""
@@ -226,49 +501,55 @@ class ExternalOrderCRUD(CRUDBase[ExternalOrder]):
     def create_with_details(
         self, db: Session, order_data: dict, detail_data: dict = None
     ) -> ExternalOrder:
-        """创建工单并关联详情记录"""
-        # 创建主工单
-        order = self.create(db, order_data)
-
-        # 如果有详情数据，创建详情记录
+        """创建工单并关联详情记录，一次flush、一次提交
+
+        创建时间等服务端默认值通过RETURNING取回，提交后不refresh，
+        返回的工单及详情均为内存中的状态。
+        """
+        # 新工单没有更新时间，显式置空，flush后不必再查询该列
+        order = ExternalOrder(**order_data, update_time=None)
+        order.details = []
         if detail_data:
-            detail_data["order_id"] = order.id
-            detail = ExternalOrderDetail(**detail_data)
-            db.add(detail)
-            db.commit()
-            db.refresh(detail)
-
-        return order
+            order.details.append(ExternalOrderDetail(**detail_data, update_time=None))
+            order.spare_part_location = detail_data.get("spare_part_location")
+        return insert_order(
+            db, order, order_id_generator.generate_external_order_id, "保外"
+        )
 
     def update_with_details(
-        self, db: Session, order_id: str, order_data: dict, detail_data: dict = None
+        self,
+        db: Session,
+        order_id: str,
+        order_data: dict,
+        detail_data: dict = None,
+        version: Optional[int] = None,
     ) -> Optional[ExternalOrder]:
-        """更新工单并关联详情记录"""
-        # 更新主工单
-        order = self.get_by_id(db, order_id)
+        """更新工单并关联详情记录，一次flush、一次提交
+
+        工单和详情在一次查询中加载，更新时间通过RETURNING取回，提交后不refresh。
+        传入version时校验版本号，工单已被他人修改时返回409。
+        """
+        order = self.get_with_details(db, order_id)
         if not order:
             return None
+        check_order_version(order, version)
 
         for field, value in order_data.items():
             setattr(order, field, value)
 
-        # 更新或创建详情记录
+        # 更新首条详情记录，没有时创建
         if detail_data:
-            detail = (
-                db.query(ExternalOrderDetail)
-                .filter(ExternalOrderDetail.order_id == order_id)
-                .first()
-            )
-            if detail:
+            if order.details:
+                detail = min(order.details, key=lambda item: item.id)
                 for field, value in detail_data.items():
                     setattr(detail, field, value)
             else:
-                detail_data["order_id"] = order_id
-                detail = ExternalOrderDetail(**detail_data)
-                db.add(detail)
+                order.details.append(ExternalOrderDetail(**detail_data))
+            if "spare_part_location" in detail_data:
+                order.spare_part_location = detail_data["spare_part_location"]
+            touch_order(order)
 
-        db.commit()
-        db.refresh(order)
+        commit_order_update(db)
         return order
 
     def get_with_details(self, db: Session, order_id: str) -> Optional[ExternalOrder]:
@@ -283,3 +564,120 @@ class ExternalOrderCRUD(CRUDBase[ExternalOrder]):
 
 internal_order_crud = InternalOrderCRUD(InternalOrder)
 external_order_crud = ExternalOrderCRUD(ExternalOrder)
+
+
+STALE_ORDER_MESSAGE = "工单已被他人修改，请刷新后重试"
+
+
+def check_order_version(order, version: Optional[int]) -> None:
+    """校验客户端回传的版本号"""
+    if version is not None and version != order.version:
+        raise CRMException(status_code=409, detail=STALE_ORDER_MESSAGE)
+
+
+def touch_order(order) -> None:
+    """详情属于工单的一部分，只改详情时也更新主工单，使版本号递增"""
+    order.update_time = func.now()
+
+
+def commit_order_update(db: Session) -> None:
+    """提交工单更新，并发修改导致版本号不一致时返回409"""
+    try:
+        commit_without_expire(db)
+    except StaleDataError:
+        db.rollback()
+        raise CRMException(status_code=409, detail=STALE_ORDER_MESSAGE)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def insert_order(db: Session, order, generate_id, label: str):
+    """分配工单号并插入工单及其详情，主键冲突时换一个工单号重试一次"""
+    for attempt in range(2):
+        order.id = generate_id(db)
+        db.add(order)
+        try:
+            commit_without_expire(db)
+            return order
+        except Exception as e:
+            db.rollback()
+            conflict = (
+                "unique constraint" in str(e).lower()
+                or "duplicate key" in str(e).lower()
+            )
+            if not conflict or attempt:
+                raise CRMException(
+                    status_code=500, detail=f"创建{label}工单失败: {str(e)}"
+                )
+
+
+def order_list_options(model, field_names: Optional[List[str]] = None) -> tuple:
+    """列表查询选项：不加载详情记录，备件所属库位直接读取主工单上的冗余列
+
+    指定field_names时只查询这些列（分页排序使用的create_time、id始终查询）。
+    """
+    options = [noload(model.details)]
+    if field_names is not None:
+        options.append(load_only_fields(model, ["id", "create_time", *field_names]))
+    return tuple(options)
+
+
+# 全文检索结果返回的列
+SEARCH_RESULT_COLUMNS = (
+    "id",
+    "customer",
+    "vehicle_model",
+    "repair_shop",
+    "reporter_name",
+    "vin_number",
+    "license_plate",
+    "fault_description",
+    "report_date",
+    "create_time",
+)
+
+
+def build_search_tsquery(keyword: str) -> Optional[str]:
+    """将检索关键字转换为前缀匹配的tsquery，多个关键字需同时命中"""
+    terms = re.sub(r"[&|!():*<>'\\]", " ", keyword or "").split()
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def search_orders(
+    db: Session,
+    keyword: str,
+    permission_filter: Optional[List[int]] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> Tuple[List[Row], int]:
+    """在保内、保外工单中全文检索，按相关度排序，返回 (当前页记录, 总数)"""
+    tsquery_text = build_search_tsquery(keyword)
+    if tsquery_text is None:
+        return [], 0
+    tsquery = func.to_tsquery(ORDER_SEARCH_CONFIG, tsquery_text)
+
+    selects = []
+    for order_type, model in (("internal", InternalOrder), ("external", ExternalOrder)):
+        stmt = select(
+            literal(order_type).label("order_type"),
+            *(getattr(model, column) for column in SEARCH_RESULT_COLUMNS),
+            func.ts_rank_cd(model.search_vector, tsquery).label("rank"),
+        ).where(model.search_vector.op("@@")(tsquery))
+        if permission_filter is not None:
+            stmt = stmt.where(model.created_by.in_(permission_filter))
+        selects.append(stmt)
+    results = union_all(*selects).subquery()
+
+    total = db.scalar(select(func.count()).select_from(results))
+    rows = db.execute(
+        select(results)
+        .order_by(
+            results.c.rank.desc(), results.c.create_time.desc(), results.c.id.desc()
+        )
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    return rows, total
@@ -1,5 +1,12 @@
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
 from app.core.crud import CRUDBase
+from app.core.redis_client import cache_tag_menu
+from app.crud.user import user_crud
 from app.models.role import Role
+from app.models.user_role import user_role
 
 
 class CRUDRole(CRUDBase[Role]):
@@ -13,5 +20,29 @@ class CRUDRole(CRUDBase[Role]):
         """根据角色名称获取角色"""
         return db.query(self.model).filter(self.model.role_name == role_name).first()
 
+    def update(self, db: Session, db_obj: Role, obj_in: Dict[str, Any]) -> Role:
+        """更新角色"""
+        role = super().update(db, db_obj, obj_in)
+        self.invalidate_cache()
+        # 用户缓存中包含角色编码和名称，只失效持有该角色的用户
+        user_crud.invalidate_users(
+            user_id
+            for (user_id,) in db.query(user_role.c.user_id).filter(
+                user_role.c.role_id == role.id
+            )
+        )
+        return role
+
+    def delete(self, db: Session, db_obj: Role) -> None:
+        """删除角色"""
+        super().delete(db, db_obj)
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """清除引用角色信息的菜单树缓存"""
+        from app.core.redis_client import cache_manager
+
+        cache_manager.invalidate_tags(cache_tag_menu())
+
 
 role_crud = CRUDRole(Role)
@@ -1,20 +1,33 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
-from app.core.cache_decorators import cached
+from app.core.cache_codec import CachedSnapshot, register_pydantic
+from app.core.cache_decorators import cached, cached_many
+from app.core.config import settings
 from app.core.crud import CRUDBase
-from app.core.exceptions import UserAlreadyExistsError
+from app.core.exceptions import CRMException, UserAlreadyExistsError
 from app.core.redis_client import (
     cache_key_user,
     cache_key_user_by_email,
     cache_key_user_by_username,
+    cache_key_user_response,
+    cache_tag_user,
 )
 from app.models.user import User
+from app.schemas.user import UserResponse
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# get_responses缓存UserResponse，解码时只还原登记过的模型
+register_pydantic(UserResponse)
+
+
+def _user_tags(user: User, *args, **kwargs):
+    """用户缓存标签，按用户ID登记；角色或部门变化时由对应CRUD失效相关用户"""
+    return [cache_tag_user(user.id)]
+
 
 class CRUDUser(CRUDBase[User]):
     """用户 CRUD 操作"""
@@ -46,17 +59,65 @@ class CRUDUser(CRUDBase[User]):
 
         return user
 
-    @cached(lambda self, db, user_id: cache_key_user(user_id), ttl=1800)
+    @cached(
+        lambda self, db, user_id: cache_key_user(user_id), ttl=1800, tags=_user_tags
+    )
     def get(self, db: Session, user_id: int) -> Optional[User]:
-        """根据ID获取用户（带缓存）"""
-        return super().get(db, user_id)
+        """根据ID获取用户（带缓存），缓存命中时返回只读快照"""
+        # 预加载角色和部门，保证缓存快照可直接用于响应转换
+        return (
+            db.query(User)
+            .options(
+                selectinload(User.roles),
+                selectinload(User.departments),
+                selectinload(User.leading_departments),
+            )
+            .filter(User.id == user_id)
+            .first()
+        )
+
+    @cached_many(cache_key_user_response, ttl=1800, tags=_user_tags)
+    def get_responses(
+        self, db: Session, user_ids: List[int]
+    ) -> Dict[int, UserResponse]:
+        """批量获取用户响应数据（带缓存），只查询缓存未命中的用户"""
+        users = (
+            db.query(User)
+            .options(
+                selectinload(User.roles),
+                selectinload(User.departments),
+                selectinload(User.leading_departments),
+            )
+            .filter(User.id.in_(user_ids))
+            .all()
+        )
+        return {user.id: UserResponse.model_validate(user) for user in users}
+
+    def get_or_404(
+        self, db: Session, id: int, error_message: str = "记录未找到"
+    ) -> User:
+        """获取可修改的用户实例，不经过缓存"""
+        user = super().get(db, id)
+        if user is None:
+            raise CRMException(status_code=404, detail=error_message)
+        return user
 
-    @cached(lambda self, db, username: cache_key_user_by_username(username), ttl=1800)
+    @cached(
+        lambda self, db, username: cache_key_user_by_username(username),
+        ttl=1800,
+        tags=_user_tags,
+        negative_ttl=settings.CACHE_NEGATIVE_TTL,
+    )
     def get_by_username(self, db: Session, username: str) -> Optional[User]:
         """根据用户名获取用户（带缓存）"""
         return db.query(User).filter(User.user_name == username).first()
 
-    @cached(lambda self, db, email: cache_key_user_by_email(email), ttl=1800)
+    @cached(
+        lambda self, db, email: cache_key_user_by_email(email),
+        ttl=1800,
+        tags=_user_tags,
+        negative_ttl=settings.CACHE_NEGATIVE_TTL,
+    )
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
         """根据邮箱获取用户（带缓存）"""
         return db.query(User).filter(User.email == email).first()
@@ -66,8 +127,8 @@ class CRUDUser(CRUDBase[User]):
         return db.query(User).filter(User.phone == phone).first()
 
     def authenticate(self, db: Session, username: str, password: str) -> Optional[User]:
-        """验证用户凭据"""
-        user = self.get_by_username(db, username)
+        """验证用户凭据，不经过缓存（缓存快照不含密码哈希）"""
+        user = db.query(User).filter(User.user_name == username).first()
         if not user:
             return None
         if not pwd_context.verify(password, user.hashed_password):
@@ -76,6 +137,7 @@ class CRUDUser(CRUDBase[User]):
 
     def update_password(self, db: Session, user: User, new_password: str) -> User:
         """更新用户密码"""
+        user = self._attach(db, user)
         user.hashed_password = pwd_context.hash(new_password)
         db.commit()
         db.refresh(user)
@@ -87,26 +149,63 @@ class CRUDUser(CRUDBase[User]):
 
     def update(self, db: Session, db_obj: User, obj_in: Dict[str, Any]) -> User:
         """更新用户"""
-        updated_user = super().update(db, db_obj, obj_in)
+        updated_user = super().update(db, self._attach(db, db_obj), obj_in)
 
         # 清除用户缓存
         self._invalidate_user_cache(updated_user)
 
         return updated_user
 
+    def set_roles(self, db: Session, user: User, role_codes: List[str]) -> User:
+        """按角色编码替换用户角色，提交后清除用户缓存"""
+        from app.models.role import Role
+
+        user = self._attach(db, user)
+        user.roles.clear()
+        if role_codes:
+            user.roles.extend(
+                db.query(Role).filter(Role.role_code.in_(role_codes)).all()
+            )
+        db.commit()
+
+        # 角色变化后再清除一次，覆盖更新基本信息后被并发请求回填的旧角色
+        self._invalidate_user_cache(user)
+
+        return user
+
     def delete(self, db: Session, db_obj: User) -> None:
         """删除用户"""
         # 先清除缓存
         self._invalidate_user_cache(db_obj)
 
         # 再删除用户
-        super().delete(db, db_obj)
+        super().delete(db, self._attach(db, db_obj))
+
+    def invalidate_users(self, user_ids: Iterable[int]) -> int:
+        """清除指定用户的缓存，用于角色、部门变化后只失效受影响的用户"""
+        from app.core.redis_client import cache_manager
+
+        return cache_manager.invalidate_tags(
+            *(cache_tag_user(user_id) for user_id in set(user_ids))
+        )
+
+    def _attach(self, db: Session, user: User) -> User:
+        """缓存返回的是只读快照，写操作前换成会话中的实例"""
+        if isinstance(user, CachedSnapshot):
+            db_user = db.get(User, user.id)
+            if db_user is None:
+                raise CRMException(status_code=404, detail="用户未找到")
+            return db_user
+        return user
 
     def _invalidate_user_cache(self, user: User):
         """清除用户相关缓存"""
         from app.core.redis_client import cache_manager
 
-        # 清除各种用户缓存
+        # 清除登记在该用户标签下的缓存（包括改名前的用户名、邮箱键）
+        cache_manager.invalidate_tags(cache_tag_user(user.id))
+
+        # 清除当前用户名、邮箱对应的缓存键
         cache_keys = [
             cache_key_user(user.id),
             cache_key_user_by_username(user.user_name),
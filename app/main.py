@@ -7,16 +7,29 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.api import api_router
+from app.core.cache_warmup import warm_up_caches
 from app.core.config import settings
 from app.core.database import SessionLocal
+from app.core.db_checks import check_trgm_indexes
 from app.core.exceptions import CRMException
+from app.core.id_generator import order_id_generator
 from app.core.middleware import LoggingMiddleware, SecurityHeadersMiddleware
+from app.core.redis_client import cache_manager
 from app.schemas.base import ApiResponse
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
+def reconcile_order_id_counters() -> None:
+    """对齐工单号计数器"""
+    db = SessionLocal()
+    try:
+        order_id_generator.reconcile_redis_counters(db)
+    finally:
+        db.close()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
@@ -31,6 +44,18 @@ async def lifespan(app: FastAPI):
     finally:
         db.close()
 
+    # 订阅缓存失效广播，保证各进程本地缓存一致
+    cache_manager.start_invalidation_listener()
+
+    # 检查工单模糊查询依赖的索引，缺失时仅记录警告
+    await asyncio.to_thread(check_trgm_indexes)
+
+    # Redis计数器策略下，把当天的工单号计数器对齐到数据库最大序号
+    await asyncio.to_thread(reconcile_order_id_counters)
+
+    # 预热常用缓存，完成或超时后才开始接收请求
+    await asyncio.to_thread(warm_up_caches)
+
     yield
 
 
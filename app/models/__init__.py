@@ -4,7 +4,13 @@ from .role import Role
 from .menu import Menu
 from .dictionary import DictionaryType, DictionaryEnum
 from .system import SystemSetting
-from .order import InternalOrder, InternalOrderDetail, ExternalOrder, ExternalOrderDetail
+from .order import (
+    InternalOrder,
+    InternalOrderDetail,
+    ExternalOrder,
+    ExternalOrderDetail,
+    OrderIdCounter,
+)
 from .department import Department, UserDepartment, DepartmentLeader
 from .user_role import user_role
 from .role_menu import role_menu
@@ -20,6 +26,7 @@ __all__ = [
     "InternalOrderDetail",
     "ExternalOrder",
     "ExternalOrderDetail",
+    "OrderIdCounter",
     "Department",
     "UserDepartment",
     "DepartmentLeader",
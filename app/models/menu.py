@@ -1,5 +1,5 @@
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 
 from app.core.database import Base
 from app.models.base import TimestampMixin
@@ -32,7 +32,7 @@ class Menu(Base, TimestampMixin):
     auth_mark = Column(String(100), nullable=True, comment="权限标识")
 
     # 关系
-    children = relationship("Menu", backref="parent", remote_side=[id])
+    children = relationship("Menu", backref=backref("parent", remote_side=[id]))
 
     # 与角色的多对多关系
     roles = relationship("Role", secondary=role_menu, back_populates="menus")
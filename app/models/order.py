@@ -2,23 +2,91 @@ from sqlalchemy import (
     JSON,
     Boolean,
     Column,
+    Computed,
     Date,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.core.database import Base
 from app.models.base import TimestampMixin
 
+# 列表筛选使用 contains（LIKE '%x%'）的列，需要pg_trgm的GIN索引
+ORDER_TRGM_COLUMNS = (
+    "id",
+    "customer",
+    "vehicle_model",
+    "repair_shop",
+    "reporter_name",
+    "spare_part_location",
+)
+DETAIL_TRGM_COLUMNS = ("spare_part_location",)
+
+
+def trgm_index_name(table: str, column: str) -> str:
+    """三元组索引名称"""
+    return f"ix_{table}_{column}_trgm"
+
+
+def trgm_indexes(table: str, columns) -> tuple:
+    """为指定列生成pg_trgm的GIN索引"""
+    return tuple(
+        Index(
+            trgm_index_name(table, column),
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+        for column in columns
+    )
+
+
+# 全文检索的文本搜索配置及参与检索的列和权重（A最高）
+ORDER_SEARCH_CONFIG = "simple"
+ORDER_SEARCH_WEIGHTS = (
+    ("vin_number", "A"),
+    ("license_plate", "A"),
+    ("customer", "B"),
+    ("vehicle_model", "C"),
+    ("repair_shop", "C"),
+    ("fault_description", "D"),
+)
+
+
+def search_vector_expression() -> str:
+    """全文检索向量的生成列表达式"""
+    return " || ".join(
+        f"setweight(to_tsvector('{ORDER_SEARCH_CONFIG}', coalesce({column}, '')), "
+        f"'{weight}')"
+        for column, weight in ORDER_SEARCH_WEIGHTS
+    )
+
+
+def search_vector_column():
+    """由数据库维护的全文检索向量列，默认不随工单加载"""
+    return deferred(
+        Column(TSVECTOR, Computed(search_vector_expression(), persisted=True))
+    )
+
 
 class InternalOrder(Base, TimestampMixin):
     """保内工单模型"""
 
     __tablename__ = "internal_order"
+    __table_args__ = (
+        # 列表按 (create_time, id) 倒序分页，游标分页依赖该索引
+        Index("ix_internal_order_create_time_id", "create_time", "id"),
+        *trgm_indexes("internal_order", ORDER_TRGM_COLUMNS),
+        Index(
+            "ix_internal_order_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
 
     id = Column(String, primary_key=True, index=True)
     customer = Column(String, nullable=False)
@@ -43,6 +111,17 @@ class InternalOrder(Base, TimestampMixin):
     avic_order_number = Column(String)  # 中航派工单号
     is_end = Column(Boolean, default=False)  # 是否完成所有步骤
     created_by = Column(Integer, ForeignKey("user.id"), nullable=True)
+    version = Column(Integer, nullable=False, server_default="1")  # 乐观锁版本号
+    # 首条详情的备件所属库位，冗余存储供列表筛选和展示，随详情写入同步
+    spare_part_location = Column(String)
+    search_vector = search_vector_column()  # 全文检索向量
+
+    __mapper_args__ = {
+        # 插入/更新时通过RETURNING取回服务端生成的值（创建时间、更新时间等）
+        "eager_defaults": True,
+        # 更新时校验并递增版本号，版本不一致说明已被他人修改
+        "version_id_col": version,
+    }
 
     details = relationship(
         "InternalOrderDetail", back_populates="order", cascade="all, delete-orphan"
@@ -53,6 +132,8 @@ class InternalOrderDetail(Base, TimestampMixin):
     """保内工单详情记录模型"""
 
     __tablename__ = "internal_order_detail"
+    __table_args__ = trgm_indexes("internal_order_detail", DETAIL_TRGM_COLUMNS)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(
@@ -84,6 +165,14 @@ class ExternalOrder(Base, TimestampMixin):
     """保外工单模型"""
 
     __tablename__ = "external_order"
+    __table_args__ = (
+        # 列表按 (create_time, id) 倒序分页，游标分页依赖该索引
+        Index("ix_external_order_create_time_id", "create_time", "id"),
+        *trgm_indexes("external_order", ORDER_TRGM_COLUMNS),
+        Index(
+            "ix_external_order_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
 
     id = Column(String, primary_key=True, index=True)
     customer = Column(String, nullable=False)
@@ -107,6 +196,12 @@ class ExternalOrder(Base, TimestampMixin):
     order_progress = Column(Text)  # 工单进度
     is_end = Column(Boolean, default=False)  # 是否完成所有步骤
     created_by = Column(Integer, ForeignKey("user.id"), nullable=True)
+    version = Column(Integer, nullable=False, server_default="1")  # 乐观锁版本号
+    # 首条详情的备件所属库位，冗余存储供列表筛选和展示，随详情写入同步
+    spare_part_location = Column(String)
+    search_vector = search_vector_column()  # 全文检索向量
+
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": version}
 
     # 关联详情记录
     details = relationship(
@@ -118,6 +213,8 @@ class ExternalOrderDetail(Base, TimestampMixin):
     """保外工单详情记录模型"""
 
     __tablename__ = "external_order_detail"
+    __table_args__ = trgm_indexes("external_order_detail", DETAIL_TRGM_COLUMNS)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(
@@ -141,3 +238,13 @@ class ExternalOrderDetail(Base, TimestampMixin):
 
     # 关联主工单
     order = relationship("ExternalOrder", back_populates="details")
+
+
+class OrderIdCounter(Base):
+    """工单号计数表：按前缀和日期记录已分配的最大序号"""
+
+    __tablename__ = "order_id_counter"
+
+    prefix = Column(String(8), primary_key=True)  # BN / BW
+    day = Column(String(8), primary_key=True)  # yyyymmdd
+    last_value = Column(Integer, nullable=False, default=0, server_default="0")
@@ -10,6 +10,8 @@ class User(Base, TimestampMixin):
     """用户模型"""
 
     __tablename__ = "user"
+    # 写入缓存时排除的列，密码哈希不进入Redis
+    __cache_exclude__ = ("hashed_password",)
 
     id = Column(Integer, primary_key=True, index=True)
     status = Column(Boolean, default=True, nullable=True)
@@ -152,6 +152,8 @@ class InternalOrderUpdate(CamelCaseModel):
     order_progress: Optional[str] = None
     avic_order_number: Optional[str] = None
     is_end: Optional[bool] = None
+    # 读取工单时的版本号，传入时若工单已被他人修改则返回409
+    version: Optional[int] = None
     # 详情记录字段
     repair_person: Optional[str] = None
     repair_date: Optional[date] = None
@@ -199,6 +201,8 @@ class ExternalOrderUpdate(CamelCaseModel):
     fault_description: Optional[str] = None
     order_progress: Optional[str] = None
     is_end: Optional[bool] = None
+    # 读取工单时的版本号，传入时若工单已被他人修改则返回409
+    version: Optional[int] = None
     # 详情记录字段
     repair_person: Optional[str] = None
     repair_date: Optional[date] = None
@@ -284,6 +288,7 @@ class InternalOrderResponse(CamelCaseModel):
     is_end: bool = False
     create_time: datetime
     update_time: Optional[datetime] = None
+    version: Optional[int] = None  # 更新时回传
     # 详情记录
     details: Optional[List[InternalOrderDetailResponse]] = None
 
@@ -362,6 +367,7 @@ class ExternalOrderResponse(CamelCaseModel):
     is_end: bool = False
     create_time: datetime
     update_time: Optional[datetime] = None
+    version: Optional[int] = None  # 更新时回传
     # 详情记录
     details: Optional[List[ExternalOrderDetailResponse]] = None
 
@@ -378,3 +384,57 @@ class ExternalOrderResponse(CamelCaseModel):
         if value is None:
             return None
         return value.strftime("%Y-%m-%d")
+
+
+class OrderSearchResult(CamelCaseModel):
+    """工单全文检索结果"""
+
+    order_type: str  # internal保内 / external保外
+    id: str
+    customer: str
+    vehicle_model: str
+    repair_shop: str
+    reporter_name: str
+    vin_number: str
+    license_plate: Optional[str] = None
+    fault_description: Optional[str] = None
+    report_date: date
+    create_time: datetime
+    rank: float
+
+    @field_serializer("create_time")
+    def serialize_datetime(self, value: Optional[datetime]) -> Optional[str]:
+        """序列化datetime为yyyy-MM-dd HH:mm:ss格式"""
+        if value is None:
+            return None
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+    @field_serializer("report_date")
+    def serialize_date(self, value: Optional[date]) -> Optional[str]:
+        """序列化date为yyyy-MM-dd格式"""
+        if value is None:
+            return None
+        return value.strftime("%Y-%m-%d")
+
+
+class OrderBatchRequest(CamelCaseModel):
+    """工单批量创建/更新请求，更新时每项需包含id"""
+
+    items: List[Dict[str, Any]]
+
+
+class OrderBatchItemResult(CamelCaseModel):
+    """批量创建/更新中单个工单的结果"""
+
+    index: int  # 在请求items中的位置
+    success: bool
+    id: Optional[str] = None
+    message: Optional[str] = None
+
+
+class OrderBatchResult(CamelCaseModel):
+    """工单批量创建/更新结果"""
+
+    success_count: int
+    fail_count: int
+    results: List[OrderBatchItemResult]
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+工单号生成并发基准测试
+
+在独立schema中建立只含主键的工单表和计数表，用多个线程或进程模拟并发创建
+工单（生成工单号 + 插入 + 提交，主键冲突时换号重试，与CRUD的创建流程一致），
+逐个策略输出吞吐量、延迟、重试次数、退回时间戳工单号的次数和序号空洞。
+
+Redis计数器策略使用独立的键前缀，不会影响正式计数器，但仍建议使用本地Redis。
+
+用法:
+    python scripts/benchmark_order_id.py --workers 16 --orders 200
+    python scripts/benchmark_order_id.py --mode process \
+        --strategies counter_table redis_counter
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.exc import IntegrityError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.core.id_generator as id_generator  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.id_generator import (  # noqa: E402
+    ORDER_ID_SEQUENCE_DIGITS,
+    IDGenerationStrategy,
+    OrderIDGenerator,
+)
+from app.core.redis_client import redis_client  # noqa: E402
+
+SCHEMA = "bench_order_id"
+PREFIX = "BN"
+
+# Redis计数器使用独立的键，避免改动正式计数器
+id_generator.cache_key_order_id = lambda prefix, day: f"bench:order_id:{prefix}:{day}"
+
+# 每个进程一个引擎和生成器，线程模式下所有线程共用
+_engine = None
+_generators: Dict[str, OrderIDGenerator] = {}
+
+
+def get_engine():
+    """连接到测试schema的引擎，未限定schema的SQL都落在测试表上"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            settings.DATABASE_URL,
+            pool_size=64,
+            max_overflow=64,
+            connect_args={"options": f"-csearch_path={SCHEMA}"},
+        )
+    return _engine
+
+
+def get_generator(strategy: str) -> OrderIDGenerator:
+    """按策略获取本进程的生成器"""
+    if strategy not in _generators:
+        _generators[strategy] = OrderIDGenerator(IDGenerationStrategy(strategy))
+    return _generators[strategy]
+
+
+def prepare_schema() -> None:
+    """创建测试表"""
+    with get_engine().connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(
+            text(
+                f"""
+                CREATE TABLE {SCHEMA}.internal_order (
+                    id VARCHAR PRIMARY KEY,
+                    create_time TIMESTAMPTZ DEFAULT now()
+                )
+                """
+            )
+        )
+        conn.execute(
+            text(
+                f"""
+                CREATE TABLE {SCHEMA}.order_id_counter (
+                    prefix VARCHAR(8) NOT NULL,
+                    day VARCHAR(8) NOT NULL,
+                    last_value INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (prefix, day)
+                )
+                """
+            )
+        )
+
+
+def reset_state(strategy: str) -> None:
+    """清空上一个策略留下的工单、计数器和序列"""
+    day = datetime.now().strftime("%Y%m%d")
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(f"TRUNCATE {SCHEMA}.internal_order, {SCHEMA}.order_id_counter")
+        )
+        conn.execute(text(f"DROP SEQUENCE IF EXISTS {SCHEMA}.internal_order_seq_{day}"))
+
+    client = redis_client.client
+    if client is not None:
+        client.delete(id_generator.cache_key_order_id(PREFIX, day))
+    _generators.pop(strategy, None)
+
+
+def create_orders(strategy: str, orders: int, max_retries: int) -> Dict[str, Any]:
+    """模拟CRUD创建流程逐个创建工单，返回本工作单元的统计数据"""
+    Session = sessionmaker(bind=get_engine())
+    generator = get_generator(strategy)
+    stats = {"generate": [], "create": [], "retries": 0, "fallbacks": 0, "errors": 0}
+
+    for _ in range(orders):
+        started = time.perf_counter()
+        db = Session()
+        try:
+            for attempt in range(max_retries + 1):
+                generate_started = time.perf_counter()
+                if attempt < max_retries:
+                    order_id = generator.generate_internal_order_id(db)
+                else:
+                    # 重试用完，与旧版CRUD一样退回时间戳工单号
+                    order_id = generator.generate_with_timestamp(PREFIX)
+                    stats["fallbacks"] += 1
+                stats["generate"].append(time.perf_counter() - generate_started)
+
+                try:
+                    db.execute(
+                        text("INSERT INTO internal_order (id) VALUES (:id)"),
+                        {"id": order_id},
+                    )
+                    db.commit()
+                    break
+                except IntegrityError:
+                    db.rollback()
+                    stats["retries"] += 1
+        except Exception as e:
+            db.rollback()
+            stats["errors"] += 1
+            if stats["errors"] == 1:
+                print(f"    工作单元出错: {e}")
+        finally:
+            db.close()
+        stats["create"].append(time.perf_counter() - started)
+
+    return stats
+
+
+def merge_stats(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并各工作单元的统计数据"""
+    merged = {"generate": [], "create": [], "retries": 0, "fallbacks": 0, "errors": 0}
+    for result in results:
+        for key, value in result.items():
+            merged[key] += value
+    return merged
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """百分位数（毫秒）"""
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0] * 1000
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1] * 1000
+
+
+def count_gaps() -> Dict[str, int]:
+    """统计入库工单号：总数、标准格式数量、序号空洞"""
+    full_prefix = f"{PREFIX}{datetime.now().strftime('%Y%m%d')}"
+    with get_engine().connect() as conn:
+        total, standard, max_sequence = conn.execute(
+            text(
+                f"""
+                SELECT
+                    count(*),
+                    count(*) FILTER (WHERE length(id) = :length),
+                    coalesce(max(right(id, {ORDER_ID_SEQUENCE_DIGITS})::int)
+                        FILTER (WHERE length(id) = :length), 0)
+                FROM internal_order
+                WHERE id LIKE :prefix
+                """
+            ),
+            {
+                "length": len(full_prefix) + ORDER_ID_SEQUENCE_DIGITS,
+                "prefix": f"{full_prefix}%",
+            },
+        ).one()
+    return {"total": total, "standard": standard, "gaps": max_sequence - standard}
+
+
+def run_strategy(strategy: str, args) -> Dict[str, Any]:
+    """用指定策略并发创建工单"""
+    reset_state(strategy)
+    if args.mode == "process":
+        # spawn方式启动，子进程各自建立连接池和生成器
+        executor = ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    else:
+        # 线程共用同一个生成器，与单个应用进程内的情况一致
+        get_generator(strategy)
+        executor = ThreadPoolExecutor(max_workers=args.workers)
+
+    started = time.perf_counter()
+    with executor:
+        futures = [
+            executor.submit(create_orders, strategy, args.orders, args.max_retries)
+            for _ in range(args.workers)
+        ]
+        stats = merge_stats([future.result() for future in futures])
+    elapsed = time.perf_counter() - started
+
+    stats.update(count_gaps())
+    stats["elapsed"] = elapsed
+    stats["throughput"] = stats["total"] / elapsed if elapsed else 0.0
+    return stats
+
+
+def print_summary(results: Dict[str, Dict[str, Any]]) -> None:
+    """输出各策略对比"""
+    print("\n===== 对比 =====")
+    print(
+        f"{'策略':<16}{'工单/秒':>10}{'生成p50':>10}{'生成p99':>10}{'创建p99':>10}"
+        f"{'重试':>8}{'退回':>8}{'空洞':>8}{'非标准':>8}{'失败':>8}"
+    )
+    for strategy, stats in results.items():
+        print(
+            f"{strategy:<16}{stats['throughput']:>10.1f}"
+            f"{percentile(stats['generate'], 50):>10.2f}"
+            f"{percentile(stats['generate'], 99):>10.2f}"
+            f"{percentile(stats['create'], 99):>10.2f}"
+            f"{stats['retries']:>8}{stats['fallbacks']:>8}{stats['gaps']:>8}"
+            f"{stats['total'] - stats['standard']:>8}{stats['errors']:>8}"
+        )
+    print(
+        "\n延迟单位为毫秒；退回指重试用完后使用时间戳工单号；非标准指不符合4位序号格式的工单号"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="工单号生成并发基准测试")
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=[strategy.value for strategy in IDGenerationStrategy],
+        choices=[strategy.value for strategy in IDGenerationStrategy],
+        help="参与测试的策略，默认全部",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="并发线程/进程数")
+    parser.add_argument(
+        "--orders", type=int, default=200, help="每个工作单元创建的工单数"
+    )
+    parser.add_argument(
+        "--mode", choices=["thread", "process"], default="thread", help="并发方式"
+    )
+    parser.add_argument(
+        "--max-retries", type=int, default=3, help="主键冲突时的重试次数"
+    )
+    parser.add_argument("--keep", action="store_true", help="保留测试schema")
+    args = parser.parse_args()
+
+    prepare_schema()
+    results = {}
+    try:
+        for strategy in args.strategies:
+            if (
+                strategy == IDGenerationStrategy.REDIS_COUNTER.value
+                and not redis_client.is_connected()
+            ):
+                print(f"\n[{strategy}] Redis不可用，全部退回数据库锁策略")
+            print(
+                f"\n[{strategy}] {args.workers}个{args.mode}，"
+                f"每个创建{args.orders}个工单..."
+            )
+            results[strategy] = run_strategy(strategy, args)
+            print(f"    完成，耗时 {results[strategy]['elapsed']:.1f}s")
+        print_summary(results)
+    finally:
+        if not args.keep:
+            with get_engine().connect() as conn:
+                conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
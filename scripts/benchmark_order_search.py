@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+工单模糊筛选基准测试
+
+在独立schema中生成模拟工单数据，分别在创建pg_trgm三元组索引前后
+执行列表筛选使用的 LIKE '%x%' 查询，输出执行计划和耗时对比。
+
+用法:
+    python scripts/benchmark_order_search.py --rows 500000
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+SCHEMA = "bench_order_search"
+
+# 与列表接口一致的筛选列
+FILTER_COLUMNS = {
+    "orderNo": ("internal_order", "id"),
+    "customer": ("internal_order", "customer"),
+    "vehicleModel": ("internal_order", "vehicle_model"),
+    "repairShop": ("internal_order", "repair_shop"),
+    "reporterName": ("internal_order", "reporter_name"),
+    "sparePartLocation": ("internal_order_detail", "spare_part_location"),
+}
+
+
+def md5_fragment(value: int, start: int = 3, length: int = 6) -> str:
+    """取md5中间一段作为查询关键字，与生成数据的规则一致"""
+    return hashlib.md5(str(value).encode("utf-8")).hexdigest()[start : start + length]
+
+
+SEARCH_TERMS = {
+    "orderNo": "001234",
+    "customer": md5_fragment(1234),
+    "vehicleModel": "EV500-4",
+    "repairShop": "维修站12",
+    "reporterName": md5_fragment(4321),
+    "sparePartLocation": md5_fragment(777),
+}
+
+
+def prepare_data(conn, rows: int) -> None:
+    """创建测试表并生成数据"""
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(
+        text(
+            f"""
+            CREATE TABLE {SCHEMA}.internal_order (
+                id VARCHAR PRIMARY KEY,
+                customer VARCHAR NOT NULL,
+                vehicle_model VARCHAR NOT NULL,
+                repair_shop VARCHAR NOT NULL,
+                reporter_name VARCHAR NOT NULL,
+                create_time TIMESTAMPTZ DEFAULT now()
+            )
+            """
+        )
+    )
+    conn.execute(
+        text(
+            f"""
+            CREATE TABLE {SCHEMA}.internal_order_detail (
+                id SERIAL PRIMARY KEY,
+                order_id VARCHAR NOT NULL REFERENCES {SCHEMA}.internal_order(id),
+                spare_part_location VARCHAR
+            )
+            """
+        )
+    )
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO {SCHEMA}.internal_order
+                (id, customer, vehicle_model, repair_shop, reporter_name, create_time)
+            SELECT
+                'BN' || to_char(now(), 'YYYYMMDD') || lpad(i::text, 7, '0'),
+                '客户' || md5((i % 20000)::text),
+                (ARRAY['EV300', 'EV500', 'X7', 'M5', 'Q3'])[1 + i % 5]
+                    || '-' || (i % 97),
+                '维修站' || (i % 300),
+                '报修人' || md5((i % 8000)::text),
+                now() - (i || ' seconds')::interval
+            FROM generate_series(1, :rows) AS i
+            """
+        ),
+        {"rows": rows},
+    )
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO {SCHEMA}.internal_order_detail (order_id, spare_part_location)
+            SELECT id, '库位' || md5((row_number() OVER () % 5000)::text)
+            FROM {SCHEMA}.internal_order
+            """
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE INDEX ON {SCHEMA}.internal_order_detail (order_id);"
+            f"CREATE INDEX ON {SCHEMA}.internal_order (create_time, id)"
+        )
+    )
+    conn.execute(text(f"ANALYZE {SCHEMA}.internal_order"))
+    conn.execute(text(f"ANALYZE {SCHEMA}.internal_order_detail"))
+
+
+def create_trgm_indexes(conn) -> None:
+    """创建三元组索引，与迁移脚本一致"""
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for table, column in FILTER_COLUMNS.values():
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+                f"ON {SCHEMA}.{table} USING gin ({column} gin_trgm_ops)"
+            )
+        )
+    conn.execute(text(f"ANALYZE {SCHEMA}.internal_order"))
+    conn.execute(text(f"ANALYZE {SCHEMA}.internal_order_detail"))
+
+
+def build_queries():
+    """与列表接口相同形态的统计查询和分页查询"""
+    queries = {}
+    for name, (table, column) in FILTER_COLUMNS.items():
+        if table == "internal_order_detail":
+            source = (
+                f"{SCHEMA}.internal_order o JOIN {SCHEMA}.internal_order_detail d "
+                f"ON d.order_id = o.id WHERE d.{column} LIKE :pattern"
+            )
+        else:
+            source = f"{SCHEMA}.internal_order o WHERE o.{column} LIKE :pattern"
+        queries[name] = (
+            f"SELECT count(*) FROM {source}",
+            f"SELECT o.* FROM {source} ORDER BY o.create_time DESC, o.id DESC LIMIT 20",
+        )
+    return queries
+
+
+def explain(conn, sql: str, term: str, show_plan: bool):
+    """执行EXPLAIN ANALYZE，返回 (耗时毫秒, 是否使用三元组索引)"""
+    plan_lines = [
+        row[0]
+        for row in conn.execute(
+            text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), {"pattern": f"%{term}%"}
+        )
+    ]
+    execution_ms = 0.0
+    for line in plan_lines:
+        if line.startswith("Execution Time:"):
+            execution_ms = float(line.split(":")[1].strip().split()[0])
+    if show_plan:
+        for line in plan_lines:
+            print(f"        {line}")
+    uses_trgm = any("_trgm" in line for line in plan_lines)
+    return execution_ms, uses_trgm
+
+
+def run_queries(conn, label: str, show_plan: bool):
+    """执行所有筛选查询"""
+    results = {}
+    print(f"\n===== {label} =====")
+    for name, (count_sql, page_sql) in build_queries().items():
+        term = SEARCH_TERMS[name]
+        print(f"\n  [{name}] LIKE '%{term}%'")
+        print("    统计查询:")
+        count_result = explain(conn, count_sql, term, show_plan)
+        print("    分页查询:")
+        page_result = explain(conn, page_sql, term, show_plan)
+        results[name] = (count_result, page_result)
+    return results
+
+
+def print_summary(before, after) -> None:
+    """输出前后对比"""
+    print("\n===== 对比（毫秒） =====")
+    print(
+        f"{'筛选条件':<20}{'统计-前':>12}{'统计-后':>12}{'分页-前':>12}{'分页-后':>12}  索引"
+    )
+    for name in FILTER_COLUMNS:
+        (count_before, _), (page_before, _) = before[name]
+        (count_after, count_trgm), (page_after, page_trgm) = after[name]
+        used = "是" if count_trgm or page_trgm else "否"
+        print(
+            f"{name:<20}{count_before:>12.2f}{count_after:>12.2f}"
+            f"{page_before:>12.2f}{page_after:>12.2f}  {used}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="工单模糊筛选三元组索引基准测试")
+    parser.add_argument("--rows", type=int, default=200000, help="生成的工单数量")
+    parser.add_argument("--quiet", action="store_true", help="不输出完整执行计划")
+    parser.add_argument("--keep", action="store_true", help="保留测试schema")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            started = time.perf_counter()
+            prepare_data(conn, args.rows)
+            print(
+                f"生成 {args.rows} 条工单数据，耗时 {time.perf_counter() - started:.1f}s"
+            )
+
+            before = run_queries(conn, "无三元组索引", not args.quiet)
+
+            started = time.perf_counter()
+            create_trgm_indexes(conn)
+            print(f"\n创建三元组索引，耗时 {time.perf_counter() - started:.1f}s")
+
+            after = run_queries(conn, "有三元组索引", not args.quiet)
+            print_summary(before, after)
+        finally:
+            if not args.keep:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""测试配置：使用进程内缓存后端和SQLite内存数据库，不依赖Redis和PostgreSQL"""
+
+import os
+
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.dialects.postgresql import TSVECTOR  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.database import Base  # noqa: E402
+from app.core.memory_backend import InMemoryBackend  # noqa: E402
+from app.core.redis_client import cache_manager, redis_client  # noqa: E402
+
+
+@compiles(TSVECTOR, "sqlite")
+def _compile_tsvector_sqlite(type_, compiler, **kw):
+    """SQLite中以文本列代替全文检索向量"""
+    return "TEXT"
+
+
+def _register_search_functions(dbapi_connection, connection_record):
+    """注册生成列表达式用到的PostgreSQL函数，SQLite中只做文本拼接"""
+    dbapi_connection.create_function(
+        "to_tsvector", 2, lambda config, text: text, deterministic=True
+    )
+    dbapi_connection.create_function(
+        "setweight", 2, lambda vector, weight: vector, deterministic=True
+    )
+
+
+@pytest.fixture
+def backend():
+    """每个测试使用全新的进程内缓存后端和空的本地缓存"""
+    backend = InMemoryBackend()
+    redis_client.use_backend(backend, "memory")
+    cache_manager.clear_local()
+    yield backend
+    redis_client.use_backend(InMemoryBackend(), "memory")
+    cache_manager.clear_local()
+
+
+@pytest.fixture
+def db(backend):
+    """建好全部表的SQLite内存数据库会话"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    event.listen(engine, "connect", _register_search_functions)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def make_order(db):
+    """创建保内工单，返回已提交的工单"""
+    from datetime import date
+
+    from app.models.order import InternalOrder, InternalOrderDetail
+
+    def make(order_id: str, **fields):
+        values = {
+            "customer": "客户",
+            "vehicle_model": "车型",
+            "repair_shop": "维修站",
+            "reporter_name": "报修人",
+            "contact_info": "13800000000",
+            "report_date": date(2024, 5, 1),
+            "project_type": "类型",
+            "project_stage": "阶段",
+            "vin_number": "VIN",
+            **fields,
+        }
+        order = InternalOrder(id=order_id, **values)
+        order.details.append(InternalOrderDetail(repair_person="维修人"))
+        db.add(order)
+        db.commit()
+        return order
+
+    return make
@@ -0,0 +1,94 @@
+"""缓存编解码器的测试"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.cache_codec import (
+    TYPE_FIELD,
+    VALUE_FIELD,
+    CacheDecodeError,
+    CachedSnapshot,
+    cache_codec,
+    register_pydantic,
+)
+from app.models.user import User
+
+
+@register_pydantic
+class Item(BaseModel):
+    id: int
+    created: datetime
+    extra: dict
+
+
+class Unregistered(BaseModel):
+    id: int
+
+
+def roundtrip(value):
+    return cache_codec.loads(cache_codec.dumps(value))
+
+
+def test_builtin_types_roundtrip():
+    value = {
+        "at": datetime(2024, 5, 1, 8, 30),
+        "day": date(2024, 5, 1),
+        "amount": Decimal("12.50"),
+        "tags": {"a", "b"},
+        "items": [1, "x", None],
+    }
+    assert roundtrip(value) == value
+
+
+def test_registered_pydantic_roundtrip():
+    item = Item(id=1, created=datetime(2024, 5, 1), extra={"k": [1, 2]})
+    restored = roundtrip([item])
+    assert restored == [item]
+    assert isinstance(restored[0], Item)
+
+
+def test_unregistered_pydantic_is_not_encoded():
+    with pytest.raises(TypeError):
+        cache_codec.dumps(Unregistered(id=1))
+
+
+def test_payload_cannot_name_arbitrary_class():
+    payload = json.dumps(
+        {TYPE_FIELD: "pydantic", "m": "os:system", VALUE_FIELD: "echo"}
+    ).encode("utf-8")
+    with pytest.raises(CacheDecodeError):
+        cache_codec.loads(payload)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {TYPE_FIELD: "date", VALUE_FIELD: "2020-01-01"},
+        {"nested": [{TYPE_FIELD: "escaped", VALUE_FIELD: {"a": 1}}]},
+        {TYPE_FIELD: "x", "at": datetime(2024, 5, 1)},
+    ],
+)
+def test_user_dict_with_marker_key_is_preserved(value):
+    assert roundtrip(value) == value
+
+
+def test_marker_keys_inside_models_are_preserved():
+    item = Item(id=1, created=datetime(2024, 5, 1), extra={TYPE_FIELD: "date"})
+    assert roundtrip(item).extra == {TYPE_FIELD: "date"}
+
+    snapshot = CachedSnapshot("Menu", {"id": 1, "meta": {TYPE_FIELD: "set"}})
+    assert roundtrip(snapshot).meta == {TYPE_FIELD: "set"}
+
+
+def test_model_excluded_columns_are_not_cached():
+    user = User(id=1, user_name="alice", hashed_password="secret-hash")
+    data = cache_codec.dumps(user)
+    assert b"secret-hash" not in data
+
+    snapshot = cache_codec.loads(data)
+    assert snapshot.user_name == "alice"
+    assert "hashed_password" not in snapshot.to_dict()
@@ -0,0 +1,118 @@
+"""缓存装饰器的测试"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.cache_decorators import (
+    NEGATIVE_VALUE,
+    SWR_FRESH_UNTIL,
+    SWR_VALUE,
+    cached,
+    cached_many,
+)
+from app.core.redis_client import cache_manager
+
+
+def wait_until(predicate, timeout=2.0):
+    """轮询等待后台任务完成"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_single_flight_loads_once_for_concurrent_misses(backend):
+    calls = []
+    started = threading.Event()
+
+    @cached(lambda: "dictionary:tree", single_flight=True, wait_timeout=5)
+    def load_tree():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return ["root"]
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        first = executor.submit(load_tree)
+        started.wait(1)
+        others = [executor.submit(load_tree) for _ in range(4)]
+        results = [first.result()] + [future.result() for future in others]
+
+    assert results == [["root"]] * 5
+    assert len(calls) == 1
+
+
+def test_single_flight_does_not_cache_none_without_negative_ttl(backend):
+    calls = []
+
+    @cached(lambda: "dictionary:tree", single_flight=True, wait_timeout=5)
+    def load_tree():
+        calls.append(1)
+        return None
+
+    assert load_tree() is None
+    assert load_tree() is None
+    assert len(calls) == 2
+
+
+def test_stale_value_is_served_then_refreshed_in_background(backend):
+    calls = []
+
+    @cached(lambda: "menu:tree:1", ttl=60, stale_ttl=600)
+    def load_tree():
+        calls.append(1)
+        return ["new"]
+
+    # 软TTL已过期的旧值
+    cache_manager.set("menu:tree:1", {SWR_FRESH_UNTIL: 0, SWR_VALUE: ["old"]}, 600)
+
+    assert load_tree() == ["old"]
+    assert wait_until(lambda: cache_manager.get("menu:tree:1")[SWR_VALUE] == ["new"])
+    assert load_tree() == ["new"]
+    assert len(calls) == 1
+
+
+def test_fresh_value_is_not_refreshed(backend):
+    calls = []
+
+    @cached(lambda: "menu:tree:1", ttl=60, stale_ttl=600)
+    def load_tree():
+        calls.append(1)
+        return ["tree"]
+
+    assert load_tree() == ["tree"]
+    assert load_tree() == ["tree"]
+    assert len(calls) == 1
+    assert backend.ttl("menu:tree:1") > 60
+
+
+def test_missing_result_is_negatively_cached(backend):
+    calls = []
+
+    @cached(lambda: "user:name:ghost", negative_ttl=30)
+    def load_user():
+        calls.append(1)
+        return None
+
+    assert load_user() is None
+    assert load_user() is None
+    assert len(calls) == 1
+    assert cache_manager.get("user:name:ghost") == NEGATIVE_VALUE
+    assert 0 < backend.ttl("user:name:ghost") <= 30
+
+
+def test_cached_many_loads_only_missing_ids(backend):
+    loaded = []
+
+    @cached_many(lambda user_id: f"user:response:{user_id}")
+    def load_users(user_ids):
+        loaded.append(list(user_ids))
+        return {user_id: {"id": user_id} for user_id in user_ids if user_id != 404}
+
+    assert load_users([1, 2]) == {1: {"id": 1}, 2: {"id": 2}}
+    assert load_users([3, 2, 404, 1, 3]) == {3: {"id": 3}, 2: {"id": 2}, 1: {"id": 1}}
+    assert list(load_users([3, 2, 1])) == [3, 2, 1]
+    assert loaded == [[1, 2], [3, 404]]
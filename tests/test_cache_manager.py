@@ -0,0 +1,99 @@
+"""缓存管理器的测试：本地缓存层与跨进程失效广播"""
+
+import pytest
+
+from app.core.redis_client import CacheManager, redis_client
+
+
+@pytest.fixture
+def peer(backend):
+    """模拟另一个工作进程：独立的本地缓存层，订阅失效频道"""
+    manager = CacheManager()
+    pubsub = backend.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(manager.channel)
+
+    def receive():
+        """处理一条收到的失效消息，返回消息内容"""
+        message = next(pubsub.listen())
+        manager._handle_invalidation(message["data"])
+        return message["data"]
+
+    manager.receive = receive
+    yield manager
+    pubsub.close()
+
+
+def test_get_fills_local_tier(backend):
+    manager = CacheManager()
+    manager.set("user:1", {"id": 1})
+    backend.delete("user:1")
+    assert manager.get("user:1") == {"id": 1}
+
+
+def test_clear_all_clears_redis_and_peer_local_tiers(backend, peer):
+    manager = CacheManager()
+    manager.set("user:1", {"id": 1})
+    assert peer.get("user:1") == {"id": 1}
+
+    manager.clear_all()
+    assert backend.dbsize() == 0
+    assert len(manager.local) == 0
+
+    peer.receive()
+    assert len(peer.local) == 0
+    assert peer.get("user:1") is None
+
+
+def test_clear_all_without_redis_clears_local_tier(backend):
+    manager = CacheManager()
+    manager.set("user:1", {"id": 1})
+    redis_client.use_backend(None, "none")
+
+    manager.clear_all()
+    assert manager.get("user:1") is None
+
+
+def record_publish_state(manager, backend, key):
+    """记录每次广播失效消息时Redis中是否还存在key"""
+    published = []
+    publish = manager._publish_invalidation
+
+    def wrapper(**kwargs):
+        published.append(backend.exists(key))
+        publish(**kwargs)
+
+    manager._publish_invalidation = wrapper
+    return published
+
+
+def test_invalidate_tags_deletes_tagged_keys_everywhere(backend, peer):
+    manager = CacheManager()
+    manager.set("user:1", {"id": 1}, tags=["user:1"])
+    manager.set("user:2", {"id": 2}, tags=["user:2"])
+    assert peer.get("user:1") == {"id": 1}
+
+    assert manager.invalidate_tags("user:1") == 1
+    assert manager.get("user:1") is None
+    assert manager.get("user:2") == {"id": 2}
+    assert not backend.exists("tag:user:1")
+
+    peer.receive()
+    assert peer.get("user:1") is None
+
+
+def test_invalidate_tags_publishes_after_unlink(backend):
+    manager = CacheManager()
+    manager.set("user:1", {"id": 1}, tags=["user:1"])
+    published = record_publish_state(manager, backend, "user:1")
+
+    manager.invalidate_tags("user:1")
+    assert published == [0]
+
+
+def test_delete_pattern_publishes_after_unlink(backend):
+    manager = CacheManager()
+    manager.set("menu:tree:root", [1])
+    published = record_publish_state(manager, backend, "menu:tree:root")
+
+    assert manager.delete_pattern("menu:tree:*") == 1
+    assert published == [0]
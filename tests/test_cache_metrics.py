@@ -0,0 +1,40 @@
+"""缓存指标的测试"""
+
+import pytest
+
+from app.core.cache_metrics import key_prefix
+from app.core.redis_client import (
+    cache_key_dictionary_by_code,
+    cache_key_dictionary_tree,
+    cache_key_menu_by_id,
+    cache_key_menu_tree,
+    cache_key_order_id,
+    cache_key_role_by_code,
+    cache_key_user,
+    cache_key_user_by_username,
+    cache_key_user_response,
+    cache_lock_key,
+)
+
+
+@pytest.mark.parametrize(
+    "key, prefix",
+    [
+        (cache_key_menu_tree(), "menu:tree"),
+        (f"{cache_key_menu_tree()}:root", "menu:tree"),
+        (cache_key_menu_by_id(12), "menu"),
+        ("department:tree:3", "department:tree"),
+        (cache_key_dictionary_tree(5), "dictionary:tree"),
+        (cache_key_dictionary_by_code("gender"), "dictionary"),
+        (cache_key_user(1), "user"),
+        (cache_key_user_by_username("alice"), "user:username"),
+        (cache_key_user_response(1), "user:response"),
+        (cache_key_role_by_code("admin"), "role:code"),
+        (cache_key_order_id("BN", "20240101"), "order_id"),
+        ("count:internal_order:abc123", "count:internal_order"),
+        (cache_lock_key(cache_key_menu_tree()), "lock"),
+        ("plain", "plain"),
+    ],
+)
+def test_key_prefix_groups_by_key_family(key, prefix):
+    assert key_prefix(key) == prefix
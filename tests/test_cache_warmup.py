@@ -0,0 +1,27 @@
+"""缓存预热的测试"""
+
+import threading
+
+from app.core.cache_warmup import (
+    cache_warmup_status,
+    default_warmup_tasks,
+    warm_up_caches,
+)
+
+
+def test_default_tasks_only_warm_caches_read_by_the_api():
+    assert [name for name, _ in default_warmup_tasks()] == [
+        "menu_tree",
+        "dictionary_trees",
+    ]
+
+
+def test_warm_up_times_out_without_blocking():
+    release = threading.Event()
+    tasks = [("fast", lambda db: None), ("slow", lambda db: release.wait(5))]
+
+    assert warm_up_caches(tasks, timeout=0.1) is False
+    assert cache_warmup_status.state == cache_warmup_status.TIMEOUT
+    assert cache_warmup_status.tasks["fast"] == "ok"
+
+    release.set()
@@ -0,0 +1,94 @@
+"""Redis熔断器及受保护客户端的测试"""
+
+import time
+
+import pytest
+import redis
+
+from app.core.memory_backend import InMemoryBackend
+from app.core.redis_client import CircuitBreaker, GuardedRedis
+
+
+def open_breaker(reset_timeout=0.0, probe_timeout=10.0) -> CircuitBreaker:
+    """构造已熔断的熔断器"""
+    breaker = CircuitBreaker(2, reset_timeout, probe_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+class BrokenPubSub:
+    def subscribe(self, *channels):
+        raise redis.ConnectionError("connection refused")
+
+
+class BrokenClient:
+    def pubsub(self, **kwargs):
+        return BrokenPubSub()
+
+
+def test_opens_after_threshold_and_blocks_during_cooldown():
+    breaker = open_breaker(reset_timeout=60)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_allows_single_probe():
+    breaker = open_breaker()
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens():
+    breaker = open_breaker(reset_timeout=60)
+    breaker._opened_at -= 60
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_probe_without_result_expires():
+    breaker = open_breaker(probe_timeout=0.05)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+
+
+def test_lock_probe_records_success():
+    breaker = open_breaker()
+    assert breaker.allow_request()
+    client = GuardedRedis(InMemoryBackend(), breaker)
+
+    lock = client.lock("lock:test", timeout=5, blocking=False)
+    assert lock.acquire(blocking=False)
+    assert breaker.state == CircuitBreaker.CLOSED
+    lock.release()
+
+
+def test_pubsub_probe_records_failure():
+    breaker = open_breaker(reset_timeout=60)
+    breaker._opened_at -= 60
+    assert breaker.allow_request()
+    client = GuardedRedis(BrokenClient(), breaker)
+
+    with pytest.raises(redis.ConnectionError):
+        client.pubsub(ignore_subscribe_messages=True).subscribe("channel")
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_pipeline_execute_is_guarded():
+    breaker = open_breaker()
+    assert breaker.allow_request()
+    client = GuardedRedis(InMemoryBackend(), breaker)
+
+    pipe = client.pipeline(transaction=False)
+    pipe.set("key", b"1")
+    pipe.execute()
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,34 @@
+"""数据导出的测试"""
+
+import io
+from datetime import datetime
+
+import openpyxl
+
+from app.core.export import iter_csv, iter_xlsx
+
+
+def test_csv_yields_before_all_rows_are_read(monkeypatch):
+    monkeypatch.setattr("app.core.export.settings.EXPORT_CHUNK_SIZE", 16)
+    consumed = []
+
+    def rows():
+        for number in range(100):
+            consumed.append(number)
+            yield [number, "x" * 10]
+
+    first = next(iter_csv(["编号", "内容"], rows()))
+    assert first.startswith("\ufeff编号,内容".encode("utf-8"))
+    assert len(consumed) < 100
+
+
+def test_xlsx_roundtrip():
+    rows = [[1, True, datetime(2024, 5, 1, 8, 30)], [2, False, None]]
+    data = b"".join(iter_xlsx(["编号", "完成", "时间"], iter(rows), "工单"))
+
+    sheet = openpyxl.load_workbook(io.BytesIO(data))["工单"]
+    assert list(sheet.iter_rows(values_only=True)) == [
+        ("编号", "完成", "时间"),
+        (1, "是", datetime(2024, 5, 1, 8, 30)),
+        (2, "否", None),
+    ]
@@ -0,0 +1,44 @@
+"""工单批量创建/更新的测试"""
+
+from app.crud.order import STALE_ORDER_MESSAGE, internal_order_crud
+from app.models.order import InternalOrder
+
+
+def test_batch_update_reports_failures_per_item(db, make_order):
+    make_order("BN202405010001")
+    make_order("BN202405010002")
+
+    results = internal_order_crud.batch_update(
+        db,
+        [
+            {"id": "BN202405010001", "customer": "新客户", "repairPerson": "张三"},
+            {"id": []},
+            {"id": {"nested": 1}, "customer": "x"},
+            {"customer": "缺少工单号"},
+            {"id": "BN209901010001"},
+            {"id": "BN202405010002", "version": 99, "customer": "旧版本"},
+            {"id": "BN202405010002", "mileage": "不是数字"},
+        ],
+    )
+
+    assert [result["success"] for result in results] == [True] + [False] * 6
+    assert [result["id"] for result in results[1:4]] == [None, None, None]
+    assert results[1]["message"] == "工单号必须为非空字符串"
+    assert results[4]["message"] == "工单未找到"
+    assert results[5]["message"] == STALE_ORDER_MESSAGE
+
+    db.expire_all()
+    order = db.get(InternalOrder, "BN202405010001")
+    assert order.customer == "新客户"
+    assert order.details[0].repair_person == "张三"
+    assert order.version == 2
+    assert db.get(InternalOrder, "BN202405010002").customer == "客户"
+
+
+def test_batch_update_respects_permission_filter(db, make_order):
+    make_order("BN202405010001", created_by=1)
+
+    results = internal_order_crud.batch_update(
+        db, [{"id": "BN202405010001", "customer": "x"}], permission_filter=[2]
+    )
+    assert results[0]["message"] == "无权限修改该工单"
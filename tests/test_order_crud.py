@@ -0,0 +1,154 @@
+"""工单创建和更新的测试"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import event, update
+
+from app.core.exceptions import CRMException
+from app.crud.order import STALE_ORDER_MESSAGE, internal_order_crud
+from app.models.order import InternalOrder, InternalOrderDetail
+
+ORDER_DATA = {
+    "customer": "客户",
+    "vehicle_model": "车型",
+    "repair_shop": "维修站",
+    "reporter_name": "报修人",
+    "contact_info": "13800000000",
+    "report_date": date(2024, 5, 1),
+    "project_type": "类型",
+    "project_stage": "阶段",
+    "vin_number": "VIN",
+}
+
+
+@contextmanager
+def order_statements(db):
+    """记录期间执行的、涉及保内工单表的SQL语句"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "internal_order" in statement:
+            statements.append(statement.split()[0])
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_create_writes_order_and_detail_in_one_flush(db):
+    # 首次生成工单号时会查询当天最大序号，之后使用计数表预留的序号
+    internal_order_crud.create_with_details(db, dict(ORDER_DATA))
+
+    with order_statements(db) as statements:
+        order = internal_order_crud.create_with_details(
+            db, dict(ORDER_DATA), {"repair_person": "维修人"}
+        )
+        assert order.create_time is not None
+        assert order.details[0].order_id == order.id
+
+    assert statements == ["INSERT", "INSERT"]
+    assert db.query(InternalOrderDetail).filter_by(order_id=order.id).count() == 1
+
+
+def test_failed_detail_insert_leaves_no_order(db):
+    def fail_detail_insert(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO internal_order_detail"):
+            raise RuntimeError("写入详情失败")
+
+    event.listen(db.get_bind(), "before_cursor_execute", fail_detail_insert)
+    try:
+        with pytest.raises(CRMException):
+            internal_order_crud.create_with_details(
+                db, dict(ORDER_DATA), {"repair_person": "维修人"}
+            )
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", fail_detail_insert)
+
+    assert db.query(InternalOrder).count() == 0
+
+
+def test_update_writes_order_and_detail_in_one_flush(db, make_order):
+    make_order("BN202405010001")
+    db.expunge_all()
+
+    with order_statements(db) as statements:
+        order = internal_order_crud.update_with_details(
+            db, "BN202405010001", {"customer": "新客户"}, {"repair_person": "新维修人"}
+        )
+        assert order.update_time is not None
+        assert order.details[0].repair_person == "新维修人"
+
+    assert statements == ["SELECT", "UPDATE", "UPDATE"]
+
+
+def test_update_with_stale_version_returns_409(db, make_order):
+    version = make_order("BN202405010001").version
+
+    internal_order_crud.update_with_details(
+        db, "BN202405010001", {"customer": "甲"}, version=version
+    )
+    with pytest.raises(CRMException) as exc_info:
+        internal_order_crud.update_with_details(
+            db, "BN202405010001", {"customer": "乙"}, version=version
+        )
+
+    assert exc_info.value.status_code == 409
+    assert exc_info.value.detail == STALE_ORDER_MESSAGE
+    assert db.query(InternalOrder).one().customer == "甲"
+
+
+def test_concurrent_update_returns_409(db, make_order):
+    order = make_order("BN202405010001")
+    # 他人在本会话读取之后提交了修改
+    db.execute(
+        update(InternalOrder)
+        .where(InternalOrder.id == order.id)
+        .values(version=InternalOrder.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+    with pytest.raises(CRMException) as exc_info:
+        internal_order_crud.update_with_details(db, order.id, {"customer": "乙"})
+    assert exc_info.value.status_code == 409
+
+
+def test_detail_only_update_increments_version(db, make_order):
+    version = make_order("BN202405010001").version
+
+    order = internal_order_crud.update_with_details(
+        db, "BN202405010001", {}, {"repair_person": "新维修人"}, version=version
+    )
+    assert order.version == version + 1
+
+
+def test_spare_part_location_follows_first_detail(db):
+    order = internal_order_crud.create_with_details(
+        db, dict(ORDER_DATA), {"spare_part_location": "A-01"}
+    )
+    assert order.spare_part_location == "A-01"
+
+    internal_order_crud.update_with_details(
+        db, order.id, {}, {"repair_person": "维修人"}
+    )
+    db.expire_all()
+    assert db.get(InternalOrder, order.id).spare_part_location == "A-01"
+
+    internal_order_crud.update_with_details(
+        db, order.id, {}, {"spare_part_location": "B-02"}
+    )
+    db.expire_all()
+    assert db.get(InternalOrder, order.id).spare_part_location == "B-02"
+    assert db.query(InternalOrderDetail).one().spare_part_location == "B-02"
+
+
+def test_batch_create_writes_spare_part_location_to_order(db):
+    item = {**ORDER_DATA, "report_date": "2024-05-01", "spare_part_location": "A-01"}
+    [result] = internal_order_crud.batch_create(db, [item], created_by=1)
+
+    assert db.get(InternalOrder, result["id"]).spare_part_location == "A-01"
+    assert db.query(InternalOrderDetail).one().spare_part_location == "A-01"
@@ -0,0 +1,52 @@
+"""Redis计数器工单号策略的测试"""
+
+import pytest
+
+import app.core.id_generator as id_generator
+from app.core.id_generator import IDGenerationStrategy, OrderIDGenerator
+from app.core.redis_client import cache_key_order_id
+
+
+@pytest.fixture
+def db_latest(monkeypatch):
+    """用可修改的值代替数据库中当天的最大序号"""
+    latest = {"value": 0}
+    monkeypatch.setattr(
+        id_generator, "latest_order_sequence", lambda db, prefix, day: latest["value"]
+    )
+    return latest
+
+
+def sequence(order_id: str) -> int:
+    return int(order_id[-id_generator.ORDER_ID_SEQUENCE_DIGITS :])
+
+
+def test_first_use_continues_after_database_max(backend, db_latest):
+    db_latest["value"] = 7
+    generator = OrderIDGenerator(IDGenerationStrategy.REDIS_COUNTER)
+    assert sequence(generator.generate_internal_order_id(None)) == 8
+    assert sequence(generator.generate_internal_order_id(None)) == 9
+
+
+def test_lost_key_is_reseeded_from_database(backend, db_latest):
+    generator = OrderIDGenerator(IDGenerationStrategy.REDIS_COUNTER)
+    for _ in range(3):
+        order_id = generator.generate_internal_order_id(None)
+    key = cache_key_order_id("BN", order_id[2:10])
+
+    # 模拟Redis重启后计数键丢失，此时数据库中已有3个工单
+    db_latest["value"] = 3
+    backend.delete(key)
+
+    ids = generator._generate_with_redis_counter(None, "BN", 2)
+    assert [sequence(order_id) for order_id in ids] == [4, 5]
+    assert backend.ttl(key) > 0
+
+
+def test_lost_key_without_orders_starts_from_one(backend, db_latest):
+    generator = OrderIDGenerator(IDGenerationStrategy.REDIS_COUNTER)
+    order_id = generator.generate_external_order_id(None)
+    backend.delete(cache_key_order_id("BW", order_id[2:10]))
+
+    ids = generator._generate_with_redis_counter(None, "BW", 2)
+    assert [sequence(order_id) for order_id in ids] == [1, 2]
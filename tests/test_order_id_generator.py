@@ -0,0 +1,47 @@
+"""数据库锁和计数表工单号策略的测试"""
+
+from datetime import datetime
+
+import pytest
+
+from app.core.id_generator import IDGenerationStrategy, OrderIDGenerator
+
+
+@pytest.fixture
+def today():
+    return datetime.now().strftime("%Y%m%d")
+
+
+@pytest.fixture
+def existing_orders(make_order, today):
+    """当天已有标准格式的0003号，以及序号格式不同的工单号"""
+    make_order(f"BN{today}0003")
+    make_order(f"BN{today}1234567")
+    make_order(f"BN{today}00X9")
+
+
+def test_database_lock_ignores_non_standard_ids(db, existing_orders, today):
+    generator = OrderIDGenerator(IDGenerationStrategy.DATABASE_LOCK)
+    assert generator.generate_internal_order_id(db) == f"BN{today}0004"
+
+
+def test_database_lock_allocates_a_range(db, existing_orders, today):
+    generator = OrderIDGenerator(IDGenerationStrategy.DATABASE_LOCK)
+    assert generator.generate_order_ids(db, "BN", 2) == [
+        f"BN{today}0004",
+        f"BN{today}0005",
+    ]
+
+
+def test_counter_table_continues_after_existing_orders(db, existing_orders, today):
+    generator = OrderIDGenerator(IDGenerationStrategy.COUNTER_TABLE)
+    first = generator.generate_internal_order_id(db)
+    assert first == f"BN{today}0004"
+    assert generator.generate_order_ids(db, "BN", 2) == [
+        f"BN{today}0005",
+        f"BN{today}0006",
+    ]
+
+    # 进程重启后丢弃未发放的号段，从计数表继续分配，不会重复
+    restarted = OrderIDGenerator(IDGenerationStrategy.COUNTER_TABLE)
+    assert restarted.generate_internal_order_id(db) > f"BN{today}0006"
@@ -0,0 +1,104 @@
+"""工单Excel导入的测试"""
+
+import io
+
+import openpyxl
+import pytest
+
+from app.core.excel_import import iter_xlsx_records
+from app.core.exceptions import ValidationError
+from app.crud.order import internal_order_crud
+from app.models.order import InternalOrder, InternalOrderDetail
+
+HEADER_MAP = {"客户": "customer", "车型": "vehicle_model", "是否在保": "under_warranty"}
+
+VALID_RECORD = {
+    "customer": "客户",
+    "vehicle_model": "车型",
+    "repair_shop": "维修站",
+    "reporter_name": "报修人",
+    "contact_info": 13800000000,
+    "report_date": "2024-05-01",
+    "project_type": "类型",
+    "project_stage": "阶段",
+    "vin_number": "VIN",
+    "spare_part_location": "A-01",
+}
+
+
+def xlsx_file(*rows) -> io.BytesIO:
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    data = io.BytesIO()
+    workbook.save(data)
+    data.seek(0)
+    return data
+
+
+def test_xlsx_records_map_headers_and_skip_blank_rows():
+    data = xlsx_file(
+        ["客户", "备注", "车型", "是否在保"],
+        [" 客户A ", "忽略", "车型A", "否"],
+        [None, None, None, None],
+        ["客户B", None, "", "是"],
+    )
+    assert list(iter_xlsx_records(data, HEADER_MAP)) == [
+        (2, {"customer": "客户A", "vehicle_model": "车型A", "under_warranty": False}),
+        (4, {"customer": "客户B", "under_warranty": True}),
+    ]
+
+
+def test_xlsx_without_known_header_is_rejected():
+    with pytest.raises(ValidationError):
+        list(iter_xlsx_records(xlsx_file(["名称"], ["x"]), HEADER_MAP))
+
+
+def test_import_reports_invalid_rows_and_imports_the_rest(db):
+    records = [
+        (2, dict(VALID_RECORD)),
+        (3, {**VALID_RECORD, "report_date": "不是日期"}),
+        (4, dict(VALID_RECORD)),
+    ]
+    result = internal_order_crud.batch_import(
+        db, records, created_by=1, titles={"report_date": "报修日期"}
+    )
+
+    assert (result.success_count, result.fail_count) == (2, 1)
+    assert result.errors[0]["row"] == 3
+    assert result.errors[0]["message"].startswith("报修日期:")
+
+    order = db.query(InternalOrder).first()
+    assert order.contact_info == "13800000000"
+    assert order.spare_part_location == "A-01"
+    assert db.query(InternalOrderDetail).count() == 2
+
+
+def test_import_rolls_back_every_batch_on_write_failure(db, monkeypatch):
+    monkeypatch.setattr("app.crud.order.settings.IMPORT_BATCH_SIZE", 1)
+    bulk_create = internal_order_crud.bulk_create_with_details
+    calls = []
+
+    def failing_bulk_create(db, batch):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("写入失败")
+        return bulk_create(db, batch)
+
+    monkeypatch.setattr(
+        internal_order_crud, "bulk_create_with_details", failing_bulk_create
+    )
+    records = [(row, dict(VALID_RECORD)) for row in (2, 3)]
+    result = internal_order_crud.batch_import(db, records, created_by=1)
+
+    assert not result.success
+    assert (result.success_count, result.fail_count) == (0, 2)
+    assert db.query(InternalOrder).count() == 0
+
+
+def test_import_rejects_too_many_rows(db, monkeypatch):
+    monkeypatch.setattr("app.crud.order.settings.IMPORT_MAX_ROWS", 1)
+    records = [(row, dict(VALID_RECORD)) for row in (2, 3)]
+    with pytest.raises(ValidationError):
+        internal_order_crud.batch_import(db, records, created_by=1)
+    assert db.query(InternalOrder).count() == 0
@@ -0,0 +1,33 @@
+"""列表总数估算的测试"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, sessionmaker
+
+from app.core.query_count import estimate_count, explain_statement
+from app.models.order import InternalOrder
+
+
+def test_explain_statement_renders_in_parameters():
+    query = Query(InternalOrder).filter(
+        InternalOrder.created_by.in_([1, 2]), InternalOrder.customer.contains("x")
+    )
+    sql, params = explain_statement(query, postgresql.psycopg2.dialect())
+
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "POSTCOMPILE" not in sql
+    assert "%(created_by_1_1)s" in sql and "%(created_by_1_2)s" in sql
+    assert params["created_by_1_1"] == 1
+    assert params["created_by_1_2"] == 2
+    assert params["customer_1"] == "x"
+
+
+def test_explain_statement_with_empty_in_list():
+    query = Query(InternalOrder).filter(InternalOrder.created_by.in_([]))
+    sql, _ = explain_statement(query, postgresql.psycopg2.dialect())
+    assert "POSTCOMPILE" not in sql
+
+
+def test_estimate_count_skips_other_databases():
+    db = sessionmaker(bind=create_engine("sqlite://"))()
+    assert estimate_count(db, db.query(InternalOrder)) is None
@@ -0,0 +1,87 @@
+"""公共响应处理函数的测试"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect
+
+from app.core.exceptions import ValidationError
+from app.core.response_helpers import (
+    apply_keyset_pagination,
+    decode_cursor,
+    dump_fields,
+    encode_cursor,
+    load_only_fields,
+    parse_fields,
+)
+from app.models.order import InternalOrder
+from app.schemas.order import InternalOrderResponse
+
+
+def test_cursor_roundtrip():
+    values = [datetime(2024, 5, 1, 8, 30, 15, 123456), "BN202405010001"]
+    assert decode_cursor(encode_cursor(*values), 2) == values
+
+
+@pytest.mark.parametrize(
+    "cursor", ["not-base64!", encode_cursor("BN202405010001"), encode_cursor({})]
+)
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor, 2)
+
+
+def test_keyset_pagination_walks_every_order_once(db, make_order):
+    # 同一时间创建的工单按id区分先后
+    for index in range(5):
+        make_order(
+            f"BN20240501000{index}", create_time=datetime(2024, 5, 1, 8, index // 2)
+        )
+    columns = [InternalOrder.create_time, InternalOrder.id]
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        orders, cursor = apply_keyset_pagination(
+            db.query(InternalOrder), columns, cursor, 2
+        )
+        seen.extend(order.id for order in orders)
+
+    assert seen == [f"BN20240501000{index}" for index in reversed(range(5))]
+
+
+def test_parse_fields_accepts_camel_and_snake_case():
+    names = parse_fields(
+        "reportDate, customer,report_date,sparePartLocation",
+        InternalOrderResponse,
+        extra=("spare_part_location",),
+    )
+    assert names == ["id", "report_date", "customer", "spare_part_location"]
+    assert parse_fields("", InternalOrderResponse) is None
+
+
+def test_parse_fields_rejects_unknown_and_excluded_fields():
+    with pytest.raises(ValidationError, match="password, details"):
+        parse_fields(
+            "customer,password,details", InternalOrderResponse, exclude=("details",)
+        )
+
+
+def test_sparse_fields_only_load_selected_columns(db, make_order):
+    make_order("BN202405010001")
+    db.expunge_all()
+    field_names = ["id", "customer", "report_date"]
+
+    order = (
+        db.query(InternalOrder)
+        .options(load_only_fields(InternalOrder, field_names + ["spare_part_location"]))
+        .one()
+    )
+    data = dump_fields(order, InternalOrderResponse, field_names)
+
+    assert data == {
+        "id": "BN202405010001",
+        "customer": "客户",
+        "reportDate": "2024-05-01",
+    }
+    assert {"vin_number", "fault_description"} <= inspect(order).unloaded
@@ -0,0 +1,75 @@
+"""用户缓存失效的测试"""
+
+import pytest
+
+from app.core.redis_client import cache_key_user_response
+from app.crud.department import department_crud
+from app.crud.role import role_crud
+from app.crud.user import pwd_context, user_crud
+from app.models.role import Role
+from app.models.user import User
+
+
+@pytest.fixture
+def user(db):
+    """带一个角色的用户"""
+    sales = Role(role_name="销售", role_code="SALES")
+    db.add(Role(role_name="售后", role_code="SERVICE"))
+    user = User(user_name="alice", hashed_password="x", roles=[sales])
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_set_roles_invalidates_cached_response(db, user):
+    # 更新基本信息后、提交角色前，并发请求缓存了旧角色
+    user_crud.update(db, user, {"nick_name": "Alice"})
+    assert user_crud.get_responses(db, [user.id])[user.id].roles == ["SALES"]
+
+    user_crud.set_roles(db, user, ["SERVICE"])
+    response = user_crud.get_responses(db, [user.id])[user.id]
+    assert response.roles == ["SERVICE"]
+    assert response.role_names == ["售后"]
+
+
+def test_role_update_invalidates_only_role_holders(db, user, backend):
+    bob = User(user_name="bob", hashed_password="x")
+    db.add(bob)
+    db.commit()
+    user_crud.get_responses(db, [user.id, bob.id])
+
+    role_crud.update(db, user.roles[0], {"role_name": "大客户销售"})
+    assert user_crud.get_responses(db, [user.id])[user.id].role_names == ["大客户销售"]
+    assert backend.exists(cache_key_user_response(bob.id))
+
+
+def test_department_update_invalidates_old_and_new_members(db, user, backend):
+    bob = User(user_name="bob", hashed_password="x")
+    carol = User(user_name="carol", hashed_password="x")
+    db.add_all([bob, carol])
+    db.commit()
+    dept = department_crud.create(db, {"dept_name": "华东", "member_ids": [user.id]})
+    user_crud.get_responses(db, [user.id, bob.id, carol.id])
+
+    department_crud.update(db, dept, {"dept_name": "华东区", "member_ids": [bob.id]})
+    responses = user_crud.get_responses(db, [user.id, bob.id])
+    assert responses[user.id].departments == []
+    assert responses[bob.id].departments == ["华东区"]
+    assert backend.exists(cache_key_user_response(carol.id))
+
+
+def test_authenticate_does_not_depend_on_cached_password(db, user):
+    user.hashed_password = pwd_context.hash("secret")
+    db.commit()
+    # 缓存中的用户快照不含密码哈希
+    assert user_crud.get_by_username(db, "alice").user_name == "alice"
+
+    assert user_crud.authenticate(db, "alice", "secret").id == user.id
+    assert user_crud.authenticate(db, "alice", "wrong") is None
+
+
+def test_created_user_replaces_negative_cache_entry(db):
+    assert user_crud.get_by_username(db, "dave") is None
+
+    user_crud.create(db, {"user_name": "dave", "password": "secret"})
+    assert user_crud.get_by_username(db, "dave").user_name == "dave"